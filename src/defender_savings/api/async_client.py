@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from collections.abc import AsyncIterator
+
+from defender_savings.api.cache import ResponseCache
+from defender_savings.api.client import build_query_body, cache_scope, default_headers, read_total
+from defender_savings.api.codec import loads
+from defender_savings.api.filters import all_of
+from defender_savings.api.projection import MINIMAL
+from defender_savings.api.transport import (
+    RETRY_STATUSES,
+    THROTTLE_STATUSES,
+    TransportStats,
+    full_jitter_backoff,
+    retry_after_seconds,
+)
+from defender_savings.config import (
+    DEFAULT_BACKOFF_BASE,
+    DEFAULT_BACKOFF_MAX,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_READ_TIMEOUT,
+    ORCA_API_URL,
+    ORCA_QUERY_ENDPOINT,
+)
+from defender_savings.models.compact import MODEL
+
+try:
+    import httpx
+except ImportError:  # optional dependency: pip install 'defender-savings[async]'
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncOrcaClient:
+    """Orca Security API client on asyncio, using httpx.
+
+    Same ``query`` / ``iter_pages`` contract as ``OrcaClient``. All requests
+    share one keep-alive connection pool of at most ``max_connections``
+    connections, optionally negotiated over HTTP/2 (requires the ``h2``
+    package). Pages are served from ``cache`` when one is given, and
+    ``projection``, ``scope`` and ``asset_form`` are as on ``OrcaClient``. Use as an
+    async context manager, or call ``aclose()`` when done.
+
+    Requests are bounded by the same timeouts and retried under the same
+    policy as the sync ``Transport``: connection errors, timeouts,
+    RETRY_STATUSES and THROTTLE_STATUSES get up to ``max_retries`` retries
+    with full-jitter backoff (or the server's Retry-After, capped at
+    ``backoff_max``), counted in ``stats``. There is no adaptive
+    concurrency limit: the connection pool bounds the requests in flight.
+    """
+
+    def __init__(
+        self,
+        api_token: str,
+        max_connections: int = 20,
+        page_workers: int = 1,
+        http2: bool = False,
+        transport: httpx.AsyncBaseTransport | None = None,
+        cache: ResponseCache | None = None,
+        projection: str = MINIMAL,
+        scope: dict | None = None,
+        asset_form: str = MODEL,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_base: float = DEFAULT_BACKOFF_BASE,
+        backoff_max: float = DEFAULT_BACKOFF_MAX,
+    ) -> None:
+        if httpx is None:
+            raise ImportError("AsyncOrcaClient requires httpx: pip install 'defender-savings[async]'")
+        self._client = httpx.AsyncClient(
+            base_url=ORCA_API_URL,
+            headers=default_headers(api_token),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            http2=http2,
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            transport=transport,
+        )
+        self._page_workers = page_workers
+        self._cache = cache
+        self._cache_scope = cache_scope(api_token)
+        self.projection = projection
+        self.scope = scope
+        self.asset_form = asset_form
+        self._max_retries = max_retries
+        self._backoff_base = backoff_base
+        self._backoff_max = backoff_max
+        self.stats = TransportStats()
+
+    async def __aenter__(self) -> AsyncOrcaClient:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def _send(self, body: dict) -> httpx.Response:
+        """POST one page, retrying as ``Transport.post`` does."""
+        attempt = 0
+        while True:
+            self.stats.incr("requests")
+            try:
+                response = await self._client.post(ORCA_QUERY_ENDPOINT, json=body)
+            except httpx.TransportError as e:
+                if attempt >= self._max_retries:
+                    raise
+                delay = full_jitter_backoff(attempt, self._backoff_base, self._backoff_max)
+                logger.debug("%s, retrying in %.1fs", e.__class__.__name__, delay)
+            else:
+                status = response.status_code
+                if status in THROTTLE_STATUSES:
+                    self.stats.incr("throttled")
+                if status not in THROTTLE_STATUSES | RETRY_STATUSES or attempt >= self._max_retries:
+                    return response
+                delay = retry_after_seconds(response) if status in THROTTLE_STATUSES else None
+                if delay is None:
+                    delay = full_jitter_backoff(attempt, self._backoff_base, self._backoff_max)
+                delay = min(delay, self._backoff_max)
+                logger.debug("HTTP %d from %s, retrying in %.1fs", status, ORCA_QUERY_ENDPOINT, delay)
+
+            self.stats.incr("retries")
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def _post(self, body: dict) -> dict:
+        if self._cache is not None:
+            cached = self._cache.get(self._cache_scope, body)
+            if cached is not None:
+                return cached
+
+        logger.debug(
+            "POST %s models=%s start_at=%d",
+            ORCA_QUERY_ENDPOINT, body["query"]["models"], body["start_at_index"],
+        )
+        response = await self._send(body)
+        response.raise_for_status()
+        data = loads(response.content)
+
+        if self._cache is not None:
+            self._cache.put(self._cache_scope, body, data)
+        return data
+
+    async def query(
+        self,
+        models: list[str],
+        select: list[str],
+        limit: int = 100,
+        with_filter: dict | None = None,
+        page_workers: int | None = None,
+    ) -> list[dict]:
+        """Execute a serving-layer query and return all results with pagination."""
+        all_items: list[dict] = []
+        async for page in self.iter_pages(models, select, limit, with_filter, page_workers):
+            all_items.extend(page)
+
+        logger.info("Fetched %d items for models %s", len(all_items), models)
+        return all_items
+
+    async def iter_pages(
+        self,
+        models: list[str],
+        select: list[str],
+        limit: int = 100,
+        with_filter: dict | None = None,
+        page_workers: int | None = None,
+    ) -> AsyncIterator[list[dict]]:
+        """Yield the pages of a serving-layer query as they arrive.
+
+        See ``OrcaClient.iter_pages``; up to ``page_workers`` pages are
+        requested ahead of the consumer as concurrent tasks.
+        """
+        workers = page_workers or self._page_workers
+        with_filter = all_of(self.scope, with_filter)
+        first = await self._post(build_query_body(models, select, limit, 0, with_filter, with_count=workers > 1))
+        items = first.get("data", [])
+        yield items
+        if len(items) < limit:
+            return
+
+        total = read_total(first)
+
+        async def fetch_page(start_at: int) -> list[dict]:
+            data = await self._post(build_query_body(models, select, limit, start_at, with_filter))
+            return data.get("data", [])
+
+        next_start = limit
+        pending: deque[asyncio.Task[list[dict]]] = deque()
+        try:
+            while True:
+                # Keep the window full, but don't probe past a known total
+                # unless the model grew beyond it mid-crawl.
+                while len(pending) < workers and (total is None or next_start < total or not pending):
+                    pending.append(asyncio.create_task(fetch_page(next_start)))
+                    next_start += limit
+
+                items = await pending.popleft()
+                yield items
+                if len(items) < limit:
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
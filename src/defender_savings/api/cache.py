@@ -0,0 +1,133 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+from defender_savings.api.codec import dumps, loads
+from defender_savings.config import DEFAULT_CACHE_MAX_BYTES, DEFAULT_CACHE_TTL
+
+logger = logging.getLogger(__name__)
+
+_SUFFIX = ".json"
+
+
+class ResponseCache:
+    """On-disk cache of serving-layer responses, one file per page.
+
+    Entries are keyed by the full request body (models, select, filter,
+    limit and start_at_index) plus a caller-supplied scope, so responses for
+    different API tokens never mix. An entry is served for ``ttl`` seconds
+    after it was written. When the cache grows beyond ``max_bytes`` the
+    least recently used entries are evicted. With ``refresh`` every lookup
+    misses but fresh responses are still written back.
+
+    Each entry's mtime records when it was written and its atime when it
+    was last served; both are set explicitly, so ``noatime`` mounts are fine.
+    Entries expire page by page, so a crawl served partly from the cache may
+    combine pages written at different times; ``oldest_hit`` is the write
+    time of the oldest entry served, for callers to report how stale the
+    data may be.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        ttl: float = DEFAULT_CACHE_TTL,
+        max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+        refresh: bool = False,
+    ) -> None:
+        self._dir = cache_dir
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._ttl = ttl
+        self._max_bytes = max_bytes
+        self._refresh = refresh
+        self._lock = threading.Lock()
+        self._size = sum(p.stat().st_size for p in self._entries())
+        self.hits = 0
+        self.misses = 0
+        self.oldest_hit: float | None = None
+
+    def _entries(self) -> list[Path]:
+        return list(self._dir.glob(f"*{_SUFFIX}"))
+
+    def _path(self, scope: str, body: dict) -> Path:
+        raw = json.dumps(body, sort_keys=True, separators=(",", ":"))
+        digest = hashlib.sha256(f"{scope}\n{raw}".encode()).hexdigest()
+        return self._dir / f"{digest}{_SUFFIX}"
+
+    def get(self, scope: str, body: dict) -> dict | None:
+        """Return the cached response for ``body``, or None on a miss."""
+        path = self._path(scope, body)
+        if self._refresh:
+            return self._miss()
+        try:
+            written_at = path.stat().st_mtime
+            if time.time() - written_at > self._ttl:
+                return self._miss()
+            with open(path, "rb") as f:
+                data = loads(f.read())
+            os.utime(path, (time.time(), written_at))
+        except (OSError, ValueError):
+            return self._miss()
+        with self._lock:
+            self.hits += 1
+            if self.oldest_hit is None or written_at < self.oldest_hit:
+                self.oldest_hit = written_at
+        return data
+
+    def _miss(self) -> None:
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, scope: str, body: dict, data: dict) -> None:
+        """Store a response, evicting least recently used entries if needed."""
+        path = self._path(scope, body)
+        payload = dumps(data)
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            old_size = path.stat().st_size if path.exists() else 0
+            tmp.write_bytes(payload)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning("Could not write cache entry %s: %s", path.name, e)
+            tmp.unlink(missing_ok=True)
+            return
+
+        with self._lock:
+            self._size += len(payload) - old_size
+            if self._size > self._max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for p in self._entries():
+            try:
+                entries.append((p.stat().st_atime, p))
+            except OSError:
+                continue
+        entries.sort()
+
+        # Evict down to 90% so we don't rescan the directory on every write
+        target = self._max_bytes * 0.9
+        evicted = 0
+        for _, p in entries:
+            if self._size <= target:
+                break
+            try:
+                size = p.stat().st_size
+                p.unlink()
+            except OSError:
+                continue
+            self._size -= size
+            evicted += 1
+        logger.debug("Evicted %d cache entries, %d bytes remain", evicted, self._size)
+
+    def clear(self) -> None:
+        with self._lock:
+            for p in self._entries():
+                p.unlink(missing_ok=True)
+            self._size = 0
@@ -0,0 +1,115 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+from defender_savings.api.codec import dumps, loads
+from defender_savings.config import DEFAULT_CACHE_TTL
+
+logger = logging.getLogger(__name__)
+
+_STATE = "state.json"
+
+
+def _write_atomic(path: Path, payload: bytes) -> None:
+    tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+    tmp.write_bytes(payload)
+    os.replace(tmp, path)
+
+
+class Checkpoint:
+    """Pages fetched so far by one crawl, and where to pick it up again.
+
+    Each page is written to its own file before it is handed to the
+    consumer, followed by the crawl's ``cursor`` (the next
+    ``start_at_index``, and the last keyset key seen). The cursor is only
+    advanced once its page is on disk, so a crash between the two at worst
+    re-fetches one page. ``started_at`` is when the first page was saved.
+    """
+
+    def __init__(self, directory: Path, state: dict | None = None) -> None:
+        self._dir = directory
+        state = state or {}
+        self.pages: int = state.get("pages", 0)
+        self.cursor: dict = state.get("cursor", {})
+        self.started_at: float | None = state.get("started_at")
+
+    def iter_saved_pages(self) -> Iterator[list[dict]]:
+        """Yield the pages saved by an earlier run, in crawl order."""
+        for index in range(self.pages):
+            with open(self._dir / f"{index:06d}.json", "rb") as f:
+                yield loads(f.read())
+
+    def save(self, items: list[dict], cursor: dict) -> None:
+        self._dir.mkdir(parents=True, exist_ok=True)
+        _write_atomic(self._dir / f"{self.pages:06d}.json", dumps(items))
+        now = time.time()
+        if self.started_at is None:
+            self.started_at = now
+        state = {"pages": self.pages + 1, "cursor": cursor, "started_at": self.started_at, "saved_at": now}
+        _write_atomic(self._dir / _STATE, json.dumps(state).encode())
+        self.pages += 1
+        self.cursor = cursor
+
+    def done(self) -> None:
+        """The crawl finished; its checkpoint is no longer needed."""
+        shutil.rmtree(self._dir, ignore_errors=True)
+
+
+class CheckpointStore:
+    """On-disk pagination checkpoints, one directory per crawl.
+
+    A crawl is identified by the query (models, select, filter and
+    pagination mode) plus a caller-supplied scope, as in ``ResponseCache``.
+    A client given a store records checkpoints; only a run with ``resume``
+    continues from them; any other run starts the crawl over and discards
+    the old ones. A checkpoint whose first page was saved more than ``ttl``
+    seconds ago is discarded too rather than mixed with fresh pages.
+    """
+
+    def __init__(self, directory: Path, resume: bool = False, ttl: float = DEFAULT_CACHE_TTL) -> None:
+        self._dir = directory
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._resume = resume
+        self._ttl = ttl
+
+    def _path(self, scope: str, crawl: dict) -> Path:
+        raw = json.dumps(crawl, sort_keys=True, separators=(",", ":"))
+        return self._dir / hashlib.sha256(f"{scope}\n{raw}".encode()).hexdigest()
+
+    def open(self, scope: str, crawl: dict) -> Checkpoint:
+        """Checkpoint of ``crawl``, loaded from disk when resuming."""
+        path = self._path(scope, crawl)
+        if not self._resume:
+            shutil.rmtree(path, ignore_errors=True)
+            return Checkpoint(path)
+
+        try:
+            with open(path / _STATE, "rb") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return Checkpoint(path)
+
+        age = time.time() - state.get("started_at", 0)
+        if age > self._ttl:
+            logger.warning(
+                "Not resuming crawl of models %s: its checkpoint was started %.0fs ago, more than %.0fs",
+                crawl.get("models"), age, self._ttl,
+            )
+            shutil.rmtree(path, ignore_errors=True)
+            return Checkpoint(path)
+
+        logger.info(
+            "Resuming crawl of models %s after %d saved pages (checkpointed %.0fs ago)",
+            crawl.get("models"), state.get("pages", 0), time.time() - state.get("saved_at", time.time()),
+        )
+        return Checkpoint(path, state)
+
+    def clear(self) -> None:
+        shutil.rmtree(self._dir, ignore_errors=True)
+        self._dir.mkdir(parents=True, exist_ok=True)
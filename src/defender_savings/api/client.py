@@ -1,24 +1,280 @@
+import hashlib
 import logging
+import time
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 
 import requests
+from requests.adapters import HTTPAdapter
 
-from defender_savings.config import ORCA_API_URL, ORCA_QUERY_ENDPOINT
+from defender_savings.api.cache import ResponseCache
+from defender_savings.api.checkpoint import Checkpoint, CheckpointStore
+from defender_savings.api.codec import ACCEPTED_ENCODINGS, loads
+from defender_savings.api.filters import all_of, greater_than
+from defender_savings.api.paging import PAGE_TOO_LARGE_STATUSES, PageSizer
+from defender_savings.api.projection import MINIMAL
+from defender_savings.api.transport import RETRY_STATUSES, ConcurrencyLimiter, Transport
+from defender_savings.config import DEFAULT_MAX_PAGE_SIZE, ORCA_API_URL, ORCA_QUERY_ENDPOINT
+from defender_savings.models.compact import MODEL
 
 logger = logging.getLogger(__name__)
 
+# Pagination modes. "offset" pages by start_at_index (and can fan pages out
+# in parallel); "keyset" orders by KEYSET_KEY and filters each page to the
+# rows after the last key seen, so every page costs the same server-side and
+# rows are neither skipped nor repeated when inventory changes mid-crawl.
+# Keyset paging needs KEYSET_KEY on every item, so it only applies to queries
+# that select it (the asset models); any other query pages by offset.
+OFFSET = "offset"
+KEYSET = "keyset"
+PAGINATION_MODES = (OFFSET, KEYSET)
+KEYSET_KEY = "AssetUniqueId"
+
+
+class CountUnavailableError(RuntimeError):
+    """The API did not report a total for a query requested with get_results_and_count."""
+
+
+class Page(list):
+    """The items of one response page, plus the response body they were decoded from.
+
+    ``body`` is the JSON document as received, or None for pages that were
+    not received whole (served from the cache or a checkpoint, or stitched
+    from split requests). A consumer that decodes pages elsewhere, e.g. in a
+    worker process, can ship ``body`` as it is instead of re-encoding items.
+    """
+
+    __slots__ = ("body",)
+
+    def __init__(self, items: list[dict], body: bytes | None = None) -> None:
+        super().__init__(items)
+        self.body = body
+
+
+def default_headers(api_token: str) -> dict[str, str]:
+    """HTTP headers sent with every serving-layer request."""
+    return {
+        "Authorization": f"Token {api_token}",
+        "Content-Type": "application/json",
+        "Accept": "application/json",
+    }
+
+
+def build_query_body(
+    models: list[str],
+    select: list[str],
+    limit: int,
+    start_at: int,
+    with_filter: dict | None = None,
+    with_count: bool = False,
+    order_by: list[str] | None = None,
+) -> dict:
+    """Build the JSON body for one page of a serving-layer query."""
+    body: dict = {
+        "query": {
+            "models": models,
+            "type": "object_set",
+        },
+        "limit": limit,
+        "start_at_index": start_at,
+        "select": select,
+        "get_results_and_count": with_count,
+        "full_graph_fetch": {"enabled": True},
+        "max_tier": 2,
+    }
+
+    if with_filter:
+        body["query"]["with"] = with_filter
+
+    if order_by:
+        body["order_by[]"] = order_by
+
+    return body
+
+
+def wire_size(response: requests.Response) -> int:
+    """Bytes of a response body as received, before decompression."""
+    # urllib3's tell() counts bytes read off the socket, not decoded bytes
+    raw = getattr(response, "raw", None)
+    n = raw.tell() if raw is not None and hasattr(raw, "tell") else 0
+    return n if isinstance(n, int) and n > 0 else len(response.content)
+
+
+def cache_scope(api_token: str) -> str:
+    """Cache namespace for a token, so tenants never share cached responses."""
+    return hashlib.sha256(api_token.encode()).hexdigest()
+
+
+def read_total(first_page: dict) -> int | None:
+    """Total result count from a page requested with get_results_and_count."""
+    # "total_items" is only present when get_results_and_count is honoured
+    total = first_page.get("total_items")
+    return total if isinstance(total, int) else None
+
+
+def _keyset_value(item: dict) -> str | None:
+    value = item.get("data", {}).get(KEYSET_KEY, {})
+    return value.get("value") if isinstance(value, dict) else None
+
+
+def _page_plan_key(models: list[str], select: list[str], with_filter: dict | None) -> dict:
+    """Cache key under which the page sizes of a crawl are remembered."""
+    return {"page_plan": {"models": models, "select": select, "with": with_filter}}
+
+
+def _crawl_key(models: list[str], select: list[str], with_filter: dict | None, pagination: str) -> dict:
+    """Identity of a crawl, under which its checkpoint is kept."""
+    return {"models": models, "select": select, "with": with_filter, "pagination": pagination}
+
 
 class OrcaClient:
-    """Orca Security API client using requests."""
+    """Orca Security API client using requests.
+
+    A single client may be shared between threads; ``pool_size`` bounds the
+    number of keep-alive connections the session holds open to the API.
+    ``page_workers`` is the default number of pages a single query may have
+    in flight at once (1 = strictly sequential pagination). Pages are served
+    from ``cache`` when one is given. ``projection`` is the select profile the
+    list_* fetchers plan their queries with (see api/projection.py), and
+    ``asset_form`` the classes they parse items into (see models/compact.py). With
+    ``adaptive_paging`` each crawl tunes its page size up to ``max_page_size``
+    (see api/paging.py) instead of using the fixed ``limit``. ``pagination``
+    selects offset or keyset paging for queries that select KEYSET_KEY;
+    keyset crawls are always sequential.
+    With ``checkpoints`` every page is saved as it arrives, so a crawl that
+    fails part-way can be resumed (see api/checkpoint.py). Requests go
+    through ``transport`` (see api/transport.py), by default one that
+    retries throttled and failed requests and starts at ``pool_size``
+    requests in flight. ``scope`` is a filter ANDed into every query, so a
+    scoped run only ever transfers the selected assets (see
+    filters.scope_filter).
+    """
 
-    def __init__(self, api_token: str) -> None:
+    def __init__(
+        self,
+        api_token: str,
+        pool_size: int = 10,
+        page_workers: int = 1,
+        cache: ResponseCache | None = None,
+        projection: str = MINIMAL,
+        adaptive_paging: bool = False,
+        max_page_size: int = DEFAULT_MAX_PAGE_SIZE,
+        pagination: str = OFFSET,
+        checkpoints: CheckpointStore | None = None,
+        transport: Transport | None = None,
+        scope: dict | None = None,
+        asset_form: str = MODEL,
+    ) -> None:
+        if pagination not in PAGINATION_MODES:
+            raise ValueError(f"Unknown pagination mode {pagination!r}, expected one of {PAGINATION_MODES}")
         self._session = requests.Session()
-        self._session.headers.update({
-            "Authorization": f"Token {api_token}",
-            "Content-Type": "application/json",
-            "Accept": "application/json",
-        })
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._session.headers.update(default_headers(api_token))
+        self._session.headers["Accept-Encoding"] = ACCEPTED_ENCODINGS
         self._base_url = ORCA_API_URL
         self._query_url = f"{self._base_url}{ORCA_QUERY_ENDPOINT}"
+        self._page_workers = page_workers
+        self._cache = cache
+        self._cache_scope = cache_scope(api_token)
+        self.projection = projection
+        self._adaptive_paging = adaptive_paging
+        self._max_page_size = max_page_size
+        self._pagination = pagination
+        self._checkpoints = checkpoints
+        self.transport = transport or Transport(ConcurrencyLimiter(pool_size))
+        self.scope = scope
+        self.asset_form = asset_form
+
+    def _post(self, body: dict) -> dict:
+        return self._send(body)[0]
+
+    def _send(self, body: dict) -> tuple[dict, bytes | None]:
+        """POST one page; returns the decoded response and its raw body (None if cached)."""
+        if self._cache is not None:
+            cached = self._cache.get(self._cache_scope, body)
+            if cached is not None:
+                return cached, None
+
+        logger.debug(
+            "POST %s models=%s start_at=%d limit=%d",
+            self._query_url, body["query"]["models"], body["start_at_index"], body["limit"],
+        )
+        response = self.transport.post(self._session, self._query_url, body)
+        response.raise_for_status()
+        raw = response.content
+        data = loads(raw)
+        self.transport.stats.incr("wire_bytes", wire_size(response))
+        self.transport.stats.incr("decoded_bytes", len(raw))
+
+        if self._cache is not None:
+            self._cache.put(self._cache_scope, body, data)
+        return data, raw
+
+    def _fetch_page(
+        self,
+        models: list[str],
+        select: list[str],
+        start_at: int,
+        limit: int,
+        with_filter: dict | None,
+        sizer: PageSizer | None,
+        with_count: bool = False,
+        order_by: list[str] | None = None,
+    ) -> tuple[dict, bytes | None]:
+        """Fetch ``limit`` items from ``start_at``, feeding the page sizer.
+
+        Returns the decoded response and its raw body, as ``_send`` does.
+
+        If the server rejects an adaptively sized page, the same range is
+        fetched again as two halves, so offsets already handed out for later
+        pages stay valid. A 413 splits the page at once; a server error is
+        retried at the same size by the transport first, and only splits the
+        page once every retry has failed too.
+        """
+        body = build_query_body(models, select, limit, start_at, with_filter, with_count, order_by)
+        splittable = sizer is not None and limit > sizer.min_size
+        started = time.perf_counter()
+        try:
+            data, raw = self._send(body)
+        except requests.HTTPError as e:
+            status = e.response.status_code if e.response is not None else None
+            if not splittable or status not in PAGE_TOO_LARGE_STATUSES | RETRY_STATUSES:
+                raise
+            sizer.reject(limit)
+            half = limit // 2
+            data, _ = self._fetch_page(models, select, start_at, half, with_filter, sizer, with_count, order_by)
+            if len(data.get("data", [])) == half:
+                rest, _ = self._fetch_page(
+                    models, select, start_at + half, limit - half, with_filter, sizer, order_by=order_by,
+                )
+                data = {**data, "data": data["data"] + rest.get("data", [])}
+            return data, None
+
+        if sizer is not None and raw:
+            sizer.record(limit, time.perf_counter() - started, len(raw))
+        return data, raw
+
+    def _page_sizer(self, models: list[str], select: list[str], limit: int, with_filter: dict | None) -> PageSizer | None:
+        if not self._adaptive_paging:
+            return None
+        plan = None
+        if self._cache is not None:
+            cached = self._cache.get(self._cache_scope, _page_plan_key(models, select, with_filter))
+            plan = cached.get("limits") if cached else None
+        return PageSizer(limit, max_size=self._max_page_size, plan=plan)
+
+    def _finish_page_sizer(
+        self, sizer: PageSizer | None, models: list[str], select: list[str], with_filter: dict | None,
+    ) -> None:
+        if sizer is None:
+            return
+        logger.info("Page size for models %s settled at %d over %d pages", models, sizer.size, len(sizer.used))
+        if self._cache is not None:
+            # Replaying the same sizes next run keeps page bodies, and so cache keys, identical
+            self._cache.put(self._cache_scope, _page_plan_key(models, select, with_filter), {"limits": sizer.used})
 
     def query(
         self,
@@ -26,39 +282,184 @@ class OrcaClient:
         select: list[str],
         limit: int = 100,
         with_filter: dict | None = None,
+        page_workers: int | None = None,
     ) -> list[dict]:
         """Execute a serving-layer query and return all results with pagination."""
-        all_items: list[dict] = []
-        start_at = 0
+        return list(self.iter_query(models, select, limit, with_filter, page_workers))
+
+    def count(self, models: list[str], with_filter: dict | None = None) -> int:
+        """Number of results a query would return, counted by the server.
+
+        Requests a single-row page with get_results_and_count. Raises
+        ``CountUnavailableError`` if the server does not report a total:
+        paging through the results to count them would cost more than the
+        full crawl count-only mode is meant to avoid.
+        """
+        scoped_filter = all_of(self.scope, with_filter)
+        data = self._post(build_query_body(models, ["Name"], 1, 0, scoped_filter, with_count=True))
+        total = read_total(data)
+        if total is None:
+            raise CountUnavailableError(f"The API reported no result count for models {models}")
+        return total
+
+    def iter_query(
+        self,
+        models: list[str],
+        select: list[str],
+        limit: int = 100,
+        with_filter: dict | None = None,
+        page_workers: int | None = None,
+    ) -> Iterator[dict]:
+        """Yield the items of a serving-layer query one at a time."""
+        for page in self.iter_pages(models, select, limit, with_filter, page_workers):
+            yield from page
+
+    def iter_pages(
+        self,
+        models: list[str],
+        select: list[str],
+        limit: int = 100,
+        with_filter: dict | None = None,
+        page_workers: int | None = None,
+    ) -> Iterator[list[dict]]:
+        """Yield the pages of a serving-layer query as they arrive.
+
+        Pages are always yielded in ``start_at_index`` order and nothing is
+        kept once a page has been yielded, so memory stays bounded by the
+        pages in flight. Pages fetched from the API are ``Page`` lists that
+        also carry their response body. With more than one page worker, the first page also
+        asks the server for the total result count and up to ``page_workers``
+        further pages are requested ahead of the consumer. Without a total,
+        pages are probed until a short page comes back. In keyset mode pages
+        are yielded in KEYSET_KEY order instead and fetched one at a time;
+        a query that does not select KEYSET_KEY pages by offset regardless.
+
+        With checkpoints, a resumed crawl first yields the pages saved by the
+        failed run, then continues after the last of them.
+        """
+        workers = page_workers or self._page_workers
+        with_filter = all_of(self.scope, with_filter)
+        pagination = self._pagination if KEYSET_KEY in select else OFFSET
+        sizer = self._page_sizer(models, select, limit, with_filter)
+        checkpoint = self._open_checkpoint(models, select, with_filter, pagination)
+        cursor = checkpoint.cursor if checkpoint is not None else {}
+        start_at, last_key = cursor.get("start_at", 0), cursor.get("last_key")
+        if pagination == KEYSET:
+            pages = self._iter_pages_keyset(models, select, limit, with_filter, sizer, last_key)
+        elif workers <= 1:
+            pages = self._iter_pages_sequential(models, select, limit, with_filter, sizer, start_at)
+        else:
+            pages = self._iter_pages_parallel(models, select, limit, with_filter, workers, sizer, start_at)
+
+        fetched = 0
+        if checkpoint is not None:
+            for page in checkpoint.iter_saved_pages():
+                fetched += len(page)
+                yield page
+        for page in pages:
+            fetched += len(page)
+            if checkpoint is not None:
+                last_key = _keyset_value(page[-1]) if page else last_key
+                checkpoint.save(page, {"start_at": fetched, "last_key": last_key})
+            yield page
+        logger.info("Fetched %d items for models %s", fetched, models)
+        self._finish_page_sizer(sizer, models, select, with_filter)
+        if checkpoint is not None:
+            checkpoint.done()
+
+    def _open_checkpoint(
+        self, models: list[str], select: list[str], with_filter: dict | None, pagination: str,
+    ) -> Checkpoint | None:
+        if self._checkpoints is None:
+            return None
+        return self._checkpoints.open(self._cache_scope, _crawl_key(models, select, with_filter, pagination))
 
+    def _iter_pages_sequential(
+        self,
+        models: list[str],
+        select: list[str],
+        limit: int,
+        with_filter: dict | None,
+        sizer: PageSizer | None,
+        start_at: int = 0,
+    ) -> Iterator[list[dict]]:
+        while True:
+            page_limit = sizer.next_size() if sizer else limit
+            data, raw = self._fetch_page(models, select, start_at, page_limit, with_filter, sizer)
+
+            items = Page(data.get("data", []), raw)
+            yield items
+
+            if len(items) < page_limit:
+                break
+            start_at += page_limit
+
+    def _iter_pages_keyset(
+        self,
+        models: list[str],
+        select: list[str],
+        limit: int,
+        with_filter: dict | None,
+        sizer: PageSizer | None,
+        last_key: str | None = None,
+    ) -> Iterator[list[dict]]:
+        # Order by a stable key and ask for the rows after the last one seen,
+        # instead of skipping start_at_index rows server-side on every page.
         while True:
-            body: dict = {
-                "query": {
-                    "models": models,
-                    "type": "object_set",
-                },
-                "limit": limit,
-                "start_at_index": start_at,
-                "select": select,
-                "get_results_and_count": False,
-                "full_graph_fetch": {"enabled": True},
-                "max_tier": 2,
-            }
-
-            if with_filter:
-                body["query"]["with"] = with_filter
-
-            logger.debug("POST %s models=%s start_at=%d", self._query_url, models, start_at)
-            response = self._session.post(self._query_url, json=body)
-            response.raise_for_status()
-            data = response.json()
-
-            items = data.get("data", [])
-            all_items.extend(items)
-
-            if len(items) < limit:
+            page_limit = sizer.next_size() if sizer else limit
+            page_filter = all_of(with_filter, greater_than(KEYSET_KEY, last_key) if last_key is not None else None)
+            data, raw = self._fetch_page(models, select, 0, page_limit, page_filter, sizer, order_by=[KEYSET_KEY])
+
+            items = Page(data.get("data", []), raw)
+            yield items
+
+            if len(items) < page_limit:
                 break
-            start_at += limit
+            last_key = _keyset_value(items[-1])
+            if last_key is None:
+                raise ValueError(f"Keyset pagination needs {KEYSET_KEY} on every item of models {models}")
+
+    def _iter_pages_parallel(
+        self,
+        models: list[str],
+        select: list[str],
+        limit: int,
+        with_filter: dict | None,
+        workers: int,
+        sizer: PageSizer | None,
+        start_at: int = 0,
+    ) -> Iterator[list[dict]]:
+        first_limit = sizer.next_size() if sizer else limit
+        first, raw = self._fetch_page(models, select, start_at, first_limit, with_filter, sizer, with_count=True)
+        items = Page(first.get("data", []), raw)
+        yield items
+        if len(items) < first_limit:
+            return
+
+        total = read_total(first)
+        if total is None:
+            logger.debug("No total reported for models %s, probing %d pages ahead", models, workers)
+
+        def fetch_page(start_at: int, page_limit: int) -> Page:
+            data, raw = self._fetch_page(models, select, start_at, page_limit, with_filter, sizer)
+            return Page(data.get("data", []), raw)
+
+        next_start = start_at + first_limit
+        pending: deque[tuple[int, Future[Page]]] = deque()
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="orca-page")
+        try:
+            while True:
+                # Keep the window full, but don't probe past a known total
+                # unless the model grew beyond it mid-crawl.
+                while len(pending) < workers and (total is None or next_start < total or not pending):
+                    page_limit = sizer.next_size() if sizer else limit
+                    pending.append((page_limit, pool.submit(fetch_page, next_start, page_limit)))
+                    next_start += page_limit
 
-        logger.info("Fetched %d items for models %s", len(all_items), models)
-        return all_items
+                page_limit, future = pending.popleft()
+                items = future.result()
+                yield items
+                if len(items) < page_limit:
+                    break
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
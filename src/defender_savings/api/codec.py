@@ -0,0 +1,31 @@
+import json
+import logging
+
+from urllib3.util.request import ACCEPT_ENCODING
+
+try:
+    import orjson
+except ImportError:  # optional dependency: pip install 'defender-savings[fast]'
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Content codings urllib3 can decode here: gzip and deflate always, br and
+# zstd when brotli / zstandard are installed. Never advertise one we can't read.
+ACCEPTED_ENCODINGS = ACCEPT_ENCODING
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+
+def loads(raw: bytes) -> dict:
+    """Decode a JSON document, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def dumps(data: object) -> bytes:
+    """Encode compact JSON, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":")).encode()
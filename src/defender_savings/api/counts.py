@@ -0,0 +1,97 @@
+import logging
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from defender_savings.api.client import CountUnavailableError, OrcaClient
+from defender_savings.api.filters import cloud_account_filter
+from defender_savings.api.resources import (
+    iter_app_service_pages,
+    iter_container_vcore_pages,
+    iter_key_vault_pages,
+    iter_storage_account_pages,
+    iter_virtual_machine_pages,
+)
+from defender_savings.config import DEFAULT_FETCH_WORKERS
+from defender_savings.models.resources import AzureAsset
+from defender_savings.services.mapper import ResourceCounter
+
+logger = logging.getLogger(__name__)
+
+# Model -> count key for resources billed per instance
+_COUNTED_MODELS = {
+    "AzureComputeVm": "virtual_machines",
+    "AzureWebAppService": "app_services",
+    "AzureStorageAccount": "storage_accounts",
+    "AzureKeyVault": "key_vaults",
+}
+
+# The same resources streamed in full, for servers that report no counts
+_COUNTED_PAGE_STREAMS: list[Callable[[OrcaClient], Iterator[list[AzureAsset]]]] = [
+    iter_virtual_machine_pages,
+    iter_app_service_pages,
+    iter_storage_account_pages,
+    iter_key_vault_pages,
+]
+
+
+def _count_pages(pages: Callable[[OrcaClient], Iterator[list[AzureAsset]]], client: OrcaClient) -> ResourceCounter:
+    counter = ResourceCounter()
+    for page in pages(client):
+        counter.add_page(page)
+    return counter
+
+
+def _sum_container_vcores(client: OrcaClient) -> ResourceCounter:
+    return _count_pages(iter_container_vcore_pages, client)
+
+
+def count_resources(
+    client: OrcaClient,
+    account_names: list[str],
+    max_workers: int = DEFAULT_FETCH_WORKERS,
+) -> ResourceCounter:
+    """Count billable resources per account without downloading assets.
+
+    Instance counts come from the server: one get_results_and_count request
+    per model and account, filtered on CloudAccount.Name. Container vCores
+    must be summed, so container hosts are streamed with a two-field
+    projection. The result resolves to the same counts_by_account structure
+    as a full-inventory fetch.
+
+    The first count request doubles as a probe: if the server reports no
+    total, each model is streamed and counted once instead, as a full fetch
+    would, rather than paging through it once per account.
+    """
+    counter = ResourceCounter()
+    account_names = list(dict.fromkeys(account_names))
+    queries = [(model, key, name) for model, key in _COUNTED_MODELS.items() for name in account_names]
+    streamed = []
+    sent = len(queries)
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="orca-count") as pool:
+        vcores = pool.submit(_sum_container_vcores, client)
+        if queries:
+            model, key, account_name = queries.pop(0)
+            try:
+                counter.add_count(account_name, key, client.count([model], cloud_account_filter([account_name])))
+            except CountUnavailableError as e:
+                logger.warning("%s; counting resources from full pages instead", e)
+                queries = []
+                streamed = [pool.submit(_count_pages, pages, client) for pages in _COUNTED_PAGE_STREAMS]
+        futures = {
+            pool.submit(client.count, [model], cloud_account_filter([account_name])): (account_name, key)
+            for model, key, account_name in queries
+        }
+        for future in as_completed(futures):
+            account_name, key = futures[future]
+            counter.add_count(account_name, key, future.result())
+        for future in (vcores, *streamed):
+            counter.merge(future.result())
+
+    logger.info(
+        "Counted resources for %d accounts with %d count queries in %.2fs",
+        len(account_names), sent if not streamed else 1, time.perf_counter() - start,
+    )
+    return counter
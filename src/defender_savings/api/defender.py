@@ -1,10 +1,14 @@
 import logging
+from collections.abc import Iterator
 
+from defender_savings.api.async_client import AsyncOrcaClient
 from defender_savings.api.client import OrcaClient
+from defender_savings.api.projection import plan_select
 from defender_savings.models.defender import DefenderConfig
 
 logger = logging.getLogger(__name__)
 
+# Full profile; the minimal profile only selects DefenderConfig.ORCA_FIELDS
 _DEFENDER_SELECT = [
     "Name",
     "CloudAccount.Name",
@@ -19,17 +23,35 @@ _DEFENDER_SELECT = [
 ]
 
 
-def list_defender_configs(client: OrcaClient) -> list[DefenderConfig]:
-    """Fetch all AzureDefenderForCloud objects from Orca."""
+def _select(client: OrcaClient | AsyncOrcaClient) -> list[str]:
+    return plan_select([DefenderConfig], _DEFENDER_SELECT, client.projection)
+
+
+def _parse_configs(items: list[dict]) -> list[DefenderConfig]:
+    configs = DefenderConfig.from_orca_page(items)
+    logger.info("Found %d Defender configurations", len(configs))
+    return configs
+
+
+def iter_defender_config_pages(client: OrcaClient) -> Iterator[list[DefenderConfig]]:
+    """Stream AzureDefenderForCloud objects from Orca, one list per API page."""
     logger.info("Fetching Defender for Cloud configurations")
-    items = client.query(
-        models=["AzureDefenderForCloud"],
-        select=_DEFENDER_SELECT,
-    )
+    for page in client.iter_pages(models=["AzureDefenderForCloud"], select=_select(client)):
+        yield DefenderConfig.from_orca_page(page)
 
-    configs: list[DefenderConfig] = []
-    for item in items:
-        configs.append(DefenderConfig.from_orca_response(item))
 
+def list_defender_configs(client: OrcaClient) -> list[DefenderConfig]:
+    """Fetch all AzureDefenderForCloud objects from Orca."""
+    configs = [cfg for page in iter_defender_config_pages(client) for cfg in page]
     logger.info("Found %d Defender configurations", len(configs))
     return configs
+
+
+async def list_defender_configs_async(client: AsyncOrcaClient) -> list[DefenderConfig]:
+    """Fetch all AzureDefenderForCloud objects from Orca on the event loop."""
+    logger.info("Fetching Defender for Cloud configurations")
+    items = await client.query(
+        models=["AzureDefenderForCloud"],
+        select=_select(client),
+    )
+    return _parse_configs(items)
@@ -0,0 +1,326 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from functools import partial
+
+from defender_savings.api.async_client import AsyncOrcaClient
+from defender_savings.api.client import OrcaClient
+from defender_savings.api.defender import list_defender_configs, list_defender_configs_async
+from defender_savings.api.parsing import PageParser, ParsePool
+from defender_savings.api.pipeline import pipelined
+from defender_savings.api.resources import (
+    iter_app_service_pages,
+    iter_asset_pages,
+    iter_compute_vm_pages,
+    iter_key_vault_pages,
+    iter_raw_app_service_pages,
+    iter_raw_asset_pages,
+    iter_raw_compute_vm_pages,
+    iter_raw_key_vault_pages,
+    iter_raw_storage_account_pages,
+    iter_storage_account_pages,
+    list_app_services_async,
+    list_key_vaults_async,
+    list_storage_accounts_async,
+    list_vms_and_container_hosts_async,
+    parse_asset_page,
+    parse_compute_vm_page,
+    parse_model_page,
+)
+from defender_savings.api.shards import AccountScopedClient, ShardedClient
+from defender_savings.config import DEFAULT_FETCH_WORKERS
+from defender_savings.models.defender import DefenderConfig
+from defender_savings.models.resources import AppService, AzureAsset, ContainerHost, KeyVault, StorageAccount, VirtualMachine
+from defender_savings.services.mapper import ColumnarResourceCounter, ResourceCounter
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Inventory:
+    """Everything the pipeline needs from Orca, plus per-query wall time."""
+
+    defender_configs: list[DefenderConfig]
+    vms: list[VirtualMachine]
+    app_services: list[AppService]
+    storage_accounts: list[StorageAccount]
+    key_vaults: list[KeyVault]
+    container_hosts: list[ContainerHost]
+    timings: dict[str, float] = field(default_factory=dict)
+
+    def to_counts(self) -> InventoryCounts:
+        counter = ResourceCounter()
+        for assets in (self.vms, self.app_services, self.storage_accounts, self.key_vaults, self.container_hosts):
+            counter.add_page(assets)
+        return InventoryCounts(defender_configs=self.defender_configs, counter=counter, timings=self.timings)
+
+
+@dataclass
+class InventoryCounts:
+    """Defender configs plus streamed per-account resource counts."""
+
+    defender_configs: list[DefenderConfig]
+    counter: ResourceCounter | ColumnarResourceCounter
+    timings: dict[str, float] = field(default_factory=dict)
+
+
+def _only_async(
+    name: str, fetch: Callable[[AsyncOrcaClient], Awaitable[list]],
+) -> Callable[[AsyncOrcaClient], Awaitable[dict[str, list]]]:
+    async def run(client: AsyncOrcaClient) -> dict[str, list]:
+        return {name: await fetch(client)}
+    return run
+
+
+async def _compute_vms_async(client: AsyncOrcaClient) -> dict[str, list]:
+    vms, hosts = await list_vms_and_container_hosts_async(client)
+    return {"vms": vms, "container_hosts": hosts}
+
+
+# Query name -> fetcher returning the Inventory fields it fills. Each entry
+# is one independent query; AzureComputeVm fills both VMs and container hosts.
+_ASYNC_FETCHERS: dict[str, Callable[[AsyncOrcaClient], Awaitable[dict[str, list]]]] = {
+    "defender_configs": _only_async("defender_configs", list_defender_configs_async),
+    "vms": _compute_vms_async,
+    "app_services": _only_async("app_services", list_app_services_async),
+    "storage_accounts": _only_async("storage_accounts", list_storage_accounts_async),
+    "key_vaults": _only_async("key_vaults", list_key_vaults_async),
+}
+
+
+def _compute_vm_assets(client: OrcaClient) -> Iterator[list[AzureAsset]]:
+    for vms, hosts in iter_compute_vm_pages(client):
+        yield [*vms, *hosts]
+
+
+_PAGE_STREAMS: dict[str, Callable[[OrcaClient], Iterator[list[AzureAsset]]]] = {
+    "vms": _compute_vm_assets,
+    "app_services": iter_app_service_pages,
+    "storage_accounts": iter_storage_account_pages,
+    "key_vaults": iter_key_vault_pages,
+}
+
+# The same resources as one multi-model crawl (see iter_asset_pages)
+_COMBINED_PAGE_STREAMS: dict[str, Callable[[OrcaClient], Iterator[list[AzureAsset]]]] = {
+    "assets": iter_asset_pages,
+}
+
+# The same crawls as raw pages, with the module-level parser a worker
+# process runs on each of them (see api/parsing.py)
+_RAW_PAGE_STREAMS: dict[str, tuple[Callable[[OrcaClient], Iterator[list[dict]]], PageParser]] = {
+    "vms": (iter_raw_compute_vm_pages, parse_compute_vm_page),
+    "app_services": (iter_raw_app_service_pages, partial(parse_model_page, AppService)),
+    "storage_accounts": (iter_raw_storage_account_pages, partial(parse_model_page, StorageAccount)),
+    "key_vaults": (iter_raw_key_vault_pages, partial(parse_model_page, KeyVault)),
+}
+
+_COMBINED_RAW_PAGE_STREAMS: dict[str, tuple[Callable[[OrcaClient], Iterator[list[dict]]], PageParser]] = {
+    "assets": (iter_raw_asset_pages, parse_asset_page),
+}
+
+
+def _timed[T](fetch: Callable[[OrcaClient], T], client: OrcaClient) -> tuple[T, float]:
+    start = time.perf_counter()
+    result = fetch(client)
+    return result, time.perf_counter() - start
+
+
+def _count_stream(
+    stream: Callable[[OrcaClient], Iterator[list[AzureAsset]]],
+    new_counter: Callable[[], ResourceCounter | ColumnarResourceCounter],
+    client: OrcaClient,
+) -> ResourceCounter | ColumnarResourceCounter:
+    counter = new_counter()
+    for page in stream(client):
+        counter.add_page(page)
+    return counter
+
+
+def _count_raw_stream(
+    pool: ParsePool,
+    stream: tuple[Callable[[OrcaClient], Iterator[list[dict]]], PageParser],
+    new_counter: Callable[[], ResourceCounter | ColumnarResourceCounter],
+    client: OrcaClient,
+) -> ResourceCounter | ColumnarResourceCounter:
+    raw_pages, parse = stream
+    return pool.count_pages(raw_pages(client), parse, new_counter)
+
+
+def _count_pipelined_stream(
+    stream: tuple[Callable[[OrcaClient], Iterator[list[dict]]], PageParser],
+    new_counter: Callable[[], ResourceCounter | ColumnarResourceCounter],
+    client: OrcaClient,
+) -> ResourceCounter | ColumnarResourceCounter:
+    raw_pages, parse = stream
+    counter = new_counter()
+    # Fetching, parsing and counting (this thread) each in a thread of their own
+    for assets in pipelined(raw_pages(client), lambda page: parse(page, client.asset_form)):
+        counter.add_page(assets)
+    return counter
+
+
+def count_inventory(
+    client: OrcaClient,
+    max_workers: int = DEFAULT_FETCH_WORKERS,
+    combined: bool = False,
+    shards: int = 1,
+    columnar: bool = False,
+    parse_workers: int = 0,
+    pipeline: bool = False,
+) -> InventoryCounts:
+    """Fetch Defender configs and count resources without keeping them.
+
+    All queries run concurrently over the shared client, at most
+    ``max_workers`` at once, and the first to fail re-raises its exception.
+    Each resource query streams its pages into its own ``ResourceCounter``
+    and drops them, so memory stays constant per account however large the
+    tenant is. The counters are merged at the end.
+    With ``combined`` all resource models are fetched by a single query.
+
+    With more than one shard, every resource query is split into that many
+    balanced per-account shards (see api/shards.py) run concurrently; the
+    queries wait for the Defender configs, fetched alongside them, to learn
+    the accounts, and the shards are planned once for all of them. With ``columnar`` assets are
+    counted by ``ColumnarResourceCounter`` instead. With ``parse_workers``,
+    pages are parsed and counted by that many worker processes (see
+    api/parsing.py) instead of by the fetching threads. With ``pipeline``,
+    each query fetches, parses and counts in separate threads linked by
+    bounded queues (see api/pipeline.py), so the three overlap page by page.
+    """
+    new_counter = ColumnarResourceCounter if columnar else ResourceCounter
+    parse_pool = ParsePool(parse_workers, client.asset_form) if parse_workers > 0 else None
+    raw_streams = _COMBINED_RAW_PAGE_STREAMS if combined else _RAW_PAGE_STREAMS
+    if parse_pool is not None:
+        streams = {
+            name: partial(_count_raw_stream, parse_pool, stream, new_counter) for name, stream in raw_streams.items()
+        }
+    elif pipeline:
+        streams = {name: partial(_count_pipelined_stream, stream, new_counter) for name, stream in raw_streams.items()}
+    else:
+        page_streams = _COMBINED_PAGE_STREAMS if combined else _PAGE_STREAMS
+        streams = {name: partial(_count_stream, stream, new_counter) for name, stream in page_streams.items()}
+    counter = new_counter()
+    configs: list[DefenderConfig] = []
+    timings: dict[str, float] = {}
+    start = time.perf_counter()
+
+    # The parse pool outlives the fetch threads that submit to it
+    with (
+        parse_pool or nullcontext(),
+        ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="orca-fetch") as pool,
+    ):
+        configs_future = pool.submit(_timed, list_defender_configs, client)
+        futures = {configs_future: "defender_configs"}
+        resource_client = client
+        if shards > 1:
+            resource_client = ShardedClient(
+                client, lambda: [c.cloud_account_name for c in configs_future.result()[0]], shards,
+            )
+        for name, count_stream in streams.items():
+            futures[pool.submit(_timed, count_stream, resource_client)] = name
+
+        for future in as_completed(futures):
+            name = futures[future]
+            result, timings[name] = future.result()
+            if name == "defender_configs":
+                configs = result
+                logger.info("Fetched %s: %d items in %.2fs", name, len(configs), timings[name])
+            else:
+                counter.merge(result)
+                logger.info("Counted %s in %.2fs", name, timings[name])
+
+    logger.info(
+        "Fetch stage finished in %.2fs (slowest query %.2fs, %d workers)",
+        time.perf_counter() - start, max(timings.values(), default=0.0), max_workers,
+    )
+    return InventoryCounts(defender_configs=configs, counter=counter, timings=timings)
+
+
+def iter_account_counts(
+    client: OrcaClient,
+    account_names: list[str],
+    groups: int | None = None,
+    max_workers: int = DEFAULT_FETCH_WORKERS,
+    combined: bool = False,
+    columnar: bool = False,
+) -> Iterator[tuple[list[str], ResourceCounter | ColumnarResourceCounter]]:
+    """Count resources group by group of accounts, yielding each group as soon as it is final.
+
+    The accounts are split into ``groups`` groups (one per worker by
+    default) balanced by their server-side resource counts, or evenly if
+    the server reports no counts, see ``ShardedClient.plan``; a single
+    group needs no plan. Every resource
+    query of a group runs with a CloudAccount condition ANDed in, and up to
+    ``max_workers`` queries run at a time, a group's queries concurrently as
+    on the table path. Once all of a group's queries are done its counts
+    can no longer change, so ``(account_names, counter)`` is yielded right
+    away. Accounts found to have no resources come first, in a group of
+    their own.
+    """
+    streams = _COMBINED_PAGE_STREAMS if combined else _PAGE_STREAMS
+    new_counter = ColumnarResourceCounter if columnar else ResourceCounter
+    accounts = list(dict.fromkeys(account_names))
+    groups = groups or max_workers
+    if groups == 1:
+        plan = [accounts] if accounts else []
+    else:
+        plan = ShardedClient(client, accounts, groups, max_workers).plan()
+
+    planned = {name for group in plan for name in group}
+    empty = [name for name in accounts if name not in planned]
+    if empty:
+        yield empty, new_counter()
+
+    counters = [new_counter() for _ in plan]
+    remaining = [len(streams)] * len(plan)
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="orca-group") as pool:
+        # Submitted group by group, so the first groups finish first
+        futures = {
+            pool.submit(_count_stream, stream, new_counter, AccountScopedClient(client, group)): i
+            for i, group in enumerate(plan)
+            for stream in streams.values()
+        }
+        try:
+            for future in as_completed(futures):
+                i = futures[future]
+                counters[i].merge(future.result())
+                remaining[i] -= 1
+                if not remaining[i]:
+                    yield plan[i], counters[i]
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+async def fetch_inventory_async(client: AsyncOrcaClient) -> Inventory:
+    """Run all inventory queries concurrently on the current event loop.
+
+    Concurrency is bounded by the client's connection pool rather than a
+    worker count.
+    """
+    start = time.perf_counter()
+
+    async def timed(
+        name: str, fetch: Callable[[AsyncOrcaClient], Awaitable[dict[str, list]]],
+    ) -> tuple[dict[str, list], float]:
+        query_start = time.perf_counter()
+        fields = await fetch(client)
+        elapsed = time.perf_counter() - query_start
+        logger.info("Fetched %s: %d items in %.2fs", name, sum(len(items) for items in fields.values()), elapsed)
+        return fields, elapsed
+
+    outcomes = await asyncio.gather(*(timed(name, fetch) for name, fetch in _ASYNC_FETCHERS.items()))
+    results = {k: v for fields, _ in outcomes for k, v in fields.items()}
+    timings = {name: elapsed for name, (_, elapsed) in zip(_ASYNC_FETCHERS, outcomes)}
+
+    logger.info(
+        "Fetch stage finished in %.2fs (slowest query %.2fs)",
+        time.perf_counter() - start, max(timings.values(), default=0.0),
+    )
+    return Inventory(**results, timings=timings)
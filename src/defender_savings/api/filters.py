@@ -0,0 +1,73 @@
+# Builders for the "with" filter of serving-layer queries.
+
+
+def all_of(*filters: dict | None) -> dict | None:
+    """Combine filters with "and", skipping empty ones."""
+    present = [f for f in filters if f]
+    if not present:
+        return None
+    if len(present) == 1:
+        return present[0]
+    return {
+        "operator": "and",
+        "type": "operation",
+        "values": present,
+    }
+
+
+def greater_than(key: str, value: str) -> dict:
+    """Match rows whose string field ``key`` sorts after ``value``."""
+    return {
+        "key": key,
+        "values": [value],
+        "type": "str",
+        "operator": "gt",
+    }
+
+
+def _related_in(keys: list[str], model: str, type_: str, key: str, values: list[str]) -> dict:
+    return {
+        "keys": keys,
+        "models": [model],
+        "type": type_,
+        "operator": "has",
+        "with": {
+            "key": key,
+            "values": values,
+            "type": "str",
+            "operator": "in",
+        },
+    }
+
+
+def cloud_account_filter(account_names: list[str]) -> dict:
+    """Restrict a query to assets whose CloudAccount.Name is one of ``account_names``."""
+    return _related_in(["CloudAccount"], "CloudAccount", "object", "Name", account_names)
+
+
+def subscription_filter(subscription_ids: list[str]) -> dict:
+    """Restrict a query to assets in the Azure subscriptions ``subscription_ids``."""
+    # An Azure cloud account's provider id is its subscription id
+    return _related_in(["CloudAccount"], "CloudAccount", "object", "CloudProviderId", subscription_ids)
+
+
+def business_unit_filter(names: list[str]) -> dict:
+    """Restrict a query to assets in any of the Orca business units ``names``."""
+    return _related_in(["BusinessUnits"], "BusinessUnit", "object_set", "Name", names)
+
+
+def scope_filter(
+    accounts: list[str] | None = None,
+    subscriptions: list[str] | None = None,
+    business_units: list[str] | None = None,
+) -> dict | None:
+    """Filter for a scoped run: assets matching every kind of selector given.
+
+    Several values of one selector match any of them. None when nothing is
+    selected, i.e. the whole tenant.
+    """
+    return all_of(
+        cloud_account_filter(accounts) if accounts else None,
+        subscription_filter(subscriptions) if subscriptions else None,
+        business_unit_filter(business_units) if business_units else None,
+    )
@@ -0,0 +1,96 @@
+import logging
+import threading
+
+from defender_savings.config import (
+    DEFAULT_MAX_PAGE_BYTES,
+    DEFAULT_MAX_PAGE_SIZE,
+    DEFAULT_MIN_PAGE_SIZE,
+    DEFAULT_PAGE_CEILING_PROBE,
+    DEFAULT_TARGET_PAGE_LATENCY,
+)
+
+logger = logging.getLogger(__name__)
+
+# Status codes that say a page was too large to serve. Generic server and
+# gateway errors are not evidence of that on their own: they are retried.
+PAGE_TOO_LARGE_STATUSES = frozenset({413})
+
+
+class PageSizer:
+    """Chooses the ``limit`` of each page of one crawl.
+
+    The size doubles while pages come back in under half the target latency
+    and a doubled page would stay under the payload cap, and halves when a
+    page is slower than the target or larger than the cap. A rejected page
+    also lowers the ceiling, so the crawl does not grow straight back into
+    it; after ``probe_after`` fast pages at the lowered ceiling it is
+    doubled again (up to ``max_size``), so one unlucky rejection does not
+    cap the rest of the crawl.
+
+    ``plan`` replays the sizes of an earlier crawl of the same query, so
+    page bodies (and hence cache keys) repeat exactly; adaptation resumes
+    if the plan runs out. ``used`` records every size handed out. Safe to
+    share between the threads fetching pages of the same crawl.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        min_size: int = DEFAULT_MIN_PAGE_SIZE,
+        max_size: int = DEFAULT_MAX_PAGE_SIZE,
+        target_latency: float = DEFAULT_TARGET_PAGE_LATENCY,
+        max_page_bytes: int = DEFAULT_MAX_PAGE_BYTES,
+        plan: list[int] | None = None,
+        probe_after: int = DEFAULT_PAGE_CEILING_PROBE,
+    ) -> None:
+        self.min_size = min_size
+        self._max_size = max_size
+        self._ceiling = max_size
+        self._probe_after = probe_after
+        self._fast_at_ceiling = 0
+        self._size = max(min_size, min(initial, max_size))
+        self._target_latency = target_latency
+        self._max_page_bytes = max_page_bytes
+        self._plan = list(plan or [])
+        self.used: list[int] = []
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def next_size(self) -> int:
+        """Size of the next page to request."""
+        with self._lock:
+            if len(self.used) < len(self._plan):
+                self._size = self._plan[len(self.used)]
+            self.used.append(self._size)
+            return self._size
+
+    def record(self, limit: int, latency: float, n_bytes: int) -> None:
+        """Adapt to a page of ``limit`` items that took ``latency`` seconds and ``n_bytes`` bytes."""
+        with self._lock:
+            if len(self.used) <= len(self._plan):
+                return  # still replaying
+            if latency > self._target_latency or n_bytes > self._max_page_bytes:
+                self._size = max(self.min_size, min(self._size, limit) // 2)
+            elif (
+                limit == self._size
+                and latency < self._target_latency / 2
+                and n_bytes * 2 <= self._max_page_bytes
+            ):
+                if self._size == self._ceiling < self._max_size:
+                    self._fast_at_ceiling += 1
+                    if self._fast_at_ceiling >= self._probe_after:
+                        self._ceiling = min(self._max_size, self._ceiling * 2)
+                        self._fast_at_ceiling = 0
+                        logger.debug("Page size ceiling raised to %d", self._ceiling)
+                self._size = min(self._ceiling, self._size * 2)
+
+    def reject(self, limit: int) -> None:
+        """The server refused a page of ``limit`` items."""
+        with self._lock:
+            self._ceiling = max(self.min_size, limit // 2)
+            self._size = min(self._size, self._ceiling)
+            self._fast_at_ceiling = 0
+        logger.debug("Page of %d rejected, page size ceiling now %d", limit, self._ceiling)
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing
+from collections import deque
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from defender_savings.api.client import Page
+from defender_savings.api.codec import dumps, loads
+from defender_savings.services.mapper import ColumnarResourceCounter, ResourceCounter
+
+logger = logging.getLogger(__name__)
+
+# Parses one raw page in the given asset form, e.g. resources.parse_asset_page
+type PageParser = Callable[[list[dict], str], list]
+type CounterFactory = Callable[[], ResourceCounter | ColumnarResourceCounter]
+
+
+def count_raw_page(
+    new_counter: CounterFactory, parse: PageParser, form: str, raw: bytes,
+) -> ResourceCounter | ColumnarResourceCounter:
+    """Decode, parse and count one page's response body; runs in a worker process.
+
+    Only the encoded response goes in and only the page's per-account counts
+    come back, never the items or the assets parsed from them.
+    """
+    counter = new_counter()
+    counter.add_page(parse(loads(raw).get("data", []), form))
+    return counter
+
+
+def _response_body(page: list[dict]) -> bytes:
+    """The response body a page was decoded from, re-encoded only if the client didn't keep it."""
+    body = page.body if isinstance(page, Page) else None
+    return body if body is not None else dumps({"data": page})
+
+
+class ParsePool:
+    """Parses and counts pages in worker processes, off the fetching threads' GIL.
+
+    Each page is handed to a worker as the response body it was received
+    as (bytes pickle as a single buffer copy rather than object by object),
+    so the fetching thread does no per-item work for it; only pages that
+    were not received whole, e.g. served from the cache, are re-encoded.
+    Each comes back as a per-account partial counter that is merged on
+    arrival. Workers are spawned rather than forked, as the fetch threads
+    may hold locks at the time. One pool may be shared by several crawls at
+    once.
+    """
+
+    def __init__(self, workers: int, asset_form: str) -> None:
+        self.workers = workers
+        self._asset_form = asset_form
+        self._pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def count_pages(
+        self,
+        pages: Iterable[list[dict]],
+        parse: PageParser,
+        new_counter: CounterFactory = ResourceCounter,
+    ) -> ResourceCounter | ColumnarResourceCounter:
+        """Count every page of a crawl, with at most two pages per worker in flight."""
+        counter = new_counter()
+        pending: deque[Future] = deque()
+        for page in pages:
+            if len(pending) >= 2 * self.workers:
+                counter.merge(pending.popleft().result())
+            pending.append(
+                self._pool.submit(count_raw_page, new_counter, parse, self._asset_form, _response_body(page)),
+            )
+        while pending:
+            counter.merge(pending.popleft().result())
+        return counter
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self) -> ParsePool:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
@@ -0,0 +1,106 @@
+import logging
+import queue
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from typing import Any
+
+from defender_savings.config import DEFAULT_PIPELINE_DEPTH
+
+logger = logging.getLogger(__name__)
+
+_END = object()
+
+
+class _Failed:
+    """An exception raised by a stage, passed downstream in place of its output."""
+
+    def __init__(self, error: Exception) -> None:
+        self.error = error
+
+
+def pipelined(
+    source: Iterable[Any],
+    *stages: Callable[[Any], Any],
+    depth: int = DEFAULT_PIPELINE_DEPTH,
+) -> Iterator[Any]:
+    """Yield each item of ``source`` after passing it through ``stages`` in turn.
+
+    Iterating ``source`` and every stage run in threads of their own,
+    linked by queues holding at most ``depth`` items, so while the caller
+    consumes item N the last stage already works on N+1 and the source
+    fetches further ahead. A full queue blocks the thread feeding it: the
+    pipeline runs at the pace of its slowest stage and holds no more than
+    ``depth`` items per link. Items come out in source order.
+
+    The first exception raised by the source or a stage is re-raised to
+    the caller. Once the caller stops iterating, for whatever reason, every
+    thread finishes the item in hand and exits.
+    """
+    stop = threading.Event()
+    links: list[queue.Queue] = [queue.Queue(maxsize=depth) for _ in range(len(stages) + 1)]
+
+    def put(link: queue.Queue, item: object) -> bool:
+        while not stop.is_set():
+            try:
+                link.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def get(link: queue.Queue) -> object:
+        while not stop.is_set():
+            try:
+                return link.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _END
+
+    def feed() -> None:
+        items = iter(source)
+        try:
+            for item in items:
+                if not put(links[0], item):
+                    return
+        except Exception as e:
+            put(links[0], _Failed(e))
+            return
+        finally:
+            close = getattr(items, "close", None)
+            if close is not None:
+                close()
+        put(links[0], _END)
+
+    def run(stage: Callable[[Any], Any], inbox: queue.Queue, outbox: queue.Queue) -> None:
+        while True:
+            item = get(inbox)
+            if item is _END or isinstance(item, _Failed):
+                put(outbox, item)
+                return
+            try:
+                result = stage(item)
+            except Exception as e:
+                put(outbox, _Failed(e))
+                return
+            if not put(outbox, result):
+                return
+
+    threads = [threading.Thread(target=feed, name="pipeline-source")]
+    threads += [
+        threading.Thread(target=run, args=(stage, links[i], links[i + 1]), name=f"pipeline-stage-{i}")
+        for i, stage in enumerate(stages)
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        while True:
+            item = get(links[-1])
+            if item is _END:
+                return
+            if isinstance(item, _Failed):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
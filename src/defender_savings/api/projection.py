@@ -0,0 +1,22 @@
+from collections.abc import Iterable
+
+# Projection profiles. "minimal" selects only the fields the requested models
+# actually read; "full" keeps the original, much wider select lists, which is
+# handy when debugging a query against the Orca console.
+MINIMAL = "minimal"
+FULL = "full"
+PROFILES = (MINIMAL, FULL)
+
+
+def plan_select(outputs: Iterable[type], full: list[str], profile: str = MINIMAL) -> list[str]:
+    """Fields to request for a query that feeds the given model classes.
+
+    Each output declares what it reads in ``ORCA_FIELDS``; the plan is their
+    union, in declaration order. With the full profile ``full`` is returned
+    unchanged.
+    """
+    if profile == FULL:
+        return full
+    if profile != MINIMAL:
+        raise ValueError(f"Unknown projection profile {profile!r}, expected one of {PROFILES}")
+    return list(dict.fromkeys(field for cls in outputs for field in cls.ORCA_FIELDS))
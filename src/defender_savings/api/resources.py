@@ -1,10 +1,23 @@
 import logging
+from collections.abc import Iterator
 
+from defender_savings.api.async_client import AsyncOrcaClient
 from defender_savings.api.client import OrcaClient
-from defender_savings.models.resources import AppService, ContainerHost, KeyVault, StorageAccount, VirtualMachine
+from defender_savings.api.projection import plan_select
+from defender_savings.models.compact import MODEL, asset_class
+from defender_savings.models.resources import (
+    AppService,
+    AzureAsset,
+    ContainerHost,
+    KeyVault,
+    StorageAccount,
+    VirtualMachine,
+)
 
 logger = logging.getLogger(__name__)
 
+# Full-profile select lists. The minimal profile (the default) requests only
+# the ORCA_FIELDS each model declares; see api/projection.py.
 _ASSET_SELECT = [
     "Name",
     "CloudAccount.Name",
@@ -46,6 +59,28 @@ _CONTAINER_HOST_SELECT = [
     "PublicIps",
 ]
 
+# AzureComputeVm is fetched once with the union of both select lists; container
+# hosts are then picked out client-side with ContainerHost.is_container_host.
+_COMPUTE_VM_SELECT = list(dict.fromkeys(_ASSET_SELECT + _CONTAINER_HOST_SELECT))
+
+# Just enough to attribute a container host's vCores to its account
+_CONTAINER_VCORE_SELECT = [
+    "CloudAccount.Name",
+    "VCpuCount",
+]
+
+# Models fetched together by iter_asset_pages, and the class each item of
+# that crawl is parsed into, keyed by the item's "type".
+_ASSET_MODELS: dict[str, type[AzureAsset]] = {
+    "AzureComputeVm": VirtualMachine,
+    "AzureWebAppService": AppService,
+    "AzureStorageAccount": StorageAccount,
+    "AzureKeyVault": KeyVault,
+}
+
+# Every model the resource queries crawl
+RESOURCE_MODELS = list(_ASSET_MODELS)
+
 _CONTAINER_HOST_FILTER = {
     "operator": "and",
     "type": "operation",
@@ -66,40 +101,246 @@ _CONTAINER_HOST_FILTER = {
 }
 
 
+def _select(
+    client: OrcaClient | AsyncOrcaClient,
+    *outputs: type[AzureAsset],
+    full: list[str] = _ASSET_SELECT,
+) -> list[str]:
+    return plan_select(outputs, full, client.projection)
+
+
+def parse_model_page(model: type[AzureAsset], page: list[dict], form: str = MODEL) -> list[AzureAsset]:
+    """Parse a page of one model's raw items in the given asset form (see models/compact.py)."""
+    return asset_class(model, form).from_orca_page(page)
+
+
+def _compute_vm_select(client: OrcaClient | AsyncOrcaClient) -> list[str]:
+    return _select(client, VirtualMachine, ContainerHost, full=_COMPUTE_VM_SELECT)
+
+
+def iter_virtual_machine_pages(client: OrcaClient) -> Iterator[list[VirtualMachine]]:
+    """Stream Azure VMs from Orca, one list per API page."""
+    logger.info("Fetching Azure VMs")
+    for page in client.iter_pages(models=["AzureComputeVm"], select=_select(client, VirtualMachine)):
+        yield parse_model_page(VirtualMachine, page, client.asset_form)
+
+
+def iter_raw_app_service_pages(client: OrcaClient) -> Iterator[list[dict]]:
+    """Stream raw Azure App Services items from Orca, one list per API page."""
+    logger.info("Fetching Azure App Services")
+    yield from client.iter_pages(models=["AzureWebAppService"], select=_select(client, AppService))
+
+
+def iter_app_service_pages(client: OrcaClient) -> Iterator[list[AppService]]:
+    """Stream Azure App Services from Orca, one list per API page."""
+    for page in iter_raw_app_service_pages(client):
+        yield parse_model_page(AppService, page, client.asset_form)
+
+
+def iter_raw_storage_account_pages(client: OrcaClient) -> Iterator[list[dict]]:
+    """Stream raw Azure Storage Accounts items from Orca, one list per API page."""
+    logger.info("Fetching Azure Storage Accounts")
+    yield from client.iter_pages(models=["AzureStorageAccount"], select=_select(client, StorageAccount))
+
+
+def iter_storage_account_pages(client: OrcaClient) -> Iterator[list[StorageAccount]]:
+    """Stream Azure Storage Accounts from Orca, one list per API page."""
+    for page in iter_raw_storage_account_pages(client):
+        yield parse_model_page(StorageAccount, page, client.asset_form)
+
+
+def iter_raw_key_vault_pages(client: OrcaClient) -> Iterator[list[dict]]:
+    """Stream raw Azure Key Vaults items from Orca, one list per API page."""
+    logger.info("Fetching Azure Key Vaults")
+    yield from client.iter_pages(models=["AzureKeyVault"], select=_select(client, KeyVault))
+
+
+def iter_key_vault_pages(client: OrcaClient) -> Iterator[list[KeyVault]]:
+    """Stream Azure Key Vaults from Orca, one list per API page."""
+    for page in iter_raw_key_vault_pages(client):
+        yield parse_model_page(KeyVault, page, client.asset_form)
+
+
+def iter_container_host_pages(client: OrcaClient) -> Iterator[list[ContainerHost]]:
+    """Stream Azure VMs with containers and VCpuCount available, one list per API page."""
+    logger.info("Fetching container hosts (Azure VMs with containers)")
+    pages = client.iter_pages(
+        models=["AzureComputeVm"],
+        select=_select(client, ContainerHost, full=_CONTAINER_HOST_SELECT),
+        with_filter=_CONTAINER_HOST_FILTER,
+    )
+    for page in pages:
+        yield parse_model_page(ContainerHost, page, client.asset_form)
+
+
+def iter_container_vcore_pages(client: OrcaClient) -> Iterator[list[ContainerHost]]:
+    """Stream container hosts with only the fields needed to sum vCores.
+
+    Name and asset id fall back to the item's top-level name and id.
+    """
+    logger.info("Fetching container host vCores")
+    pages = client.iter_pages(
+        models=["AzureComputeVm"],
+        select=_CONTAINER_VCORE_SELECT,
+        with_filter=_CONTAINER_HOST_FILTER,
+    )
+    for page in pages:
+        yield parse_model_page(ContainerHost, page, client.asset_form)
+
+
+def _split_compute_vm_page(page: list[dict], form: str = MODEL) -> tuple[list[VirtualMachine], list[ContainerHost]]:
+    vms = parse_model_page(VirtualMachine, page, form)
+    hosts = parse_model_page(ContainerHost, [item for item in page if ContainerHost.is_container_host(item)], form)
+    return vms, hosts
+
+
+def parse_compute_vm_page(page: list[dict], form: str = MODEL) -> list[AzureAsset]:
+    """Parse a raw AzureComputeVm page into its VMs followed by the container hosts among them."""
+    vms, hosts = _split_compute_vm_page(page, form)
+    return [*vms, *hosts]
+
+
+def iter_raw_compute_vm_pages(client: OrcaClient) -> Iterator[list[dict]]:
+    """Stream raw AzureComputeVm items with the fields of both VMs and container hosts."""
+    logger.info("Fetching Azure VMs and container hosts")
+    yield from client.iter_pages(models=["AzureComputeVm"], select=_compute_vm_select(client))
+
+
+def iter_compute_vm_pages(client: OrcaClient) -> Iterator[tuple[list[VirtualMachine], list[ContainerHost]]]:
+    """Stream Azure VMs and the container hosts among them from one crawl.
+
+    Yields ``(vms, container_hosts)`` per API page. Counts match running
+    ``iter_virtual_machine_pages`` and ``iter_container_host_pages``
+    separately, but AzureComputeVm is only downloaded once.
+    """
+    for page in iter_raw_compute_vm_pages(client):
+        yield _split_compute_vm_page(page, client.asset_form)
+
+
+def parse_asset_page(page: list[dict], form: str = MODEL) -> list[AzureAsset]:
+    """Parse a raw page of the combined crawl, each item by the class matching its "type"."""
+    by_type: dict[str, list[dict]] = {name: [] for name in _ASSET_MODELS}
+    hosts: list[dict] = []
+    order: list[tuple[str, bool]] = []  # (type, is container host) of each item kept
+    for item in page:
+        item_type = item.get("type", "")
+        if item_type not in by_type:
+            logger.warning("Skipping item %s of unexpected type %r", item.get("id"), item.get("type"))
+            continue
+        by_type[item_type].append(item)
+        is_host = item_type == "AzureComputeVm" and ContainerHost.is_container_host(item)
+        if is_host:
+            hosts.append(item)
+        order.append((item_type, is_host))
+
+    # One validation pass per type, then back into page order with each
+    # container host right after its VM
+    parsed = {name: iter(parse_model_page(_ASSET_MODELS[name], items, form)) for name, items in by_type.items()}
+    parsed_hosts = iter(parse_model_page(ContainerHost, hosts, form))
+    assets: list[AzureAsset] = []
+    for item_type, is_host in order:
+        assets.append(next(parsed[item_type]))
+        if is_host:
+            assets.append(next(parsed_hosts))
+    return assets
+
+
+def iter_raw_asset_pages(client: OrcaClient) -> Iterator[list[dict]]:
+    """Stream raw items of every resource model from one crawl (see iter_asset_pages)."""
+    logger.info("Fetching Azure VMs, container hosts, App Services, Storage Accounts and Key Vaults")
+    select = _select(client, ContainerHost, *_ASSET_MODELS.values(), full=_COMPUTE_VM_SELECT)
+    yield from client.iter_pages(models=list(_ASSET_MODELS), select=select)
+
+
+def iter_asset_pages(client: OrcaClient) -> Iterator[list[AzureAsset]]:
+    """Stream VMs, container hosts, App Services, Storage Accounts and Key Vaults from one crawl.
+
+    All four models are requested in a single paginated query and each item
+    is parsed by the class matching its "type", so a small tenant needs a
+    page or two instead of one crawl per model.
+    """
+    for page in iter_raw_asset_pages(client):
+        yield parse_asset_page(page, client.asset_form)
+
+
 def list_virtual_machines(client: OrcaClient) -> list[VirtualMachine]:
     """Fetch Azure VMs from Orca."""
-    logger.info("Fetching Azure VMs")
-    items = client.query(models=["AzureComputeVm"], select=_ASSET_SELECT)
-    return [VirtualMachine.from_orca_response(item) for item in items]
+    return [vm for page in iter_virtual_machine_pages(client) for vm in page]
 
 
 def list_app_services(client: OrcaClient) -> list[AppService]:
     """Fetch Azure App Services from Orca."""
-    logger.info("Fetching Azure App Services")
-    items = client.query(models=["AzureWebAppService"], select=_ASSET_SELECT)
-    return [AppService.from_orca_response(item) for item in items]
+    return [app for page in iter_app_service_pages(client) for app in page]
 
 
 def list_storage_accounts(client: OrcaClient) -> list[StorageAccount]:
     """Fetch Azure Storage Accounts from Orca."""
-    logger.info("Fetching Azure Storage Accounts")
-    items = client.query(models=["AzureStorageAccount"], select=_ASSET_SELECT)
-    return [StorageAccount.from_orca_response(item) for item in items]
+    return [sa for page in iter_storage_account_pages(client) for sa in page]
 
 
 def list_key_vaults(client: OrcaClient) -> list[KeyVault]:
     """Fetch Azure Key Vaults from Orca."""
-    logger.info("Fetching Azure Key Vaults")
-    items = client.query(models=["AzureKeyVault"], select=_ASSET_SELECT)
-    return [KeyVault.from_orca_response(item) for item in items]
+    return [kv for page in iter_key_vault_pages(client) for kv in page]
 
 
 def list_container_hosts(client: OrcaClient) -> list[ContainerHost]:
     """Fetch Azure VMs with containers and VCpuCount available."""
+    return [host for page in iter_container_host_pages(client) for host in page]
+
+
+def list_vms_and_container_hosts(client: OrcaClient) -> tuple[list[VirtualMachine], list[ContainerHost]]:
+    """Fetch Azure VMs and the container hosts among them with one crawl."""
+    vms: list[VirtualMachine] = []
+    hosts: list[ContainerHost] = []
+    for page_vms, page_hosts in iter_compute_vm_pages(client):
+        vms.extend(page_vms)
+        hosts.extend(page_hosts)
+    return vms, hosts
+
+
+async def list_vms_and_container_hosts_async(
+    client: AsyncOrcaClient,
+) -> tuple[list[VirtualMachine], list[ContainerHost]]:
+    """Fetch Azure VMs and the container hosts among them with one crawl, on the event loop."""
+    logger.info("Fetching Azure VMs and container hosts")
+    items = await client.query(models=["AzureComputeVm"], select=_compute_vm_select(client))
+    return _split_compute_vm_page(items, client.asset_form)
+
+
+async def list_virtual_machines_async(client: AsyncOrcaClient) -> list[VirtualMachine]:
+    """Fetch Azure VMs from Orca on the event loop."""
+    logger.info("Fetching Azure VMs")
+    items = await client.query(models=["AzureComputeVm"], select=_select(client, VirtualMachine))
+    return parse_model_page(VirtualMachine, items, client.asset_form)
+
+
+async def list_app_services_async(client: AsyncOrcaClient) -> list[AppService]:
+    """Fetch Azure App Services from Orca on the event loop."""
+    logger.info("Fetching Azure App Services")
+    items = await client.query(models=["AzureWebAppService"], select=_select(client, AppService))
+    return parse_model_page(AppService, items, client.asset_form)
+
+
+async def list_storage_accounts_async(client: AsyncOrcaClient) -> list[StorageAccount]:
+    """Fetch Azure Storage Accounts from Orca on the event loop."""
+    logger.info("Fetching Azure Storage Accounts")
+    items = await client.query(models=["AzureStorageAccount"], select=_select(client, StorageAccount))
+    return parse_model_page(StorageAccount, items, client.asset_form)
+
+
+async def list_key_vaults_async(client: AsyncOrcaClient) -> list[KeyVault]:
+    """Fetch Azure Key Vaults from Orca on the event loop."""
+    logger.info("Fetching Azure Key Vaults")
+    items = await client.query(models=["AzureKeyVault"], select=_select(client, KeyVault))
+    return parse_model_page(KeyVault, items, client.asset_form)
+
+
+async def list_container_hosts_async(client: AsyncOrcaClient) -> list[ContainerHost]:
+    """Fetch Azure VMs with containers and VCpuCount available, on the event loop."""
     logger.info("Fetching container hosts (Azure VMs with containers)")
-    items = client.query(
+    items = await client.query(
         models=["AzureComputeVm"],
-        select=_CONTAINER_HOST_SELECT,
+        select=_select(client, ContainerHost, full=_CONTAINER_HOST_SELECT),
         with_filter=_CONTAINER_HOST_FILTER,
     )
-    return [ContainerHost.from_orca_response(item) for item in items]
+    return parse_model_page(ContainerHost, items, client.asset_form)
@@ -0,0 +1,212 @@
+import heapq
+import logging
+import queue
+import threading
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+
+from defender_savings.api.client import CountUnavailableError, OrcaClient
+from defender_savings.api.filters import all_of, cloud_account_filter
+from defender_savings.api.resources import RESOURCE_MODELS
+
+logger = logging.getLogger(__name__)
+
+_SHARD_DONE = object()
+
+
+def plan_shards(sizes: dict[str, int], n_shards: int) -> list[list[str]]:
+    """Split accounts into at most ``n_shards`` groups of similar total size.
+
+    Greedy longest-processing-time: the largest accounts are placed first,
+    each into the currently smallest shard, so one big subscription ends up
+    alone rather than next to other large ones. Empty accounts are dropped.
+    """
+    accounts = sorted((n, name) for name, n in sizes.items() if n > 0)
+    shards: list[tuple[int, int, list[str]]] = [(0, i, []) for i in range(min(n_shards, len(accounts)))]
+    for size, name in reversed(accounts):
+        total, i, names = heapq.heappop(shards)
+        names.append(name)
+        heapq.heappush(shards, (total + size, i, names))
+    return [sorted(names) for _, _, names in sorted(shards, key=lambda s: s[1])]
+
+
+def split_evenly(accounts: list[str], n_shards: int) -> list[list[str]]:
+    """Deal accounts round-robin into at most ``n_shards`` groups, for when their sizes are unknown."""
+    return [sorted(accounts[i::n_shards]) for i in range(min(n_shards, len(accounts)))]
+
+
+class AccountScopedClient:
+    """View of an ``OrcaClient`` that only sees the given cloud accounts.
+
+    Same ``iter_pages`` / ``query`` / ``count`` contract, with a
+    CloudAccount condition ANDed into every query's filter.
+    """
+
+    def __init__(self, client: OrcaClient, account_names: list[str]) -> None:
+        self._client = client
+        self.account_names = account_names
+        self.projection = client.projection
+        self.asset_form = client.asset_form
+
+    def _filter(self, with_filter: dict | None) -> dict:
+        return all_of(with_filter, cloud_account_filter(self.account_names))
+
+    def query(
+        self,
+        models: list[str],
+        select: list[str],
+        limit: int = 100,
+        with_filter: dict | None = None,
+        page_workers: int | None = None,
+    ) -> list[dict]:
+        return [item for page in self.iter_pages(models, select, limit, with_filter, page_workers) for item in page]
+
+    def count(self, models: list[str], with_filter: dict | None = None) -> int:
+        return self._client.count(models, self._filter(with_filter))
+
+    def iter_pages(
+        self,
+        models: list[str],
+        select: list[str],
+        limit: int = 100,
+        with_filter: dict | None = None,
+        page_workers: int | None = None,
+    ) -> Iterator[list[dict]]:
+        return self._client.iter_pages(models, select, limit, self._filter(with_filter), page_workers)
+
+
+class ShardedClient:
+    """Runs each query as concurrent per-account shards over an ``OrcaClient``.
+
+    Same ``iter_pages`` / ``query`` contract as ``OrcaClient``, for the
+    list_* and iter_* fetchers. The accounts are grouped into ``shards``
+    shards once, balanced by one server-side count per account across
+    ``size_models``, and that plan is reused by every query: each shard is
+    crawled with a CloudAccount condition ANDed into the query's filter.
+    With no more accounts than shards nothing needs balancing, so each
+    account is its own shard and no counts are sent; if the server reports
+    no counts, the accounts are split evenly instead. Pages are yielded as
+    any shard produces them, so they are no longer in ``start_at_index``
+    order. Assets outside ``account_names`` are not fetched.
+
+    ``account_names`` may also be a callable, called once when the first
+    query is planned, so queries can be started before the account list is
+    known (e.g. while the Defender configs are still being fetched).
+    """
+
+    def __init__(
+        self,
+        client: OrcaClient,
+        account_names: list[str] | Callable[[], list[str]],
+        shards: int,
+        max_workers: int | None = None,
+        size_models: list[str] = RESOURCE_MODELS,
+    ) -> None:
+        self._client = client
+        self._account_names = account_names
+        self._shards = shards
+        self._max_workers = max_workers or shards
+        self._size_models = size_models
+        self._plan: list[list[str]] | None = None
+        self._plan_lock = threading.Lock()
+        self.projection = client.projection
+        self.asset_form = client.asset_form
+
+    def _accounts(self) -> list[str]:
+        names = self._account_names() if callable(self._account_names) else self._account_names
+        return list(dict.fromkeys(names))
+
+    def _account_sizes(self, accounts: list[str]) -> dict[str, int]:
+        def count(name: str) -> int:
+            return AccountScopedClient(self._client, [name]).count(self._size_models)
+
+        with ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="orca-shard-size") as pool:
+            return dict(zip(accounts, pool.map(count, accounts)))
+
+    def plan(self) -> list[list[str]]:
+        """Account shards shared by every query, planned on first use."""
+        with self._plan_lock:
+            if self._plan is None:
+                accounts = self._accounts()
+                if len(accounts) <= self._shards:
+                    self._plan = [[name] for name in accounts]
+                    logger.info("Sharding %d accounts one per shard", len(accounts))
+                else:
+                    try:
+                        sizes = self._account_sizes(accounts)
+                    except CountUnavailableError as e:
+                        logger.warning("%s; splitting %d accounts evenly into shards instead", e, len(accounts))
+                        self._plan = split_evenly(accounts, self._shards)
+                    else:
+                        self._plan = plan_shards(sizes, self._shards)
+                        logger.info(
+                            "Sharding models %s into %d shards of %s items",
+                            self._size_models, len(self._plan),
+                            [sum(sizes[name] for name in shard) for shard in self._plan],
+                        )
+            return self._plan
+
+    def query(
+        self,
+        models: list[str],
+        select: list[str],
+        limit: int = 100,
+        with_filter: dict | None = None,
+        page_workers: int | None = None,
+    ) -> list[dict]:
+        """Execute a sharded serving-layer query and return all results."""
+        return [item for page in self.iter_pages(models, select, limit, with_filter, page_workers) for item in page]
+
+    def iter_pages(
+        self,
+        models: list[str],
+        select: list[str],
+        limit: int = 100,
+        with_filter: dict | None = None,
+        page_workers: int | None = None,
+    ) -> Iterator[list[dict]]:
+        """Yield the pages of every shard of a query as they arrive."""
+        shards = self.plan()
+        if not shards:
+            return
+
+        # Bounded, so memory stays at a few pages per shard however slowly we're consumed
+        pages: queue.Queue = queue.Queue(maxsize=2 * len(shards))
+        stop = threading.Event()
+
+        def put(item: object) -> None:
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        def crawl(accounts: list[str]) -> None:
+            try:
+                shard_client = AccountScopedClient(self._client, accounts)
+                for page in shard_client.iter_pages(models, select, limit, with_filter, page_workers):
+                    if stop.is_set():
+                        return
+                    put(page)
+            except Exception as e:
+                put(e)
+            finally:
+                put(_SHARD_DONE)
+
+        pool = ThreadPoolExecutor(max_workers=min(self._max_workers, len(shards)), thread_name_prefix="orca-shard")
+        try:
+            for accounts in shards:
+                pool.submit(crawl, accounts)
+            running = len(shards)
+            while running:
+                item = pages.get()
+                if item is _SHARD_DONE:
+                    running -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield item
+        finally:
+            stop.set()
+            pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,187 @@
+import logging
+import random
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+
+import requests
+
+from defender_savings.config import (
+    DEFAULT_BACKOFF_BASE,
+    DEFAULT_BACKOFF_MAX,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_READ_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+# The API is shedding load: back off and lower the concurrency limit
+THROTTLE_STATUSES = frozenset({429, 503})
+# Transient server errors worth another attempt at the same concurrency
+RETRY_STATUSES = frozenset({500, 502, 504})
+
+
+def retry_after_seconds(response: requests.Response) -> float | None:
+    """Delay requested by a Retry-After header, in seconds or as an HTTP date."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def full_jitter_backoff(attempt: int, base: float, maximum: float) -> float:
+    """Delay before retry number ``attempt`` (from 0): uniform up to ``base * 2**attempt``, capped."""
+    return random.uniform(0, min(maximum, base * 2 ** attempt))
+
+
+class ConcurrencyLimiter:
+    """AIMD limit on the number of requests in flight.
+
+    The limit starts at ``initial`` (a quarter of ``max_limit`` by default)
+    and probes upwards: until the first throttled request every success adds
+    a whole slot, doubling the limit per round of requests, and after it
+    every success adds ``1 / limit`` (about one more slot per round). Every
+    throttled request halves the limit, at most once per ``cooldown``
+    seconds so a burst of 429s from one round only counts once. Over a run
+    this settles just below the concurrency the API tolerates, or at
+    ``max_limit``, the connection pool size, if the API tolerates that.
+    """
+
+    def __init__(
+        self, max_limit: int, min_limit: int = 1, cooldown: float = 1.0, initial: int | None = None,
+    ) -> None:
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self._limit = float(max(min_limit, min(max_limit, initial or max_limit // 4)))
+        self._slow_start = True
+        self._cooldown = cooldown
+        self._last_decrease = float("-inf")
+        self._in_flight = 0
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self._in_flight >= int(self._limit):
+                self._cond.wait()
+            self._in_flight += 1
+
+    def release(self) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify()
+
+    def on_success(self) -> None:
+        with self._cond:
+            step = 1 if self._slow_start else 1 / self._limit
+            self._limit = min(self.max_limit, self._limit + step)
+            self._cond.notify_all()
+
+    def on_throttle(self) -> None:
+        with self._cond:
+            now = time.monotonic()
+            if now - self._last_decrease < self._cooldown:
+                return
+            self._last_decrease = now
+            self._slow_start = False
+            self._limit = max(self.min_limit, self._limit / 2)
+        logger.debug("Throttled, concurrency limit now %d", self.limit)
+
+
+@dataclass
+class TransportStats:
+    """Counters for one run of requests through a ``Transport``.
+
+    ``wire_bytes`` counts response bodies as received (compressed) and
+    ``decoded_bytes`` the same bodies once decompressed.
+    """
+
+    requests: int = 0
+    retries: int = 0
+    throttled: int = 0
+    wire_bytes: int = 0
+    decoded_bytes: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def incr(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + n)
+
+
+class Transport:
+    """Sends serving-layer requests with timeouts, retries and a concurrency limit.
+
+    Connection errors, timeouts and RETRY_STATUSES are retried up to
+    ``max_retries`` times with full-jitter exponential backoff. Throttling
+    responses (THROTTLE_STATUSES) are retried too, after the server's
+    Retry-After delay when it gives one (capped at ``backoff_max``), and
+    halve the ``limiter``'s concurrency. Other errors, and the last failed
+    attempt, are returned or raised to the caller unchanged.
+    """
+
+    def __init__(
+        self,
+        limiter: ConcurrencyLimiter,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_base: float = DEFAULT_BACKOFF_BASE,
+        backoff_max: float = DEFAULT_BACKOFF_MAX,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.limiter = limiter
+        self._timeout = (connect_timeout, read_timeout)
+        self._max_retries = max_retries
+        self._backoff_base = backoff_base
+        self._backoff_max = backoff_max
+        self._sleep = sleep
+        self.stats = TransportStats()
+
+    def _backoff(self, attempt: int) -> float:
+        return full_jitter_backoff(attempt, self._backoff_base, self._backoff_max)
+
+    def post(self, session: requests.Session, url: str, body: dict) -> requests.Response:
+        attempt = 0
+        while True:
+            self.stats.incr("requests")
+            self.limiter.acquire()
+            try:
+                response = session.post(url, json=body, timeout=self._timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self._max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                logger.debug("%s, retrying in %.1fs", e.__class__.__name__, delay)
+            else:
+                status = response.status_code
+                if status in THROTTLE_STATUSES:
+                    self.stats.incr("throttled")
+                    self.limiter.on_throttle()
+                elif status < 400:
+                    self.limiter.on_success()
+                if status not in THROTTLE_STATUSES | RETRY_STATUSES or attempt >= self._max_retries:
+                    return response
+                delay = retry_after_seconds(response) if status in THROTTLE_STATUSES else None
+                if delay is None:
+                    delay = self._backoff(attempt)
+                delay = min(delay, self._backoff_max)
+                logger.debug("HTTP %d from %s, retrying in %.1fs", status, url, delay)
+            finally:
+                self.limiter.release()
+
+            self.stats.incr("retries")
+            attempt += 1
+            self._sleep(delay)
@@ -1,22 +1,46 @@
+import argparse
+import asyncio
 import logging
 import os
 import sys
+import time
+from pathlib import Path
 
-from defender_savings.api.client import OrcaClient
+from defender_savings.api.async_client import AsyncOrcaClient
+from defender_savings.api.cache import ResponseCache
+from defender_savings.api.checkpoint import CheckpointStore
+from defender_savings.api.client import OFFSET, PAGINATION_MODES, OrcaClient
+from defender_savings.api.codec import JSON_BACKEND
+from defender_savings.api.counts import count_resources
 from defender_savings.api.defender import list_defender_configs
-from defender_savings.api.resources import (
-    list_app_services,
-    list_container_hosts,
-    list_key_vaults,
-    list_storage_accounts,
-    list_virtual_machines,
+from defender_savings.api.fetch import InventoryCounts, count_inventory, fetch_inventory_async, iter_account_counts
+from defender_savings.api.filters import scope_filter
+from defender_savings.api.projection import MINIMAL, PROFILES
+from defender_savings.api.transport import ConcurrencyLimiter, Transport
+from defender_savings.config import (
+    DEFAULT_CACHE_DIR,
+    DEFAULT_CACHE_TTL,
+    DEFAULT_FETCH_WORKERS,
+    DEFAULT_MAX_PAGE_SIZE,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_PAGE_WORKERS,
+    DEFAULT_READ_TIMEOUT,
 )
+from defender_savings.models.compact import ASSET_FORMS, MODEL
+from defender_savings.models.defender import DefenderConfig
+from defender_savings.output.jsonl import write_account_line, write_totals_lines
 from defender_savings.output.table import print_cost_table, print_module_breakdown_table, print_savings_table, print_subscription_breakdown_table
-from defender_savings.services.calculator import AccountSummary, aggregate_by_module, calculate_account_costs
+from defender_savings.services.calculator import AccountSummary, CostMatrix, aggregate_by_module
 from defender_savings.services.mapper import ResourceDefenderMap
 
 logger = logging.getLogger(__name__)
 
+# Report formats: the tables once everything is fetched, or JSON Lines
+# streamed account by account (see output/jsonl.py)
+TABLE = "table"
+JSONL = "jsonl"
+OUTPUT_FORMATS = (TABLE, JSONL)
+
 
 def _load_token() -> str:
     """Load API token from environment, sourcing .env if needed."""
@@ -37,32 +61,223 @@ def _load_token() -> str:
     return token
 
 
-def main() -> None:
-    token = _load_token()
-    client = OrcaClient(token)
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="defender-savings",
+        description="Microsoft Defender for Cloud cost estimator and savings calculator",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_FETCH_WORKERS,
+        help=f"number of Orca queries to run concurrently (default: {DEFAULT_FETCH_WORKERS})",
+    )
+    parser.add_argument(
+        "--page-workers",
+        type=int,
+        default=DEFAULT_PAGE_WORKERS,
+        help=f"pages of a single query fetched concurrently (default: {DEFAULT_PAGE_WORKERS}, 1 = sequential)",
+    )
+    parser.add_argument(
+        "--adaptive-paging",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="tune each crawl's page size to the API's latency (default: on; ignored with --async)",
+    )
+    parser.add_argument(
+        "--max-page-size",
+        type=int,
+        default=DEFAULT_MAX_PAGE_SIZE,
+        help=f"upper bound for adaptive page sizes (default: {DEFAULT_MAX_PAGE_SIZE})",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_READ_TIMEOUT,
+        help=f"seconds to wait for a page before retrying it (default: {DEFAULT_READ_TIMEOUT:g})",
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=DEFAULT_MAX_RETRIES,
+        help=f"retries of a throttled or failed request (default: {DEFAULT_MAX_RETRIES})",
+    )
+    parser.add_argument(
+        "--pagination",
+        choices=PAGINATION_MODES,
+        default=OFFSET,
+        help="page by offset (parallel-capable) or by AssetUniqueId keyset (stable on deep crawls) (default: offset)",
+    )
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="drive all queries from one asyncio event loop (requires the 'async' extra)",
+    )
+    parser.add_argument(
+        "--http2",
+        action="store_true",
+        help="negotiate HTTP/2 with the Orca API (only with --async)",
+    )
+    parser.add_argument(
+        "--subscription",
+        dest="subscriptions",
+        action="append",
+        metavar="ID",
+        help="only fetch assets in this Azure subscription (repeatable)",
+    )
+    parser.add_argument(
+        "--account",
+        dest="accounts",
+        action="append",
+        metavar="NAME",
+        help="only fetch assets in this Orca cloud account (repeatable)",
+    )
+    parser.add_argument(
+        "--business-unit",
+        dest="business_units",
+        action="append",
+        metavar="NAME",
+        help="only fetch assets in this Orca business unit (repeatable)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=DEFAULT_CACHE_DIR,
+        help=f"directory for cached API responses (default: {DEFAULT_CACHE_DIR})",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=DEFAULT_CACHE_TTL,
+        help=f"seconds a cached response stays valid (default: {DEFAULT_CACHE_TTL})",
+    )
+    parser.add_argument(
+        "--cache",
+        action=argparse.BooleanOptionalAction,
+        help="reuse API responses cached by runs within --cache-ttl, and cache this run's (default: off)",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="ignore cached responses and re-fetch everything (the cache is still updated)",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        action="store_true",
+        help="save each crawl's pages under --cache-dir as they arrive, so a failed run can be resumed",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="continue crawls that failed part-way in a --checkpoint run from their last saved page "
+        "(implies --checkpoint; checkpoints older than --cache-ttl are discarded)",
+    )
+    parser.add_argument(
+        "--combined-query",
+        action="store_true",
+        help="fetch all resource models in one paginated query (fewer requests on small tenants)",
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=1,
+        help="split each resource query into this many balanced per-account shards run concurrently (default: 1)",
+    )
+    parser.add_argument(
+        "--columnar",
+        action="store_true",
+        help="count assets in a columnar store, vectorized with numpy when installed",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=0,
+        help="parse and count pages in this many worker processes (default: 0, in the fetching threads)",
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="fetch, parse and count each query in separate threads linked by bounded queues",
+    )
+    parser.add_argument(
+        "--output",
+        choices=OUTPUT_FORMATS,
+        default=TABLE,
+        help="print tables at the end, or stream JSON Lines with each account as soon as its group of "
+        "accounts is counted (one group per worker, or --shards groups) and totals at the end (default: table)",
+    )
+    parser.add_argument(
+        "--count-only",
+        action="store_true",
+        help="ask the API for per-account counts instead of downloading every asset",
+    )
+    parser.add_argument(
+        "--projection",
+        choices=PROFILES,
+        default=MINIMAL,
+        help="fields to request: only what the report needs, or the full debugging set (default: minimal)",
+    )
+    parser.add_argument(
+        "--asset-form",
+        choices=ASSET_FORMS,
+        default=MODEL,
+        help="parse assets into validated Pydantic models or slotted compact objects (default: model)",
+    )
+    args = parser.parse_args(argv)
+    if args.count_only and args.use_async:
+        parser.error("--count-only is not supported with --async")
+    if args.combined_query and (args.count_only or args.use_async):
+        parser.error("--combined-query is not supported with --count-only or --async")
+    if args.columnar and (args.count_only or args.use_async):
+        parser.error("--columnar is not supported with --count-only or --async")
+    if args.shards != 1 and (args.count_only or args.use_async):
+        parser.error("--shards is not supported with --count-only or --async")
+    if args.parse_workers and (args.count_only or args.use_async):
+        parser.error("--parse-workers is not supported with --count-only or --async")
+    if args.pipeline and (args.count_only or args.use_async or args.parse_workers):
+        parser.error("--pipeline is not supported with --count-only, --async or --parse-workers")
+    if args.output == JSONL and (args.count_only or args.use_async or args.parse_workers or args.pipeline):
+        parser.error("--output jsonl is not supported with --count-only, --async, --parse-workers or --pipeline")
+    if args.refresh and not args.cache:
+        parser.error("--refresh requires --cache")
+    if args.http2 and not args.use_async:
+        parser.error("--http2 requires --async")
+    if (args.checkpoint or args.resume) and args.use_async:
+        parser.error("--checkpoint and --resume are not supported with --async")
+    if (args.checkpoint or args.resume) and args.cache is False:
+        parser.error("--checkpoint and --resume write to --cache-dir and are not supported with --no-cache")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.page_workers < 1:
+        parser.error("--page-workers must be at least 1")
+    if args.shards < 1:
+        parser.error("--shards must be at least 1")
+    if args.parse_workers < 0:
+        parser.error("--parse-workers must not be negative")
+    if args.max_retries < 0:
+        parser.error("--max-retries must not be negative")
+    return args
 
-    # 1. Fetch Defender configs
-    logger.info("Fetching Defender configurations")
-    defender_configs = list_defender_configs(client)
 
-    # 2. Fetch resources
-    logger.info("Fetching resources")
-    vms = list_virtual_machines(client)
-    apps = list_app_services(client)
-    storage = list_storage_accounts(client)
-    key_vaults = list_key_vaults(client)
-    container_hosts = list_container_hosts(client)
+def _open_cache(args: argparse.Namespace) -> ResponseCache | None:
+    if not args.cache:
+        return None
+    return ResponseCache(args.cache_dir, ttl=args.cache_ttl, refresh=args.refresh)
 
-    logger.info(
-        "Total resources: %d VMs, %d App Services, %d Storage Accounts, %d Key Vaults, %d Container Hosts",
-        len(vms), len(apps), len(storage), len(key_vaults), len(container_hosts),
-    )
 
-    # 3. Map resources to defender configs by cloud account
-    mapper = ResourceDefenderMap(defender_configs)
-    counts_by_account = mapper.count_resources_per_account(vms, apps, storage, key_vaults, container_hosts)
+def _open_checkpoints(args: argparse.Namespace) -> CheckpointStore | None:
+    if not (args.checkpoint or args.resume):
+        return None
+    return CheckpointStore(args.cache_dir / "checkpoints", resume=args.resume, ttl=args.cache_ttl)
 
-    # 4. Calculate costs per account
+
+def _scope(args: argparse.Namespace) -> dict | None:
+    return scope_filter(args.accounts, args.subscriptions, args.business_units)
+
+
+def _unique_configs(defender_configs: list[DefenderConfig]) -> dict[str, DefenderConfig]:
+    """Defender configs by cloud account name, first record wins."""
     # Azure Defender for Cloud is configured per subscription — one config per
     # subscription. Orca should never return duplicates, but if it does we warn
     # and keep the first record to avoid double-counting costs.
@@ -78,18 +293,137 @@ def main() -> None:
             )
             continue
         seen[config.cloud_account_name] = config
+    return seen
+
 
+def _stream_report(client: OrcaClient, args: argparse.Namespace) -> None:
+    """Write the JSON Lines report, each account as soon as all its resources are counted."""
+    configs = _unique_configs(list_defender_configs(client))
     summaries: list[AccountSummary] = []
-    for config in seen.values():
-        resource_counts = counts_by_account.get(config.cloud_account_name, {})
-        summary = calculate_account_costs(config, resource_counts)
-        summaries.append(summary)
+    groups = iter_account_counts(
+        client,
+        list(configs),
+        args.shards if args.shards > 1 else None,
+        max_workers=args.workers,
+        combined=args.combined_query,
+        columnar=args.columnar,
+    )
+    for accounts, counter in groups:
+        costs = CostMatrix([configs[name] for name in accounts], counter.result(accounts))
+        for summary in costs.summaries():
+            write_account_line(summary)
+            summaries.append(summary)
+    write_totals_lines(summaries, aggregate_by_module(summaries))
+
+
+async def _fetch_async(token: str, args: argparse.Namespace, cache: ResponseCache | None) -> InventoryCounts:
+    async with AsyncOrcaClient(
+        token,
+        max_connections=args.workers * args.page_workers,
+        page_workers=args.page_workers,
+        http2=args.http2,
+        cache=cache,
+        projection=args.projection,
+        scope=_scope(args),
+        asset_form=args.asset_form,
+        read_timeout=args.timeout,
+        max_retries=args.max_retries,
+    ) as client:
+        inventory = await fetch_inventory_async(client)
+    stats = client.stats
+    logger.info("API requests: %d sent, %d retried, %d throttled", stats.requests, stats.retries, stats.throttled)
+    return inventory.to_counts()
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv)
+    token = _load_token()
+    cache = _open_cache(args)
+
+    # 1-2. Fetch Defender configs and resources concurrently
+    logger.info("Fetching Defender configurations and resources (%d workers)", args.workers)
+    if args.use_async:
+        # The async client returns each query's full result, counted once it is in
+        inventory = asyncio.run(_fetch_async(token, args, cache))
+    else:
+        # Resources are counted as their pages arrive and never kept in memory.
+        transport = Transport(
+            ConcurrencyLimiter(args.workers * args.page_workers),
+            read_timeout=args.timeout,
+            max_retries=args.max_retries,
+        )
+        client = OrcaClient(
+            token,
+            pool_size=args.workers * args.page_workers,
+            page_workers=args.page_workers,
+            cache=cache,
+            projection=args.projection,
+            adaptive_paging=args.adaptive_paging,
+            max_page_size=args.max_page_size,
+            pagination=args.pagination,
+            checkpoints=_open_checkpoints(args),
+            transport=transport,
+            scope=_scope(args),
+            asset_form=args.asset_form,
+        )
+        if args.output == JSONL:
+            _stream_report(client, args)
+        elif args.count_only:
+            configs = list_defender_configs(client)
+            counter = count_resources(client, [c.cloud_account_name for c in configs], max_workers=args.workers)
+            inventory = InventoryCounts(defender_configs=configs, counter=counter)
+        else:
+            inventory = count_inventory(
+                client,
+                max_workers=args.workers,
+                combined=args.combined_query,
+                shards=args.shards,
+                columnar=args.columnar,
+                parse_workers=args.parse_workers,
+                pipeline=args.pipeline,
+            )
+        stats = transport.stats
+        logger.info(
+            "API requests: %d sent, %d retried, %d throttled (concurrency limit settled at %d)",
+            stats.requests, stats.retries, stats.throttled, transport.limiter.limit,
+        )
+        logger.info(
+            "API responses: %.1f MiB on the wire, %.1f MiB decoded (%s JSON)",
+            stats.wire_bytes / 2**20, stats.decoded_bytes / 2**20, JSON_BACKEND,
+        )
+    if cache is not None:
+        logger.info("Response cache: %d hits, %d misses", cache.hits, cache.misses)
+        if cache.oldest_hit is not None:
+            logger.warning(
+                "%d pages were served from the response cache, the oldest written %.0fs ago; "
+                "run with --refresh or without --cache for live data",
+                cache.hits, time.time() - cache.oldest_hit,
+            )
+    if args.output == JSONL:
+        return  # already streamed
+    defender_configs = inventory.defender_configs
+    seen_assets = inventory.counter.assets_seen
+
+    logger.info(
+        "Total resources: %d VMs, %d App Services, %d Storage Accounts, %d Key Vaults, %d Container Hosts",
+        seen_assets["virtual_machines"], seen_assets["app_services"], seen_assets["storage_accounts"],
+        seen_assets["key_vaults"], seen_assets["container_vcores"],
+    )
+
+    # 3. Map resources to defender configs by cloud account
+    mapper = ResourceDefenderMap(defender_configs)
+    counts_by_account = mapper.count_from(inventory.counter)
+
+    # 4. Calculate costs per account
+    seen = _unique_configs(defender_configs)
+    costs = CostMatrix(list(seen.values()), counts_by_account)
 
     # 5. Output tables
+    summaries = costs.summaries()
     print_cost_table(summaries)
     print_savings_table(summaries)
     print_subscription_breakdown_table(summaries)
-    print_module_breakdown_table(aggregate_by_module(summaries))
+    print_module_breakdown_table(costs.module_breakdown())
 
 
 if __name__ == "__main__":
@@ -1,10 +1,52 @@
 import logging
 import os
+from pathlib import Path
 
 
 ORCA_API_URL = "https://api.orcasecurity.io"
 ORCA_QUERY_ENDPOINT = "/api/serving-layer/query"
 
+# Number of serving-layer queries run concurrently by the fetch stage.
+# One worker per resource query (configs, VMs, app services, storage,
+# key vaults, container hosts) lets the whole fetch finish in roughly the
+# time of the slowest single query.
+DEFAULT_FETCH_WORKERS = 6
+
+# Pages of a single query that may be in flight at once. Together with
+# DEFAULT_FETCH_WORKERS this bounds the total concurrent requests to the API.
+DEFAULT_PAGE_WORKERS = 4
+
+# Adaptive page sizing (see api/paging.py). Each crawl starts at the query's
+# limit and grows or shrinks within these bounds, aiming for pages that come
+# back within the target latency and stay under the payload cap.
+DEFAULT_MIN_PAGE_SIZE = 25
+DEFAULT_MAX_PAGE_SIZE = 1000
+DEFAULT_TARGET_PAGE_LATENCY = 2.0  # seconds
+DEFAULT_MAX_PAGE_BYTES = 8 * 1024 * 1024
+# Fast pages at a lowered ceiling before the ceiling is raised again
+DEFAULT_PAGE_CEILING_PROBE = 8
+
+# Request timeouts and retries (see api/transport.py). Throttled and
+# transient 5xx responses are retried with jittered exponential backoff,
+# and throttling also lowers the number of requests kept in flight.
+DEFAULT_CONNECT_TIMEOUT = 10.0  # seconds
+DEFAULT_READ_TIMEOUT = 120.0  # seconds
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BACKOFF_BASE = 0.5  # seconds
+DEFAULT_BACKOFF_MAX = 60.0  # seconds
+
+# Pages buffered between two stages of a pipelined crawl (see api/pipeline.py).
+# A full buffer blocks the stage feeding it, so a slow stage holds back the
+# fetch instead of letting pages pile up in memory.
+DEFAULT_PIPELINE_DEPTH = 2
+
+# On-disk cache of serving-layer responses (see api/cache.py), used with
+# --cache. Re-runs within the TTL are served from disk instead of re-crawling
+# the tenant.
+DEFAULT_CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "defender-savings"
+DEFAULT_CACHE_TTL = 60 * 60  # seconds
+DEFAULT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
 LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
 
 logging.basicConfig(
@@ -54,9 +96,11 @@ logging.basicConfig(
 #       as CSPM billable resources. Those are excluded here.
 #
 #   Container hosts without VCpuCount:
-#     - The API query filters to VMs where VCpuCount *exists*. Container hosts
-#       missing that field are not counted. The default-4 fallback in the model
-#       only fires for invalid values, not for records filtered at query time.
+#     - Only VMs where VCpuCount *exists* count as container hosts (checked
+#       client-side on the single AzureComputeVm crawl, see
+#       ContainerHost.is_container_host). Hosts missing that field are not
+#       counted. The default-4 fallback in the model only fires for invalid
+#       values, not for records excluded by that check.
 #
 #   Services with no API query (always show $0):
 #     - CosmosDbs, SqlServers, SqlServerVirtualMachines,
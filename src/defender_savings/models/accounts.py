@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import sys
+from collections.abc import Iterable, Iterator
+from typing import Annotated
+
+from pydantic import AfterValidator
+
+# A cloud account name, interned as it is parsed: the few hundred distinct
+# names are shared by millions of assets instead of copied into each, and a
+# shared string's hash is computed once rather than per dict lookup.
+type AccountName = Annotated[str, AfterValidator(sys.intern)]
+
+
+def intern_account_name(name: str) -> str:
+    """The shared copy of an account name, as ``AccountName`` fields hold it."""
+    return sys.intern(name)
+
+
+class AccountIndex:
+    """Cloud account names interned into dense integer ids, in first-seen order.
+
+    Per-account data can then be kept in arrays indexed by id and counted
+    without hashing a name per asset; names are only looked up again when
+    results are resolved for output.
+    """
+
+    def __init__(self, names: Iterable[str] = ()) -> None:
+        self._ids: dict[str, int] = {}
+        self.names: list[str] = []
+        for name in names:
+            self.id(name)
+
+    def id(self, name: str) -> int:
+        """Id of ``name``, assigning the next one if it is new."""
+        account_id = self._ids.get(name)
+        if account_id is None:
+            account_id = self._ids[name] = len(self.names)
+            self.names.append(name)
+        return account_id
+
+    def get(self, name: str) -> int | None:
+        """Id of ``name``, or None if it was never interned."""
+        return self._ids.get(name)
+
+    def name(self, account_id: int) -> str:
+        return self.names[account_id]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._ids
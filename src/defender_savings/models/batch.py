@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from functools import cache
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+
+# Validation context key set while a raw page is validated, for field
+# validators that must reject what only the per-item parser can default
+PAGE_CONTEXT = "orca_page"
+
+
+@cache
+def _page_adapter[M: BaseModel](model: type[M]) -> TypeAdapter[list[M]]:
+    return TypeAdapter(list[model])
+
+
+def validate_page[M: BaseModel](model: type[M], items: list[dict], parse_item: Callable[[dict], M]) -> list[M]:
+    """Validate a page of serving-layer items into ``model`` in one pydantic-core pass.
+
+    ``model`` reads the raw item shape through its fields' validation
+    aliases. Those cover well-formed items only; the defaults and fallbacks
+    of ``parse_item`` (its ``from_orca_response``) are not repeated there, so
+    a page with any item they don't cover is parsed item by item instead,
+    and the result is the same either way. Validators can tell the page
+    pass apart by ``PAGE_CONTEXT`` in their validation context.
+    """
+    try:
+        return _page_adapter(model).validate_python(items, context={PAGE_CONTEXT: True})
+    except ValidationError:
+        return [parse_item(item) for item in items]
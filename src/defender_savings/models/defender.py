@@ -1,8 +1,12 @@
 from __future__ import annotations
 
 import logging
+from typing import ClassVar
 
-from pydantic import BaseModel
+from pydantic import AliasChoices, AliasPath, BaseModel, ConfigDict, Field
+
+from defender_savings.models.accounts import AccountName
+from defender_savings.models.batch import validate_page
 
 logger = logging.getLogger(__name__)
 
@@ -10,10 +14,28 @@ logger = logging.getLogger(__name__)
 class DefenderConfig(BaseModel):
     """Defender for Cloud configuration for a subscription, from Orca API."""
 
-    name: str
-    cloud_account_name: str
-    subscription_id: str
-    services_pricing: dict[str, str]  # plan_name -> tier
+    # Serving-layer fields read by from_orca_response (see api/projection.py)
+    ORCA_FIELDS: ClassVar[tuple[str, ...]] = (
+        "Name",
+        "CloudAccount.Name",
+        "SecurityCenterSubscription",
+        "ServicesPricing",
+    )
+
+    # Fields are set by name, or read straight from a raw item by from_orca_page
+    model_config = ConfigDict(populate_by_name=True)
+
+    name: str = Field(validation_alias=AliasChoices(AliasPath("data", "Name", "value"), "name"))
+    cloud_account_name: AccountName = Field(validation_alias=AliasPath("data", "CloudAccount", "name"))
+    subscription_id: str = Field(validation_alias=AliasPath("data", "SecurityCenterSubscription", "value"))
+    services_pricing: dict[str, str] = Field(  # plan_name -> tier
+        validation_alias=AliasPath("data", "ServicesPricing", "value"),
+    )
+
+    @classmethod
+    def from_orca_page(cls, items: list[dict]) -> list[DefenderConfig]:
+        """Parse a page of items in one validation pass, as ``from_orca_response`` would each."""
+        return validate_page(cls, items, cls.from_orca_response)
 
     @classmethod
     def from_orca_response(cls, item: dict) -> DefenderConfig:
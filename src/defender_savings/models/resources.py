@@ -1,11 +1,42 @@
 from __future__ import annotations
 
 import logging
+from typing import ClassVar, Self
 
-from pydantic import BaseModel
+from pydantic import AliasChoices, AliasPath, BaseModel, ConfigDict, Field, ValidationInfo, field_validator
+
+from defender_savings.models.accounts import AccountName, intern_account_name
+from defender_savings.models.batch import PAGE_CONTEXT, validate_page
 
 logger = logging.getLogger(__name__)
 
+_DEFAULT_VCPUS = 4
+
+
+def extract_common_fields(item: dict) -> tuple[str, str, str]:
+    """``(name, cloud_account_name, asset_unique_id)`` of a serving-layer item."""
+    data = item.get("data", {})
+
+    # CloudAccount is a nested object (not value-wrapped)
+    cloud_account = data.get("CloudAccount", {})
+    account_name = cloud_account.get("name", "") if isinstance(cloud_account, dict) else ""
+    if isinstance(account_name, str):
+        account_name = intern_account_name(account_name)
+
+    # Name and AssetUniqueId are value-wrapped
+    name = data.get("Name", {}).get("value", item.get("name", ""))
+    asset_id = data.get("AssetUniqueId", {}).get("value", item.get("id", ""))
+
+    return name, account_name, asset_id
+
+
+def extract_vcpu_count(item: dict) -> int:
+    """VCpuCount of a serving-layer item, or the default when missing or invalid."""
+    vcpu = item.get("data", {}).get("VCpuCount", {}).get("value", _DEFAULT_VCPUS)
+    if not isinstance(vcpu, int) or vcpu <= 0:
+        vcpu = _DEFAULT_VCPUS
+    return int(vcpu)  # True counts as 1; False, like any other value <= 0, gets the default
+
 
 class AzureAsset(BaseModel):
     """Base model for any Azure asset from Orca API.
@@ -22,22 +53,28 @@ class AzureAsset(BaseModel):
         }
     """
 
-    name: str
-    cloud_account_name: str
-    asset_unique_id: str
+    # Serving-layer fields read by from_orca_response (see api/projection.py)
+    ORCA_FIELDS: ClassVar[tuple[str, ...]] = ("Name", "CloudAccount.Name", "AssetUniqueId")
 
-    @classmethod
-    def _extract_common(cls, item: dict) -> dict:
-        data = item.get("data", {})
+    # Fields are set by name, or read straight from a raw item by from_orca_page
+    model_config = ConfigDict(populate_by_name=True)
+
+    name: str = Field(validation_alias=AliasChoices(AliasPath("data", "Name", "value"), "name"))
+    cloud_account_name: AccountName = Field(validation_alias=AliasPath("data", "CloudAccount", "name"))
+    asset_unique_id: str = Field(validation_alias=AliasChoices(AliasPath("data", "AssetUniqueId", "value"), "id"))
 
-        # CloudAccount is a nested object (not value-wrapped)
-        cloud_account = data.get("CloudAccount", {})
-        account_name = cloud_account.get("name", "") if isinstance(cloud_account, dict) else ""
+    @classmethod
+    def from_orca_response(cls, item: dict) -> Self:
+        return cls(**cls._extract_common(item))
 
-        # Name and AssetUniqueId are value-wrapped
-        name = data.get("Name", {}).get("value", item.get("name", ""))
-        asset_id = data.get("AssetUniqueId", {}).get("value", item.get("id", ""))
+    @classmethod
+    def from_orca_page(cls, items: list[dict]) -> list[Self]:
+        """Parse a page of items in one validation pass, as ``from_orca_response`` would each."""
+        return validate_page(cls, items, cls.from_orca_response)
 
+    @classmethod
+    def _extract_common(cls, item: dict) -> dict:
+        name, account_name, asset_id = extract_common_fields(item)
         return {
             "name": name,
             "cloud_account_name": account_name,
@@ -46,30 +83,19 @@ class AzureAsset(BaseModel):
 
 
 class VirtualMachine(AzureAsset):
-    @classmethod
-    def from_orca_response(cls, item: dict) -> VirtualMachine:
-        return cls(**cls._extract_common(item))
+    pass
 
 
 class AppService(AzureAsset):
-    @classmethod
-    def from_orca_response(cls, item: dict) -> AppService:
-        return cls(**cls._extract_common(item))
+    pass
 
 
 class StorageAccount(AzureAsset):
-    @classmethod
-    def from_orca_response(cls, item: dict) -> StorageAccount:
-        return cls(**cls._extract_common(item))
+    pass
 
 
 class KeyVault(AzureAsset):
-    @classmethod
-    def from_orca_response(cls, item: dict) -> KeyVault:
-        return cls(**cls._extract_common(item))
-
-
-_DEFAULT_VCPUS = 4
+    pass
 
 
 class ContainerHost(AzureAsset):
@@ -79,14 +105,41 @@ class ContainerHost(AzureAsset):
     Falls back to 4 vCPUs when the field is missing.
     """
 
-    vcpu_count: int = _DEFAULT_VCPUS
+    # Containers is read by is_container_host
+    ORCA_FIELDS: ClassVar[tuple[str, ...]] = AzureAsset.ORCA_FIELDS + ("VCpuCount", "Containers.Name")
+
+    vcpu_count: int = Field(_DEFAULT_VCPUS, validation_alias=AliasPath("data", "VCpuCount", "value"))
+
+    @field_validator("vcpu_count", mode="before")
+    @classmethod
+    def _page_vcpu_count(cls, value: object, info: ValidationInfo) -> object:
+        # In from_orca_page's pass, anything extract_vcpu_count would replace
+        # with the default fails the page, which is then parsed item by item
+        if info.context and info.context.get(PAGE_CONTEXT) and (type(value) is not int or value <= 0):
+            raise ValueError("VCpuCount is not a positive int")
+        return value
+
+    @classmethod
+    def is_container_host(cls, item: dict) -> bool:
+        """Client-side equivalent of the container-host query filter.
+
+        True when the VM has at least one related Container and VCpuCount
+        exists (is present and not null), matching the "has" and "exists"
+        operators the API would apply server-side.
+        """
+        data = item.get("data", {})
+
+        containers = data.get("Containers")
+        if isinstance(containers, dict) and "value" in containers:
+            containers = containers["value"]
+
+        vcpu = data.get("VCpuCount")
+        has_vcpu = isinstance(vcpu, dict) and vcpu.get("value") is not None
+
+        return bool(containers) and has_vcpu
 
     @classmethod
     def from_orca_response(cls, item: dict) -> ContainerHost:
         common = cls._extract_common(item)
-        data = item.get("data", {})
-        vcpu = data.get("VCpuCount", {}).get("value", _DEFAULT_VCPUS)
-        if not isinstance(vcpu, int) or vcpu <= 0:
-            vcpu = _DEFAULT_VCPUS
-        common["vcpu_count"] = vcpu
+        common["vcpu_count"] = extract_vcpu_count(item)
         return cls(**common)
@@ -0,0 +1,48 @@
+import json
+import logging
+import sys
+from typing import TextIO
+
+from defender_savings.services.calculator import AccountSummary, ModuleBreakdown
+
+logger = logging.getLogger(__name__)
+
+# JSON Lines report: one object per line, told apart by "record".
+#   {"record": "account", ...AccountSummary}   as each account is final
+#   {"record": "module", ...ModuleBreakdown}   once every account is in
+#   {"record": "totals", ...}                  last line of a complete report
+
+
+def _write(record: str, fields: dict, out: TextIO | None) -> None:
+    # Resolved per call, so redirect_stdout and output capture apply
+    out = out or sys.stdout
+    # Flushed per line, so a reader tailing the stream sees each record at once
+    out.write(json.dumps({"record": record, **fields}) + "\n")
+    out.flush()
+
+
+def write_account_line(summary: AccountSummary, out: TextIO | None = None) -> None:
+    """Emit one account's summary, line items included."""
+    _write("account", summary.model_dump(), out)
+
+
+def write_totals_lines(
+    summaries: list[AccountSummary], breakdowns: list[ModuleBreakdown], out: TextIO | None = None,
+) -> None:
+    """Emit the per-module breakdown, then the grand totals across every account."""
+    for b in breakdowns:
+        _write("module", b.model_dump(), out)
+
+    monthly = sum(s.total_monthly for s in summaries)
+    saving = sum(s.potential_monthly_saving for s in summaries)
+    _write(
+        "totals",
+        {
+            "accounts": len(summaries),
+            "total_monthly": monthly,
+            "total_annual": monthly * 12,
+            "potential_monthly_saving": saving,
+            "potential_annual_saving": saving * 12,
+        },
+        out,
+    )
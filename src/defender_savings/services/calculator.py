@@ -5,6 +5,11 @@ from pydantic import BaseModel
 from defender_savings.config import PRICING
 from defender_savings.models.defender import DefenderConfig
 
+try:
+    import numpy as np
+except ImportError:  # optional dependency: pip install 'defender-savings[fast]'
+    np = None
+
 logger = logging.getLogger(__name__)
 
 
@@ -49,6 +54,14 @@ class ModuleBreakdown(BaseModel):
     annual_cost: float
 
 
+def _billable_counts(resource_counts: dict[str, int]) -> dict[str, int]:
+    """Copy of ``resource_counts`` with the CSPM billable count (VMs + storage accounts) added."""
+    return {
+        **resource_counts,
+        "_cspm_billable": resource_counts.get("virtual_machines", 0) + resource_counts.get("storage_accounts", 0),
+    }
+
+
 def calculate_account_costs(
     config: DefenderConfig,
     resource_counts: dict[str, int],
@@ -58,18 +71,11 @@ def calculate_account_costs(
     Only includes services that are enabled (Standard) in the API response
     AND have actual resources. Savings = disabling that service entirely.
     """
-    resource_counts = {**resource_counts}  # avoid mutating caller's dict
+    resource_counts = _billable_counts(resource_counts)  # avoid mutating caller's dict
     costs: list[CostLineItem] = []
     savings: list[SavingsLineItem] = []
     total_monthly = 0.0
 
-    # Compute CSPM billable count
-    cspm_billable = (
-        resource_counts.get("virtual_machines", 0)
-        + resource_counts.get("storage_accounts", 0)
-    )
-    resource_counts["_cspm_billable"] = cspm_billable
-
     for module, tier in config.services_pricing.items():
         if tier != "Standard":
             continue
@@ -127,6 +133,12 @@ def calculate_account_costs(
     )
 
 
+def _breakdown_order(breakdown: ModuleBreakdown) -> tuple[float, str]:
+    # Costliest first; equal totals (to the cent, so summation order can't
+    # split a tie) by module name
+    return -round(breakdown.monthly_cost, 2), breakdown.module
+
+
 def aggregate_by_module(summaries: list[AccountSummary]) -> list[ModuleBreakdown]:
     """Aggregate costs across all accounts, grouped by module."""
     acc: dict[str, dict] = {}
@@ -163,5 +175,149 @@ def aggregate_by_module(summaries: list[AccountSummary]) -> list[ModuleBreakdown
         )
         for module, entry in acc.items()
     ]
-    breakdowns.sort(key=lambda x: x.monthly_cost, reverse=True)
+    breakdowns.sort(key=_breakdown_order)
     return breakdowns
+
+
+class CostMatrix:
+    """Costs and savings of many accounts, computed as whole arrays.
+
+    Builds an accounts x modules Standard-enablement matrix, an accounts x
+    count-keys matrix gathered into per-module counts, and a unit price
+    vector from PRICING; monthly costs, account totals and per-module totals
+    are then a handful of array operations (numpy when installed, plain
+    lists otherwise). ``AccountSummary`` objects are only built for the rows
+    asked for, and match ``calculate_account_costs`` for the same inputs.
+    """
+
+    def __init__(self, configs: list[DefenderConfig], counts_by_account: dict[str, dict[str, int]]) -> None:
+        self.configs = configs
+        self.modules = list(PRICING)
+        self._module_index = {module: j for j, module in enumerate(self.modules)}
+        self._labels = [c.subscription_id or c.cloud_account_name for c in configs]
+
+        count_keys = list(dict.fromkeys(PRICING[m]["count_key"] for m in self.modules))
+        key_cols = [count_keys.index(PRICING[m]["count_key"]) for m in self.modules]
+        prices = [PRICING[m]["unit_price"] for m in self.modules]
+
+        key_counts = [
+            [counts.get(key, 0) for key in count_keys]
+            for counts in (_billable_counts(counts_by_account.get(c.cloud_account_name, {})) for c in configs)
+        ]
+        enabled = [[c.services_pricing.get(m) == "Standard" for m in self.modules] for c in configs]
+
+        if np is not None:
+            key_counts = np.array(key_counts, dtype=np.int64).reshape(len(configs), len(count_keys))
+            enabled = np.array(enabled, dtype=bool).reshape(len(configs), len(self.modules))
+            self._counts = key_counts[:, key_cols]
+            self._billed = enabled & (self._counts != 0)
+            self._monthly = np.where(self._billed, self._counts * np.array(prices), 0.0)
+            self.total_monthly: list[float] = self._monthly.sum(axis=1).tolist()
+        else:
+            self._counts = [[row[k] for k in key_cols] for row in key_counts]
+            self._billed = [
+                [on and n != 0 for on, n in zip(flags, row)] for flags, row in zip(enabled, self._counts)
+            ]
+            self._monthly = [
+                [price * n if billed else 0.0 for price, n, billed in zip(prices, row, flags)]
+                for row, flags in zip(self._counts, self._billed)
+            ]
+            self.total_monthly = [sum(row) for row in self._monthly]
+
+        logger.info(
+            "Costed %d accounts x %d modules: $%.2f/mo",
+            len(configs), len(self.modules), sum(self.total_monthly),
+        )
+
+    def _row(self, matrix, row: int) -> list:
+        return matrix[row].tolist() if np is not None else matrix[row]
+
+    def summary(self, row: int) -> AccountSummary:
+        """Materialize the line items of one account."""
+        config = self.configs[row]
+        label = self._labels[row]
+        counts = self._row(self._counts, row)
+        billed = self._row(self._billed, row)
+        monthly_row = self._row(self._monthly, row)
+
+        costs: list[CostLineItem] = []
+        savings: list[SavingsLineItem] = []
+        total_monthly = 0.0
+        # services_pricing order, so ties sort exactly as in calculate_account_costs
+        for module, tier in config.services_pricing.items():
+            j = self._module_index.get(module)
+            if j is None or tier != "Standard" or not billed[j]:
+                continue
+            pricing = PRICING[module]
+            monthly = monthly_row[j]
+            costs.append(CostLineItem(
+                cloud_account=label,
+                module=module,
+                description=pricing["description"],
+                tier=tier,
+                count=counts[j],
+                unit_price=pricing["unit_price"],
+                unit=pricing["unit"],
+                monthly_cost=monthly,
+                annual_cost=monthly * 12,
+            ))
+            total_monthly += monthly
+            savings.append(SavingsLineItem(
+                cloud_account=label,
+                module=module,
+                description=pricing["description"],
+                monthly_saving=monthly,
+                annual_saving=monthly * 12,
+            ))
+
+        costs.sort(key=lambda x: x.monthly_cost, reverse=True)
+        savings.sort(key=lambda x: x.monthly_saving, reverse=True)
+        total_saving = sum(s.monthly_saving for s in savings)
+        return AccountSummary(
+            cloud_account=label,
+            costs=costs,
+            savings=savings,
+            total_monthly=total_monthly,
+            total_annual=total_monthly * 12,
+            potential_monthly_saving=total_saving,
+            potential_annual_saving=total_saving * 12,
+        )
+
+    def summaries(self, rows: list[int] | None = None) -> list[AccountSummary]:
+        """Materialize ``rows`` (default: every account), in the order given."""
+        if rows is None:
+            rows = range(len(self.configs))
+        return [self.summary(row) for row in rows]
+
+    def module_breakdown(self) -> list[ModuleBreakdown]:
+        """Per-module totals across all accounts, as ``aggregate_by_module`` returns them."""
+        if np is not None:
+            billed_cols = self._billed.T
+            qty = np.where(self._billed, self._counts, 0).sum(axis=0).tolist()
+            monthly = self._monthly.sum(axis=0).tolist()
+        else:
+            billed_cols = [[row[j] for row in self._billed] for j in range(len(self.modules))]
+            qty = [
+                sum(n for n, billed in zip((row[j] for row in self._counts), billed_cols[j]) if billed)
+                for j in range(len(self.modules))
+            ]
+            monthly = [sum(row[j] for row in self._monthly) for j in range(len(self.modules))]
+
+        breakdowns = []
+        for j, module in enumerate(self.modules):
+            accounts = {label for label, billed in zip(self._labels, billed_cols[j]) if billed}
+            if not accounts:
+                continue
+            pricing = PRICING[module]
+            breakdowns.append(ModuleBreakdown(
+                module=module,
+                description=pricing["description"],
+                subscription_count=len(accounts),
+                total_qty=qty[j],
+                unit_price=pricing["unit_price"],
+                unit=pricing["unit"],
+                monthly_cost=monthly[j],
+                annual_cost=monthly[j] * 12,
+            ))
+        breakdowns.sort(key=_breakdown_order)
+        return breakdowns
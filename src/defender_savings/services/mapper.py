@@ -1,10 +1,210 @@
+from __future__ import annotations
+
 import logging
+from array import array
+from collections import Counter
+from collections.abc import Iterable
+from functools import cache
 
+from defender_savings.models.accounts import AccountIndex
+from defender_savings.models.compact import COMPACT, CompactAsset, asset_class
 from defender_savings.models.defender import DefenderConfig
-from defender_savings.models.resources import AppService, ContainerHost, KeyVault, StorageAccount, VirtualMachine
+from defender_savings.models.resources import (
+    AppService,
+    AzureAsset,
+    ContainerHost,
+    KeyVault,
+    StorageAccount,
+    VirtualMachine,
+)
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency: pip install 'defender-savings[fast]'
+    np = None
 
 logger = logging.getLogger(__name__)
 
+# Resource type -> count key consumed by calculate_account_costs
+_COUNT_KEYS: dict[type[AzureAsset] | type[CompactAsset], str] = {
+    VirtualMachine: "virtual_machines",
+    AppService: "app_services",
+    StorageAccount: "storage_accounts",
+    KeyVault: "key_vaults",
+    ContainerHost: "container_vcores",
+}
+# Compact assets count exactly like the models they stand in for
+_COUNT_KEYS.update({asset_class(model, COMPACT): key for model, key in list(_COUNT_KEYS.items())})
+
+
+@cache
+def _inherited_count_key(asset_type: type) -> str:
+    for base in asset_type.__mro__[1:]:
+        if base in _COUNT_KEYS:
+            return _COUNT_KEYS[base]
+    raise TypeError(f"Cannot count assets of type {asset_type.__name__}")
+
+
+def _count_key(asset_type: type) -> str:
+    """Count key of an asset class, or of the nearest counted class it derives from."""
+    key = _COUNT_KEYS.get(asset_type)
+    return key if key is not None else _inherited_count_key(asset_type)
+
+
+def _empty_counts() -> dict[str, int]:
+    return {
+        "virtual_machines": 0,
+        "app_services": 0,
+        "storage_accounts": 0,
+        "key_vaults": 0,
+        "container_vcores": 0,
+        "subscriptions": 1,
+    }
+
+
+class ResourceCounter:
+    """Counts resources per cloud account incrementally.
+
+    Assets can be added one at a time or a page at a time from any iterable,
+    while the fetch is still running; only the per-account totals are kept.
+    Counting does not need the Defender configs: accounts without a config
+    are dropped when ``result`` is called.
+    """
+
+    def __init__(self) -> None:
+        self._counts: dict[str, dict[str, int]] = {}
+        self.assets_seen: Counter[str] = Counter()  # count key -> assets added
+
+    def add(self, asset: AzureAsset | CompactAsset) -> None:
+        key = _count_key(type(asset))
+        counts = self._counts.get(asset.cloud_account_name)
+        if counts is None:
+            counts = self._counts[asset.cloud_account_name] = _empty_counts()
+        # Containers are billed per vCore, everything else per resource
+        counts[key] += asset.vcpu_count if key == "container_vcores" else 1
+        self.assets_seen[key] += 1
+
+    def add_count(self, cloud_account_name: str, key: str, count: int) -> None:
+        """Add a pre-aggregated count, e.g. one reported by the server."""
+        counts = self._counts.get(cloud_account_name)
+        if counts is None:
+            counts = self._counts[cloud_account_name] = _empty_counts()
+        counts[key] += count
+        self.assets_seen[key] += count
+
+    def add_page(self, assets: Iterable[AzureAsset | CompactAsset]) -> None:
+        for asset in assets:
+            self.add(asset)
+
+    def merge(self, other: ResourceCounter) -> None:
+        """Fold another counter's totals into this one."""
+        for account_name, other_counts in other._counts.items():
+            counts = self._counts.setdefault(account_name, _empty_counts())
+            for key, value in other_counts.items():
+                if key != "subscriptions":
+                    counts[key] += value
+        self.assets_seen.update(other.assets_seen)
+
+    def result(self, account_names: Iterable[str]) -> dict[str, dict[str, int]]:
+        """Per-account counts for the given accounts; zeroes when none were seen."""
+        counts = {name: dict(self._counts.get(name) or _empty_counts()) for name in account_names}
+        logger.info("Mapped resources across %d cloud accounts", len(counts))
+        return counts
+
+
+def _bincount(codes: array, n: int, weights: array | None = None) -> list[int]:
+    """Per-code totals of a column: occurrences, or the sum of ``weights``."""
+    if not codes:
+        return [0] * n
+    if np is not None:
+        totals = np.bincount(
+            np.frombuffer(codes, dtype=np.intc),
+            weights=np.frombuffer(weights, dtype=np.intc) if weights is not None else None,
+            minlength=n,
+        )
+        return totals.astype(np.int64).tolist()
+
+    counts = [0] * n
+    if weights is None:
+        for code, count in Counter(codes).items():
+            counts[code] = count
+    else:
+        for code, weight in zip(codes, weights):
+            counts[code] += weight
+    return counts
+
+
+class ColumnarResourceCounter:
+    """Drop-in ``ResourceCounter`` that keeps assets as columns and counts at the end.
+
+    Each resource type is one array of interned account ids (4 bytes per
+    asset), plus a parallel array of vCPU counts for container hosts.
+    ``result`` turns every column into per-account totals with one bincount
+    (numpy when installed, ``collections.Counter`` otherwise), so counting
+    tens of millions of assets costs a few array passes instead of a dict
+    update per asset.
+    """
+
+    def __init__(self) -> None:
+        self.accounts = AccountIndex()
+        self._columns: dict[str, array] = {key: array("i") for key in _COUNT_KEYS.values()}
+        self._vcpus = array("i")  # parallel to the container_vcores column
+        self._added: list[tuple[int, str, int]] = []  # (account id, key, count) from add_count
+
+    def add(self, asset: AzureAsset | CompactAsset) -> None:
+        key = _count_key(type(asset))
+        self._columns[key].append(self.accounts.id(asset.cloud_account_name))
+        if key == "container_vcores":
+            self._vcpus.append(asset.vcpu_count)
+
+    def add_count(self, cloud_account_name: str, key: str, count: int) -> None:
+        """Add a pre-aggregated count, e.g. one reported by the server."""
+        self._added.append((self.accounts.id(cloud_account_name), key, count))
+
+    def add_page(self, assets: Iterable[AzureAsset | CompactAsset]) -> None:
+        for asset in assets:
+            self.add(asset)
+
+    def merge(self, other: ColumnarResourceCounter) -> None:
+        """Append another counter's columns, re-mapping its account ids."""
+        remap = [self.accounts.id(name) for name in other.accounts]
+        for key, column in other._columns.items():
+            self._columns[key].extend(remap[account_id] for account_id in column)
+        self._vcpus.extend(other._vcpus)
+        self._added.extend((remap[account_id], key, count) for account_id, key, count in other._added)
+
+    @property
+    def assets_seen(self) -> Counter[str]:
+        """Count key -> assets added, as on ``ResourceCounter``."""
+        seen = Counter({key: len(column) for key, column in self._columns.items()})
+        for _, key, count in self._added:
+            seen[key] += count
+        return seen
+
+    def totals(self) -> dict[str, list[int]]:
+        """Count key -> per-account totals, indexed by id in ``accounts``."""
+        n = len(self.accounts)
+        totals = {
+            key: _bincount(column, n, self._vcpus if key == "container_vcores" else None)
+            for key, column in self._columns.items()
+        }
+        for account_id, key, count in self._added:
+            totals[key][account_id] += count
+        return totals
+
+    def result(self, account_names: Iterable[str]) -> dict[str, dict[str, int]]:
+        """Per-account counts for the given accounts; zeroes when none were seen."""
+        totals = self.totals()
+        counts: dict[str, dict[str, int]] = {}
+        for name in account_names:
+            counts[name] = _empty_counts()
+            account_id = self.accounts.get(name)
+            if account_id is not None:
+                for key, per_account in totals.items():
+                    counts[name][key] = per_account[account_id]
+        logger.info("Mapped resources across %d cloud accounts", len(counts))
+        return counts
+
 
 class ResourceDefenderMap:
     """Maps Azure resources to their cloud account's Defender configuration."""
@@ -26,36 +226,11 @@ class ResourceDefenderMap:
         container_hosts: list[ContainerHost],
     ) -> dict[str, dict[str, int]]:
         """Count resources grouped by cloud account name."""
-        counts: dict[str, dict[str, int]] = {}
-        for account_name in self._configs:
-            counts[account_name] = {
-                "virtual_machines": 0,
-                "app_services": 0,
-                "storage_accounts": 0,
-                "key_vaults": 0,
-                "container_vcores": 0,
-                "subscriptions": 1,
-            }
-
-        for vm in vms:
-            if vm.cloud_account_name in counts:
-                counts[vm.cloud_account_name]["virtual_machines"] += 1
-
-        for app in app_services:
-            if app.cloud_account_name in counts:
-                counts[app.cloud_account_name]["app_services"] += 1
-
-        for sa in storage_accounts:
-            if sa.cloud_account_name in counts:
-                counts[sa.cloud_account_name]["storage_accounts"] += 1
-
-        for kv in key_vaults:
-            if kv.cloud_account_name in counts:
-                counts[kv.cloud_account_name]["key_vaults"] += 1
-
-        for host in container_hosts:
-            if host.cloud_account_name in counts:
-                counts[host.cloud_account_name]["container_vcores"] += host.vcpu_count
+        counter = ColumnarResourceCounter()
+        for assets in (vms, app_services, storage_accounts, key_vaults, container_hosts):
+            counter.add_page(assets)
+        return self.count_from(counter)
 
-        logger.info("Mapped resources across %d cloud accounts", len(counts))
-        return counts
+    def count_from(self, counter: ResourceCounter | ColumnarResourceCounter) -> dict[str, dict[str, int]]:
+        """Resolve an incremental counter against the configured accounts."""
+        return counter.result(self._configs)
@@ -0,0 +1,139 @@
+"""Tests for defender_savings.api.async_client.AsyncOrcaClient."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from defender_savings.api.async_client import AsyncOrcaClient  # noqa: E402
+from defender_savings.api.fetch import fetch_inventory_async  # noqa: E402
+from conftest import make_orca_asset_item, make_orca_defender_item  # noqa: E402
+
+
+def _serving_layer(items_by_model: dict[str, list[dict]], report_total: bool = True):
+    bodies: list[dict] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        bodies.append(body)
+        items = [i for m in body["query"]["models"] for i in items_by_model.get(m, [])]
+        if "with" in body["query"]:
+            items = [i for i in items if "VCpuCount" in i["data"]]
+        start, limit = body["start_at_index"], body["limit"]
+        payload: dict = {"data": items[start:start + limit]}
+        if body["get_results_and_count"] and report_total:
+            payload["total_items"] = len(items)
+        return httpx.Response(200, json=payload)
+
+    return httpx.MockTransport(handler), bodies
+
+
+def _numbered(n: int) -> list[dict]:
+    return [{"id": str(i)} for i in range(n)]
+
+
+# ── Pagination matches the sync contract ──────────────────────────────
+
+
+@pytest.mark.parametrize("page_workers", [1, 4])
+@pytest.mark.parametrize("report_total", [True, False], ids=["counted", "probed"])
+@pytest.mark.parametrize("total", [0, 10, 25])
+def test_query_returns_everything_in_order(total: int, report_total: bool, page_workers: int) -> None:
+    transport, _ = _serving_layer({"M": _numbered(total)}, report_total=report_total)
+
+    async def run() -> list[dict]:
+        async with AsyncOrcaClient("token", page_workers=page_workers, transport=transport) as client:
+            return await client.query(["M"], ["Name"], limit=10)
+
+    items = asyncio.run(run())
+    assert [int(i["id"]) for i in items] == list(range(total))
+
+
+def test_sends_token_header() -> None:
+    seen: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.headers["Authorization"])
+        return httpx.Response(200, json={"data": []})
+
+    async def run() -> None:
+        async with AsyncOrcaClient("secret", transport=httpx.MockTransport(handler)) as client:
+            await client.query(["M"], ["Name"])
+
+    asyncio.run(run())
+    assert seen == ["Token secret"]
+
+
+# ── Timeouts and retries ──────────────────────────────────────────────
+
+
+def test_requests_are_bounded_by_the_read_timeout() -> None:
+    client = AsyncOrcaClient("token", read_timeout=7.0, connect_timeout=3.0)
+    assert client._client.timeout == httpx.Timeout(7.0, connect=3.0)
+    asyncio.run(client.aclose())
+
+
+def test_transient_failures_are_retried() -> None:
+    transport, _ = _serving_layer({"M": _numbered(5)})
+    failures = [httpx.ConnectError("refused"), httpx.Response(502), httpx.Response(429, headers={"Retry-After": "0"})]
+
+    async def flaky(request: httpx.Request) -> httpx.Response:
+        if failures:
+            failure = failures.pop(0)
+            if isinstance(failure, Exception):
+                raise failure
+            return failure
+        return await transport.handle_async_request(request)
+
+    async def run() -> tuple[list[dict], AsyncOrcaClient]:
+        async with AsyncOrcaClient("token", transport=httpx.MockTransport(flaky), backoff_base=0) as client:
+            return await client.query(["M"], ["Name"], limit=10), client
+
+    items, client = asyncio.run(run())
+    assert [int(i["id"]) for i in items] == list(range(5))
+    assert (client.stats.requests, client.stats.retries, client.stats.throttled) == (4, 3, 1)
+
+
+def test_retries_give_up_after_max_retries() -> None:
+    async def down(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(504)
+
+    async def run() -> None:
+        async with AsyncOrcaClient("token", transport=httpx.MockTransport(down), max_retries=2, backoff_base=0) as client:
+            await client.query(["M"], ["Name"])
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(run())
+
+
+# ── Async inventory fetch ─────────────────────────────────────────────
+
+
+def test_fetch_inventory_async() -> None:
+    transport, _ = _serving_layer({
+        "AzureDefenderForCloud": [make_orca_defender_item()],
+        "AzureComputeVm": [
+            make_orca_asset_item(name="vm-1"),
+            make_orca_asset_item(
+                name="vm-2",
+                extra_data={"VCpuCount": {"value": 2}, "Containers": [{"name": "app"}]},
+            ),
+        ],
+        "AzureKeyVault": [make_orca_asset_item(name="kv-1")],
+    })
+
+    async def run():
+        async with AsyncOrcaClient("token", transport=transport) as client:
+            return await fetch_inventory_async(client)
+
+    inventory = asyncio.run(run())
+    assert len(inventory.defender_configs) == 1
+    assert [vm.name for vm in inventory.vms] == ["vm-1", "vm-2"]
+    assert [h.vcpu_count for h in inventory.container_hosts] == [2]
+    assert [k.name for k in inventory.key_vaults] == ["kv-1"]
+    assert inventory.app_services == []
+    assert set(inventory.timings) == {"defender_configs", "vms", "app_services", "storage_accounts", "key_vaults"}
@@ -0,0 +1,96 @@
+"""Tests for defender_savings.api.cache.ResponseCache."""
+
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+
+from defender_savings.api.cache import ResponseCache
+from defender_savings.api.client import build_query_body
+
+
+def _body(start_at: int = 0, with_filter: dict | None = None) -> dict:
+    return build_query_body(["AzureComputeVm"], ["Name"], 100, start_at, with_filter)
+
+
+# ── Round trip ────────────────────────────────────────────────────────
+
+
+def test_put_then_get(tmp_path: Path) -> None:
+    cache = ResponseCache(tmp_path)
+    cache.put("scope", _body(), {"data": [{"id": "1"}]})
+
+    assert cache.get("scope", _body()) == {"data": [{"id": "1"}]}
+    assert cache.hits == 1
+
+
+# ── Key covers page, filter and scope ─────────────────────────────────
+
+
+def test_key_distinguishes_page_filter_and_scope(tmp_path: Path) -> None:
+    cache = ResponseCache(tmp_path)
+    cache.put("scope", _body(), {"data": []})
+
+    assert cache.get("scope", _body(start_at=100)) is None
+    assert cache.get("scope", _body(with_filter={"operator": "and"})) is None
+    assert cache.get("other-token", _body()) is None
+    assert cache.misses == 3
+
+
+# ── TTL ───────────────────────────────────────────────────────────────
+
+
+def test_expired_entry_is_a_miss(tmp_path: Path) -> None:
+    cache = ResponseCache(tmp_path, ttl=60)
+    cache.put("scope", _body(), {"data": []})
+    (entry,) = tmp_path.glob("*.json")
+    old = time.time() - 120
+    os.utime(entry, (old, old))
+
+    assert cache.get("scope", _body()) is None
+
+
+def test_oldest_hit_tracks_age_of_served_entries(tmp_path: Path) -> None:
+    cache = ResponseCache(tmp_path, ttl=600)
+    assert cache.oldest_hit is None
+    cache.put("scope", _body(), {"data": []})
+    cache.put("scope", _body(start_at=100), {"data": []})
+    old = time.time() - 300
+    os.utime(cache._path("scope", _body(start_at=100)), (old, old))
+
+    cache.get("scope", _body())
+    cache.get("scope", _body(start_at=100))
+    assert cache.oldest_hit == old
+
+
+# ── Refresh ───────────────────────────────────────────────────────────
+
+
+def test_refresh_misses_but_writes(tmp_path: Path) -> None:
+    ResponseCache(tmp_path).put("scope", _body(), {"data": ["old"]})
+    refreshing = ResponseCache(tmp_path, refresh=True)
+
+    assert refreshing.get("scope", _body()) is None
+    refreshing.put("scope", _body(), {"data": ["new"]})
+    assert ResponseCache(tmp_path).get("scope", _body()) == {"data": ["new"]}
+
+
+# ── LRU eviction ──────────────────────────────────────────────────────
+
+
+def test_evicts_least_recently_used(tmp_path: Path) -> None:
+    payload = {"data": ["x" * 100]}
+    cache = ResponseCache(tmp_path, max_bytes=300)
+    cache.put("scope", _body(0), payload)
+    cache.put("scope", _body(100), payload)
+    # Make page 0 the most recently used one
+    for i, entry in enumerate(sorted(tmp_path.glob("*.json"))):
+        os.utime(entry, (time.time() - 100 + i, time.time()))
+    assert cache.get("scope", _body(0)) is not None
+
+    cache.put("scope", _body(200), payload)
+
+    assert cache.get("scope", _body(0)) is not None
+    assert cache.get("scope", _body(100)) is None
+    assert cache.get("scope", _body(200)) is not None
@@ -0,0 +1,429 @@
+"""Tests for defender_savings.api.client.OrcaClient pagination."""
+
+from __future__ import annotations
+
+import json
+import threading
+from pathlib import Path
+
+import pytest
+import requests
+
+from defender_savings.api.cache import ResponseCache
+from defender_savings.api.checkpoint import CheckpointStore
+from defender_savings.api.client import CountUnavailableError, OrcaClient, build_query_body
+from defender_savings.api.filters import all_of, scope_filter
+from defender_savings.api.transport import ConcurrencyLimiter, Transport
+
+
+class _FakeResponse:
+    def __init__(self, payload: dict, status_code: int = 200) -> None:
+        self._payload = payload
+        self.status_code = status_code
+        self.content = json.dumps(payload).encode()
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} error", response=self)
+
+    def json(self) -> dict:
+        return self._payload
+
+
+def _keyset_after(with_filter: dict | None) -> str | None:
+    if not with_filter:
+        return None
+    if with_filter.get("operator") == "gt":
+        return with_filter["values"][0]
+    for sub in with_filter.get("values", []):
+        if isinstance(sub, dict) and (found := _keyset_after(sub)) is not None:
+            return found
+    return None
+
+
+def _first_row(body: dict) -> int:
+    """Index of the first row a request asks for, under either pagination mode."""
+    after = _keyset_after(body["query"].get("with"))
+    return body["start_at_index"] + (int(after) + 1 if after is not None else 0)
+
+
+class _FakeSession:
+    """Serves ``total`` numbered items, honouring limit/start_at_index."""
+
+    def __init__(
+        self, total: int, report_total: bool = True, max_limit: int | None = None, reject_status: int = 413,
+    ) -> None:
+        self.total = total
+        self.report_total = report_total
+        self.max_limit = max_limit
+        self.reject_status = reject_status
+        self.bodies: list[dict] = []
+        self._lock = threading.Lock()
+
+    def post(self, url: str, json: dict, timeout: tuple[float, float] | None = None) -> _FakeResponse:
+        with self._lock:
+            self.bodies.append(json)
+        start, limit = _first_row(json), json["limit"]
+        if self.max_limit is not None and limit > self.max_limit:
+            return _FakeResponse({"error": "page too large"}, status_code=self.reject_status)
+        rows = range(start, min(start + limit, self.total))
+        payload: dict = {"data": [{"id": str(i), "data": {"AssetUniqueId": {"value": f"{i:06d}"}}} for i in rows]}
+        if json["get_results_and_count"] and self.report_total:
+            payload["total_items"] = self.total
+        return _FakeResponse(payload)
+
+
+def _client(session: _FakeSession, page_workers: int = 1, **kwargs) -> OrcaClient:
+    kwargs.setdefault("transport", Transport(ConcurrencyLimiter(10), sleep=lambda _: None))
+    client = OrcaClient("token", page_workers=page_workers, **kwargs)
+    client._session = session  # type: ignore[assignment]
+    return client
+
+
+def _ids(items: list[dict]) -> list[int]:
+    return [int(item["id"]) for item in items]
+
+
+# ── Request body ──────────────────────────────────────────────────────
+
+
+def test_build_query_body_includes_filter_only_when_given() -> None:
+    body = build_query_body(["AzureComputeVm"], ["Name"], limit=50, start_at=100)
+    assert body["limit"] == 50
+    assert body["start_at_index"] == 100
+    assert "with" not in body["query"]
+
+    filtered = build_query_body(["AzureComputeVm"], ["Name"], 50, 0, with_filter={"operator": "and"})
+    assert filtered["query"]["with"] == {"operator": "and"}
+
+
+# ── Sequential pagination ─────────────────────────────────────────────
+
+
+@pytest.mark.parametrize("total", [0, 7, 10, 25])
+def test_sequential_returns_everything_in_order(total: int) -> None:
+    session = _FakeSession(total)
+    items = _client(session).query(["M"], ["Name"], limit=10)
+    assert _ids(items) == list(range(total))
+
+
+# ── Parallel pagination ───────────────────────────────────────────────
+
+
+@pytest.mark.parametrize("report_total", [True, False], ids=["counted", "probed"])
+@pytest.mark.parametrize("total", [0, 7, 10, 25, 100, 101])
+def test_parallel_matches_sequential(total: int, report_total: bool) -> None:
+    session = _FakeSession(total, report_total=report_total)
+    items = _client(session, page_workers=4).query(["M"], ["Name"], limit=10)
+    assert _ids(items) == list(range(total))
+
+
+def test_parallel_with_count_fetches_each_page_once() -> None:
+    session = _FakeSession(95)
+    _client(session, page_workers=3).query(["M"], ["Name"], limit=10)
+
+    offsets = sorted(body["start_at_index"] for body in session.bodies)
+    assert offsets == list(range(0, 100, 10))
+    assert session.bodies[0]["get_results_and_count"] is True
+
+
+def test_query_page_workers_override() -> None:
+    session = _FakeSession(30)
+    items = _client(session, page_workers=1).query(["M"], ["Name"], limit=10, page_workers=4)
+    assert _ids(items) == list(range(30))
+    assert session.bodies[0]["get_results_and_count"] is True
+
+
+# ── Streaming pages ───────────────────────────────────────────────────
+
+
+@pytest.mark.parametrize("page_workers", [1, 3])
+def test_iter_pages_yields_one_list_per_page(page_workers: int) -> None:
+    session = _FakeSession(25)
+    pages = list(_client(session, page_workers).iter_pages(["M"], ["Name"], limit=10))
+    assert [len(p) for p in pages] == [10, 10, 5]
+    assert _ids([i for p in pages for i in p]) == list(range(25))
+
+
+@pytest.mark.parametrize("page_workers", [1, 3])
+def test_iter_pages_is_lazy(page_workers: int) -> None:
+    session = _FakeSession(10_000, report_total=False)
+    pages = _client(session, page_workers).iter_pages(["M"], ["Name"], limit=10)
+
+    first = next(pages)
+    pages.close()
+
+    assert _ids(first) == list(range(10))
+    # Only the first page plus at most one read-ahead window was requested
+    assert len(session.bodies) <= 1 + page_workers
+
+
+def test_iter_query_yields_items() -> None:
+    session = _FakeSession(15)
+    assert _ids(list(_client(session).iter_query(["M"], ["Name"], limit=10))) == list(range(15))
+
+
+# ── Response cache ────────────────────────────────────────────────────
+
+
+def test_repeat_query_served_from_cache(tmp_path) -> None:
+    cache = ResponseCache(tmp_path)
+    first = OrcaClient("token", cache=cache)
+    first._session = _FakeSession(25)  # type: ignore[assignment]
+    first.query(["M"], ["Name"], limit=10)
+
+    second = OrcaClient("token", cache=cache)
+    second._session = session = _FakeSession(25)  # type: ignore[assignment]
+    items = second.query(["M"], ["Name"], limit=10)
+
+    assert _ids(items) == list(range(25))
+    assert session.bodies == []
+
+
+# ── Server-side count ─────────────────────────────────────────────────
+
+
+def test_count() -> None:
+    session = _FakeSession(250)
+    assert _client(session).count(["M"]) == 250
+    assert session.bodies[0]["limit"] == 1
+    assert session.bodies[0]["get_results_and_count"] is True
+
+
+def test_count_without_total_fails_fast() -> None:
+    session = _FakeSession(250, report_total=False)
+    with pytest.raises(CountUnavailableError, match="no result count"):
+        _client(session).count(["M"])
+    assert len(session.bodies) == 1
+
+
+# ── Adaptive page sizing ──────────────────────────────────────────────
+
+
+@pytest.mark.parametrize("page_workers", [1, 3])
+@pytest.mark.parametrize("total", [0, 30, 1234])
+def test_adaptive_paging_returns_everything_in_order(total: int, page_workers: int) -> None:
+    session = _FakeSession(total)
+    client = _client(session, page_workers, adaptive_paging=True, max_page_size=400)
+    items = client.query(["M"], ["Name"], limit=25)
+
+    assert _ids(items) == list(range(total))
+    assert max(body["limit"] for body in session.bodies) <= 400
+
+
+def test_adaptive_paging_grows_fast_pages() -> None:
+    session = _FakeSession(2000)
+    _client(session, adaptive_paging=True, max_page_size=400).query(["M"], ["Name"], limit=25)
+
+    limits = [body["limit"] for body in session.bodies]
+    assert limits[:5] == [25, 50, 100, 200, 400]
+    assert len(session.bodies) < 2000 // 25
+
+
+@pytest.mark.parametrize("page_workers", [1, 3])
+def test_adaptive_paging_splits_rejected_pages(page_workers: int) -> None:
+    session = _FakeSession(1000, max_limit=100)
+    client = _client(session, page_workers, adaptive_paging=True, max_page_size=800)
+    items = client.query(["M"], ["Name"], limit=50)
+
+    assert _ids(items) == list(range(1000))
+    # Split on the first 413, never retried at the same size
+    assert client.transport.stats.retries == 0
+
+
+def test_adaptive_paging_splits_pages_that_keep_failing() -> None:
+    session = _FakeSession(1000, max_limit=100, reject_status=504)
+    transport = Transport(ConcurrencyLimiter(10), max_retries=2, sleep=lambda _: None)
+    client = _client(session, adaptive_paging=True, max_page_size=800, transport=transport)
+    items = client.query(["M"], ["Name"], limit=50)
+
+    assert _ids(items) == list(range(1000))
+    # The 200-item page was retried at the same size before it was split
+    assert [body["limit"] for body in session.bodies[:6]] == [50, 100, 200, 200, 200, 100]
+
+
+def test_adaptive_paging_retries_server_errors_at_the_same_size() -> None:
+    session = _FlakySession(1000, fail_at=0, failures=1)
+    client = _client(session, adaptive_paging=True, max_page_size=800)
+    items = client.query(["M"], ["Name"], limit=400)
+
+    assert _ids(items) == list(range(1000))
+    # A 502 is not taken for "page too large": the page is retried, not split
+    assert [body["limit"] for body in session.bodies[:2]] == [400, 400]
+    assert client.transport.stats.retries == 1
+
+
+def test_adaptive_paging_keeps_its_page_size_through_flaky_server_errors() -> None:
+    session = _FakeSession(5000)
+    calls = 0
+    serve = session.post
+
+    def flaky_post(url: str, json: dict, timeout: tuple[float, float] | None = None) -> _FakeResponse:
+        nonlocal calls
+        calls += 1
+        if calls % 3 == 0:
+            return _FakeResponse({"error": "bad gateway"}, status_code=502)
+        return serve(url, json)
+
+    session.post = flaky_post  # type: ignore[method-assign]
+    items = _client(session, adaptive_paging=True, max_page_size=800).query(["M"], ["Name"], limit=100)
+
+    assert _ids(items) == list(range(5000))
+    # Grown to the maximum and kept there: no 502 lowered the ceiling
+    limits = [body["limit"] for body in session.bodies]
+    assert limits[-2:] == [800, 800]
+    assert len(limits) < 20
+
+
+def test_fixed_limit_rejection_still_raises() -> None:
+    session = _FakeSession(1000, max_limit=50)
+    with pytest.raises(requests.HTTPError):
+        _client(session).query(["M"], ["Name"], limit=100)
+
+
+def test_adaptive_paging_replays_plan_from_cache(tmp_path) -> None:
+    cache = ResponseCache(tmp_path)
+    _client(_FakeSession(3000), adaptive_paging=True, cache=cache).query(["M"], ["Name"], limit=25)
+
+    session = _FakeSession(3000)
+    items = _client(session, adaptive_paging=True, cache=cache).query(["M"], ["Name"], limit=25)
+
+    assert _ids(items) == list(range(3000))
+    assert session.bodies == []
+
+
+# ── Keyset pagination ─────────────────────────────────────────────────
+
+
+@pytest.mark.parametrize("adaptive", [False, True])
+@pytest.mark.parametrize("total", [0, 10, 25, 301])
+def test_keyset_returns_everything_in_order(total: int, adaptive: bool) -> None:
+    session = _FakeSession(total)
+    client = _client(session, page_workers=4, pagination="keyset", adaptive_paging=adaptive)
+    items = client.query(["M"], ["Name", "AssetUniqueId"], limit=10)
+
+    assert _ids(items) == list(range(total))
+    assert all(body["start_at_index"] == 0 for body in session.bodies)
+    assert all(body["order_by[]"] == ["AssetUniqueId"] for body in session.bodies)
+    assert all("AssetUniqueId" in body["select"] for body in session.bodies)
+
+
+def test_keyset_combines_with_existing_filter() -> None:
+    session = _FakeSession(25)
+    base = {"key": "State", "values": ["running"], "type": "str", "operator": "in"}
+    _client(session, pagination="keyset").query(["M"], ["Name", "AssetUniqueId"], limit=10, with_filter=base)
+
+    assert session.bodies[0]["query"]["with"] == base
+    second = session.bodies[1]["query"]["with"]
+    assert second["operator"] == "and"
+    assert second["values"][0] == base
+    assert second["values"][1]["values"] == ["000009"]
+
+
+def test_keyset_mode_pages_by_offset_without_keyset_key() -> None:
+    session = _FakeSession(25)
+    items = _client(session, pagination="keyset").query(["M"], ["Name"], limit=10)
+
+    assert _ids(items) == list(range(25))
+    assert [body["start_at_index"] for body in session.bodies] == [0, 10, 20]
+    assert all("order_by[]" not in body for body in session.bodies)
+
+
+def test_unknown_pagination_mode_rejected() -> None:
+    with pytest.raises(ValueError, match="Unknown pagination"):
+        OrcaClient("token", pagination="cursor")
+
+
+# ── Resumable crawls ──────────────────────────────────────────────────
+
+
+class _FlakySession(_FakeSession):
+    """Fails requests at or past ``fail_at`` with a 502 until ``healed``, or for the first ``failures`` of them."""
+
+    def __init__(self, total: int, fail_at: int, failures: int | None = None) -> None:
+        super().__init__(total)
+        self.fail_at = fail_at
+        self.failures = failures
+        self.healed = False
+
+    def post(self, url: str, json: dict, timeout: tuple[float, float] | None = None) -> _FakeResponse:
+        if not self.healed and _first_row(json) >= self.fail_at and self.failures != 0:
+            if self.failures is not None:
+                self.failures -= 1
+            with self._lock:
+                self.bodies.append(json)
+            return _FakeResponse({"error": "bad gateway"}, status_code=502)
+        return super().post(url, json)
+
+
+@pytest.mark.parametrize(
+    ("page_workers", "pagination"),
+    [(1, "offset"), (4, "offset"), (1, "keyset")],
+    ids=["sequential", "parallel", "keyset"],
+)
+def test_resume_continues_after_last_saved_page(tmp_path: Path, page_workers: int, pagination: str) -> None:
+    session = _FlakySession(95, fail_at=50)
+    with pytest.raises(requests.HTTPError):
+        _client(session, page_workers, pagination=pagination, checkpoints=CheckpointStore(tmp_path)).query(
+            ["M"], ["Name", "AssetUniqueId"], limit=10,
+        )
+
+    session.healed = True
+    session.bodies.clear()
+    resumed = _client(session, page_workers, pagination=pagination, checkpoints=CheckpointStore(tmp_path, resume=True))
+    items = resumed.query(["M"], ["Name", "AssetUniqueId"], limit=10)
+
+    assert _ids(items) == list(range(95))
+    # Only the pages from the failure onwards are fetched again
+    assert min(_first_row(body) for body in session.bodies) == 50
+
+
+def test_completed_crawl_leaves_no_checkpoint(tmp_path: Path) -> None:
+    session = _FakeSession(25)
+    _client(session, checkpoints=CheckpointStore(tmp_path)).query(["M"], ["Name"], limit=10)
+
+    session.bodies.clear()
+    _client(session, checkpoints=CheckpointStore(tmp_path, resume=True)).query(["M"], ["Name"], limit=10)
+    assert session.bodies[0]["start_at_index"] == 0
+
+
+# ── Scoped runs ───────────────────────────────────────────────────────
+
+
+def test_scope_is_anded_into_every_query() -> None:
+    session = _FakeSession(25)
+    scope = scope_filter(subscriptions=["sub-1"])
+    base = {"key": "State", "values": ["running"], "type": "str", "operator": "in"}
+    client = _client(session, page_workers=2, scope=scope)
+
+    client.query(["M"], ["Name"], limit=10, with_filter=base)
+    client.count(["M"])
+
+    *query_bodies, count_body = session.bodies
+    assert all(body["query"]["with"] == all_of(scope, base) for body in query_bodies)
+    assert count_body["query"]["with"] == scope
+
+
+# ── Compressed transport ──────────────────────────────────────────────
+
+
+class _CompressedSession(_FakeSession):
+    """Reports each body as having arrived in a tenth of its decoded size."""
+
+    def post(self, url: str, json: dict, timeout: tuple[float, float] | None = None) -> _FakeResponse:
+        response = super().post(url, json, timeout)
+        wire = len(response.content) // 10
+        response.raw = type("_Raw", (), {"tell": lambda self: wire})()  # type: ignore[attr-defined]
+        return response
+
+
+def test_negotiates_compression_and_counts_wire_bytes() -> None:
+    client = OrcaClient("token")
+    assert "gzip" in client._session.headers["Accept-Encoding"]
+
+    session = _CompressedSession(25)
+    client = _client(session)
+    client.query(["M"], ["Name"], limit=10)
+
+    stats = client.transport.stats
+    assert 0 < stats.wire_bytes <= stats.decoded_bytes // 10
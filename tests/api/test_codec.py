@@ -0,0 +1,25 @@
+"""Tests for defender_savings.api.codec — content negotiation and JSON codec."""
+
+from __future__ import annotations
+
+import pytest
+
+from defender_savings.api import codec
+
+
+def test_accepts_gzip_at_least() -> None:
+    assert "gzip" in codec.ACCEPTED_ENCODINGS.split(",")
+
+
+@pytest.mark.parametrize("fast", [True, False], ids=["orjson", "stdlib"])
+def test_round_trip(monkeypatch: pytest.MonkeyPatch, fast: bool) -> None:
+    if fast:
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(codec, "orjson", None)
+
+    page = {"data": [{"id": "1", "data": {"Tags": {"value": {"env": "prod"}}, "PublicIps": {"value": ["1.2.3.4"]}}}]}
+    raw = codec.dumps(page)
+
+    assert isinstance(raw, bytes)
+    assert codec.loads(raw) == page
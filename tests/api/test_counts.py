@@ -0,0 +1,86 @@
+"""Tests for defender_savings.api.counts — count-only mode."""
+
+from __future__ import annotations
+
+from defender_savings.api.client import CountUnavailableError
+from defender_savings.api.counts import count_resources
+from defender_savings.api.fetch import count_inventory
+from conftest import FakeOrcaClient, make_orca_asset_item, make_orca_defender_item
+
+
+def _host(name: str, account: str, vcpus: int) -> dict:
+    return make_orca_asset_item(
+        name=name,
+        cloud_account_name=account,
+        extra_data={"VCpuCount": {"value": vcpus}, "Containers": [{"name": "c"}]},
+    )
+
+
+def _client() -> FakeOrcaClient:
+    host_a, host_b = _host("h-a", "a", 8), _host("h-b", "b", 2)
+    return FakeOrcaClient(
+        items={
+            "AzureDefenderForCloud": [
+                make_orca_defender_item(cloud_account_name="a"),
+                make_orca_defender_item(cloud_account_name="b"),
+            ],
+            "AzureComputeVm": [make_orca_asset_item(cloud_account_name="a"), host_a, host_b],
+            "AzureWebAppService": [make_orca_asset_item(cloud_account_name="b")],
+            "AzureStorageAccount": [make_orca_asset_item(cloud_account_name="a")],
+            "AzureKeyVault": [make_orca_asset_item(cloud_account_name="unknown")],
+        },
+        filtered={"AzureComputeVm": [host_a, host_b]},
+    )
+
+
+# ── Same counts as the full-inventory path ────────────────────────────
+
+
+def test_count_resources_matches_full_fetch() -> None:
+    counted = count_resources(_client(), ["a", "b"], max_workers=2)
+    full = count_inventory(_client()).counter
+
+    assert counted.result(["a", "b"]) == full.result(["a", "b"])
+    assert counted.result(["a"])["a"]["virtual_machines"] == 2
+    assert counted.result(["a"])["a"]["container_vcores"] == 8
+
+
+# ── Minimal projection for the vCore sum ──────────────────────────────
+
+
+def test_vcore_query_uses_minimal_projection() -> None:
+    client = _client()
+    count_resources(client, ["a"])
+
+    (vcore_call,) = [c for c in client.calls if "select" in c]
+    assert vcore_call["select"] == ["CloudAccount.Name", "VCpuCount"]
+    assert vcore_call["with_filter"] is not None
+
+
+# ── Duplicate account names counted once ──────────────────────────────
+
+
+def test_duplicate_account_names_counted_once() -> None:
+    client = _client()
+    counter = count_resources(client, ["a", "a"])
+
+    assert counter.result(["a"])["a"]["virtual_machines"] == 2
+    assert len([c for c in client.calls if c.get("count")]) == 4
+
+
+# ── Servers without totals are streamed once, not paged per account ──
+
+
+class _NoTotalsClient(FakeOrcaClient):
+    def count(self, models: list[str], with_filter: dict | None = None) -> int:
+        self.calls.append({"models": models, "count": True, "with_filter": with_filter})
+        raise CountUnavailableError(f"The API reported no result count for models {models}")
+
+
+def test_falls_back_to_streaming_without_totals() -> None:
+    client = _NoTotalsClient(items=_client().items, filtered=_client().filtered)
+    counter = count_resources(client, ["a", "b"], max_workers=2)
+
+    assert counter.result(["a", "b"]) == count_inventory(_client()).counter.result(["a", "b"])
+    assert len([c for c in client.calls if c.get("count")]) == 1
+    assert len([c for c in client.calls if "select" in c]) == 5
@@ -0,0 +1,196 @@
+"""Tests for defender_savings.api.fetch — concurrent inventory counts."""
+
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from defender_savings.api.defender import list_defender_configs
+from defender_savings.api.fetch import Inventory, count_inventory, iter_account_counts
+from defender_savings.api.resources import (
+    list_app_services,
+    list_key_vaults,
+    list_storage_accounts,
+    list_vms_and_container_hosts,
+)
+from conftest import FakeOrcaClient, make_orca_asset_item, make_orca_defender_item
+
+
+def _client() -> FakeOrcaClient:
+    return FakeOrcaClient(
+        items={
+            "AzureDefenderForCloud": [make_orca_defender_item(cloud_account_name="acct-1")],
+            "AzureComputeVm": [
+                make_orca_asset_item(
+                    name="vm-1",
+                    extra_data={"VCpuCount": {"value": 8}, "Containers": [{"name": "nginx"}]},
+                    asset_type="AzureComputeVm",
+                ),
+                make_orca_asset_item(name="vm-2", asset_type="AzureComputeVm"),
+            ],
+            "AzureWebAppService": [make_orca_asset_item(name="app-1", asset_type="AzureWebAppService")],
+            "AzureStorageAccount": [make_orca_asset_item(name="sa-1", asset_type="AzureStorageAccount")],
+            "AzureKeyVault": [make_orca_asset_item(name="kv-1", asset_type="AzureKeyVault")],
+        },
+    )
+
+
+# ── All resource types counted ────────────────────────────────────────
+
+
+@pytest.mark.parametrize("workers", [1, 6])
+def test_count_inventory_collects_every_query(workers: int) -> None:
+    inventory = count_inventory(_client(), max_workers=workers)
+
+    assert [c.cloud_account_name for c in inventory.defender_configs] == ["acct-1"]
+    counts = inventory.counter.result(["acct-1"])["acct-1"]
+    assert counts["virtual_machines"] == 2
+    assert counts["container_vcores"] == 8
+
+
+# ── AzureComputeVm crawled once ──────────────────────────────────────
+
+
+def test_count_inventory_crawls_compute_vms_once() -> None:
+    client = _client()
+    count_inventory(client)
+
+    vm_calls = [c for c in client.calls if c["models"] == ["AzureComputeVm"]]
+    assert len(vm_calls) == 1
+    assert vm_calls[0]["with_filter"] is None
+    assert {"VCpuCount", "Containers.Name", "AssetUniqueId"} <= set(vm_calls[0]["select"])
+
+
+# ── One timing per query ──────────────────────────────────────────────
+
+
+def test_count_inventory_reports_timings() -> None:
+    inventory = count_inventory(_client())
+
+    assert set(inventory.timings) == {"defender_configs", "vms", "app_services", "storage_accounts", "key_vaults"}
+    assert all(t >= 0 for t in inventory.timings.values())
+
+
+# ── Failures propagate ────────────────────────────────────────────────
+
+
+def test_count_inventory_propagates_errors() -> None:
+    client = _client()
+
+    def boom(*args, **kwargs):
+        raise RuntimeError("api down")
+
+    client.iter_pages = boom  # type: ignore[method-assign]
+    with pytest.raises(RuntimeError, match="api down"):
+        count_inventory(client)
+
+
+# ── Streaming count matches list fetch ────────────────────────────────
+
+
+def test_count_inventory_matches_listed_inventory() -> None:
+    counted = count_inventory(_client(), max_workers=3)
+    client = _client()
+    vms, hosts = list_vms_and_container_hosts(client)
+    listed = Inventory(
+        defender_configs=list_defender_configs(client),
+        vms=vms,
+        app_services=list_app_services(client),
+        storage_accounts=list_storage_accounts(client),
+        key_vaults=list_key_vaults(client),
+        container_hosts=hosts,
+    ).to_counts()
+
+    assert counted.defender_configs == listed.defender_configs
+    assert counted.counter.result(["acct-1"]) == listed.counter.result(["acct-1"])
+
+
+# ── Combined multi-model query ────────────────────────────────────────
+
+
+def test_combined_count_matches_per_model_queries() -> None:
+    client = _client()
+    combined = count_inventory(client, combined=True)
+    separate = count_inventory(_client())
+
+    assert combined.counter.result(["acct-1"]) == separate.counter.result(["acct-1"])
+    resource_calls = [c for c in client.calls if c["models"] != ["AzureDefenderForCloud"]]
+    assert len(resource_calls) == 1
+    assert set(combined.timings) == {"defender_configs", "assets"}
+
+
+# ── Account groups streamed as they complete ──────────────────────────
+
+
+def _multi_account_client() -> FakeOrcaClient:
+    return FakeOrcaClient(
+        items={
+            "AzureComputeVm": [
+                make_orca_asset_item(name=f"vm-{i}", cloud_account_name=f"acct-{i % 3}", asset_type="AzureComputeVm")
+                for i in range(9)
+            ],
+            "AzureKeyVault": [make_orca_asset_item(name="kv-1", cloud_account_name="acct-2", asset_type="AzureKeyVault")],
+        },
+    )
+
+
+@pytest.mark.parametrize("combined", [False, True])
+def test_iter_account_counts_yields_every_account_once(combined: bool) -> None:
+    accounts = ["acct-0", "acct-1", "acct-2", "acct-empty"]
+    groups = list(iter_account_counts(_multi_account_client(), accounts, groups=3, combined=combined))
+
+    # The account without resources is final before anything is fetched
+    assert groups[0][0] == ["acct-empty"]
+    assert sorted(name for names, _ in groups for name in names) == sorted(accounts)
+    assert len(groups) == 4
+
+    counts = {name: counter.result([name])[name] for names, counter in groups for name in names}
+    assert counts["acct-2"]["virtual_machines"] == 3
+    assert counts["acct-2"]["key_vaults"] == 1
+    assert counts["acct-empty"]["virtual_machines"] == 0
+
+
+def test_iter_account_counts_queries_only_the_group_accounts() -> None:
+    client = _multi_account_client()
+    [(names, counter)] = iter_account_counts(client, ["acct-0", "acct-1"], groups=1)
+
+    assert names == ["acct-0", "acct-1"]
+    assert counter.assets_seen["virtual_machines"] == 6  # acct-2's VMs and key vault never fetched
+    assert counter.assets_seen["key_vaults"] == 0
+
+    # A single group is not planned, so no accounts are sized
+    assert not [c for c in client.calls if c.get("count")]
+
+
+def test_iter_account_counts_defaults_to_a_group_per_worker() -> None:
+    accounts = ["acct-0", "acct-1", "acct-2"]
+    groups = list(iter_account_counts(_multi_account_client(), accounts, max_workers=3))
+
+    assert sorted(names for names, _ in groups) == [["acct-0"], ["acct-1"], ["acct-2"]]
+
+
+def test_iter_account_counts_without_counts_splits_accounts_evenly() -> None:
+    accounts = [f"acct-{i}" for i in range(10)]
+    client = FakeOrcaClient(items=_multi_account_client().items, report_totals=False)
+    groups = list(iter_account_counts(client, accounts, max_workers=6))
+
+    assert len(groups) == 6
+    assert sorted(name for names, _ in groups for name in names) == sorted(accounts)
+    counts = {name: counter.result([name])[name] for names, counter in groups for name in names}
+    assert [counts[f"acct-{i}"]["virtual_machines"] for i in range(3)] == [3, 3, 3]
+    assert counts["acct-9"]["virtual_machines"] == 0
+
+
+def test_iter_account_counts_runs_a_groups_queries_concurrently() -> None:
+    class _Rendezvous(FakeOrcaClient):
+        # Every resource query must be in flight at once to get past the barrier
+        barrier = threading.Barrier(4, timeout=5)
+
+        def iter_pages(self, *args, **kwargs):
+            self.barrier.wait()
+            return super().iter_pages(*args, **kwargs)
+
+    client = _Rendezvous(items=_multi_account_client().items)
+    [(_, counter)] = iter_account_counts(client, ["acct-0", "acct-1", "acct-2"], groups=1, max_workers=4)
+    assert counter.assets_seen["virtual_machines"] == 9
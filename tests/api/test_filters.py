@@ -0,0 +1,39 @@
+"""Tests for defender_savings.api.filters — query filter builders."""
+
+from __future__ import annotations
+
+from defender_savings.api.filters import all_of, cloud_account_filter, scope_filter, subscription_filter
+
+
+# ── all_of ────────────────────────────────────────────────────────────
+
+
+def test_all_of_skips_missing_filters() -> None:
+    accounts = cloud_account_filter(["a"])
+    assert all_of(None, None) is None
+    assert all_of(None, accounts) == accounts
+    assert all_of(accounts, subscription_filter(["s"]))["operator"] == "and"
+
+
+# ── Scoped runs ───────────────────────────────────────────────────────
+
+
+def test_scope_filter_is_none_for_whole_tenant() -> None:
+    assert scope_filter() is None
+    assert scope_filter([], [], []) is None
+
+
+def test_scope_filter_ands_selectors_and_ors_values() -> None:
+    scope = scope_filter(accounts=["a", "b"], subscriptions=["sub-1"], business_units=["Finance"])
+
+    assert scope["operator"] == "and"
+    accounts, subscriptions, units = scope["values"]
+    assert accounts["with"] == {"key": "Name", "values": ["a", "b"], "type": "str", "operator": "in"}
+    assert subscriptions["keys"] == ["CloudAccount"]
+    assert subscriptions["with"]["key"] == "CloudProviderId"
+    assert units["keys"] == ["BusinessUnits"]
+    assert units["with"]["values"] == ["Finance"]
+
+
+def test_single_selector_is_not_wrapped() -> None:
+    assert scope_filter(subscriptions=["sub-1"]) == subscription_filter(["sub-1"])
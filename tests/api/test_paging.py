@@ -0,0 +1,84 @@
+"""Tests for defender_savings.api.paging.PageSizer."""
+
+from __future__ import annotations
+
+from defender_savings.api.paging import PageSizer
+
+
+def _sizer(**kwargs) -> PageSizer:
+    defaults = {"initial": 100, "min_size": 25, "max_size": 800, "target_latency": 2.0, "max_page_bytes": 1_000_000}
+    defaults.update(kwargs)
+    return PageSizer(**defaults)
+
+
+# ── Grow, shrink, hold ────────────────────────────────────────────────
+
+
+def test_grows_on_fast_small_pages_up_to_max() -> None:
+    sizer = _sizer()
+    for _ in range(10):
+        sizer.record(sizer.next_size(), latency=0.1, n_bytes=1000)
+    assert sizer.size == 800
+
+
+def test_shrinks_on_slow_pages_down_to_min() -> None:
+    sizer = _sizer()
+    for _ in range(10):
+        sizer.record(sizer.next_size(), latency=5.0, n_bytes=1000)
+    assert sizer.size == 25
+
+
+def test_shrinks_on_oversized_payload() -> None:
+    sizer = _sizer()
+    sizer.record(sizer.next_size(), latency=0.1, n_bytes=2_000_000)
+    assert sizer.size == 50
+
+
+def test_holds_between_half_and_full_target() -> None:
+    sizer = _sizer()
+    sizer.record(sizer.next_size(), latency=1.5, n_bytes=1000)
+    assert sizer.size == 100
+
+
+def test_does_not_grow_if_doubled_page_exceeds_payload_cap() -> None:
+    sizer = _sizer()
+    sizer.record(sizer.next_size(), latency=0.1, n_bytes=600_000)
+    assert sizer.size == 100
+
+
+# ── Rejection lowers the ceiling ──────────────────────────────────────
+
+
+def test_reject_caps_future_growth() -> None:
+    sizer = _sizer()
+    sizer.reject(400)
+    # Fewer fast pages at the ceiling than it takes to probe it again
+    for _ in range(8):
+        sizer.record(sizer.next_size(), latency=0.1, n_bytes=1000)
+    assert sizer.size == 200
+
+
+def test_ceiling_probes_upwards_after_fast_pages() -> None:
+    sizer = _sizer(probe_after=3)
+    sizer.reject(400)
+    sizes = []
+    for _ in range(8):
+        size = sizer.next_size()
+        sizes.append(size)
+        sizer.record(size, latency=0.1, n_bytes=1000)
+    assert sizes == [100, 200, 200, 200, 400, 400, 400, 800]
+
+
+# ── Plan replay ───────────────────────────────────────────────────────
+
+
+def test_replays_plan_then_adapts() -> None:
+    sizer = _sizer(plan=[100, 300, 300])
+    sizes = []
+    for _ in range(4):
+        size = sizer.next_size()
+        sizes.append(size)
+        sizer.record(size, latency=0.1, n_bytes=1000)
+    assert sizes == [100, 300, 300, 300]
+    assert sizer.size == 600
+    assert sizer.used == sizes
@@ -0,0 +1,95 @@
+"""Tests for defender_savings.api.parsing — process-pool page parsing."""
+
+from __future__ import annotations
+
+from functools import partial
+
+import pytest
+
+from defender_savings.api.client import Page
+from defender_savings.api.codec import dumps
+from defender_savings.api.fetch import count_inventory
+from defender_savings.api.parsing import ParsePool, count_raw_page
+from defender_savings.api.resources import parse_compute_vm_page, parse_model_page
+from defender_savings.models.compact import COMPACT, MODEL
+from defender_savings.models.resources import KeyVault
+from defender_savings.services.mapper import ColumnarResourceCounter, ResourceCounter
+from conftest import FakeOrcaClient, make_orca_asset_item, make_orca_defender_item
+
+
+def _vm_page(n: int, account: str) -> list[dict]:
+    return [
+        make_orca_asset_item(
+            name=f"vm-{i}",
+            cloud_account_name=account,
+            extra_data={"VCpuCount": {"value": 2}, "Containers": [{"name": "nginx"}]} if i % 2 else None,
+        )
+        for i in range(n)
+    ]
+
+
+# ── Single page, in process ───────────────────────────────────────────
+
+
+@pytest.mark.parametrize("form", [MODEL, COMPACT])
+def test_count_raw_page_counts_vms_and_container_hosts(form: str) -> None:
+    counter = count_raw_page(ResourceCounter, parse_compute_vm_page, form, dumps({"data": _vm_page(4, "acct-1")}))
+
+    counts = counter.result(["acct-1"])["acct-1"]
+    assert counts["virtual_machines"] == 4
+    assert counts["container_vcores"] == 4  # two hosts x 2 vCPUs
+
+
+# ── Worker processes ──────────────────────────────────────────────────
+
+
+def test_parse_pool_matches_inline_counting() -> None:
+    pages = [_vm_page(3, "acct-1"), _vm_page(5, "acct-2"), [], _vm_page(2, "acct-1")]
+
+    with ParsePool(workers=2, asset_form=COMPACT) as pool:
+        for new_counter in (ResourceCounter, ColumnarResourceCounter):
+            inline = new_counter()
+            for page in pages:
+                inline.add_page(parse_compute_vm_page(page, COMPACT))
+            pooled = pool.count_pages(iter(pages), parse_compute_vm_page, new_counter)
+
+            assert type(pooled) is new_counter
+            assert pooled.result(["acct-1", "acct-2"]) == inline.result(["acct-1", "acct-2"])
+            assert pooled.assets_seen == inline.assets_seen
+
+
+def test_parse_pool_ships_response_bodies_as_received() -> None:
+    page = _vm_page(3, "acct-1")
+    # The body is what the workers parse; the decoded items are not re-encoded
+    received = Page(page, dumps({"data": _vm_page(5, "acct-2"), "total_items": 5}))
+
+    with ParsePool(workers=1, asset_form=COMPACT) as pool:
+        counter = pool.count_pages([received, page], parse_compute_vm_page)
+
+    counts = counter.result(["acct-1", "acct-2"])
+    assert counts["acct-1"]["virtual_machines"] == 3
+    assert counts["acct-2"]["virtual_machines"] == 5
+
+
+def test_parse_pool_propagates_parse_errors() -> None:
+    with ParsePool(workers=1, asset_form=MODEL) as pool, pytest.raises(AttributeError):
+        pool.count_pages([["not an item"]], partial(parse_model_page, KeyVault))
+
+
+def test_count_inventory_with_parse_workers_matches_inline() -> None:
+    def client() -> FakeOrcaClient:
+        return FakeOrcaClient(
+            items={
+                "AzureDefenderForCloud": [make_orca_defender_item(cloud_account_name="acct-1")],
+                "AzureComputeVm": _vm_page(7, "acct-1"),
+                "AzureWebAppService": [make_orca_asset_item(name="app-1", asset_type="AzureWebAppService")],
+                "AzureStorageAccount": [make_orca_asset_item(name="sa-1", asset_type="AzureStorageAccount")],
+                "AzureKeyVault": [make_orca_asset_item(name="kv-1", asset_type="AzureKeyVault")],
+            },
+        )
+
+    pooled = count_inventory(client(), parse_workers=2)
+    inline = count_inventory(client())
+
+    assert pooled.defender_configs == inline.defender_configs
+    assert pooled.counter.result(["acct-1"]) == inline.counter.result(["acct-1"])
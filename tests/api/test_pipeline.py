@@ -0,0 +1,133 @@
+"""Tests for defender_savings.api.pipeline — threaded stages with bounded queues."""
+
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from defender_savings.api.fetch import count_inventory
+from defender_savings.api.pipeline import pipelined
+from conftest import FakeOrcaClient, make_orca_asset_item, make_orca_defender_item
+
+
+# ── Ordering and results ──────────────────────────────────────────────
+
+
+def test_items_pass_through_every_stage_in_order() -> None:
+    result = list(pipelined(range(20), lambda x: x + 1, lambda x: x * 10))
+    assert result == [(x + 1) * 10 for x in range(20)]
+
+
+def test_no_stages_and_empty_source() -> None:
+    assert list(pipelined(iter([1, 2]))) == [1, 2]
+    assert list(pipelined([], str)) == []
+
+
+# ── Stages overlap ────────────────────────────────────────────────────
+
+
+def test_stage_works_on_next_item_while_consumer_holds_previous() -> None:
+    second_started = threading.Event()
+
+    def stage(x: int) -> int:
+        if x == 1:
+            second_started.set()
+        return x
+
+    items = pipelined(range(3), stage)
+    assert next(items) == 0
+    # The consumer hasn't asked for item 1 yet, but the stage got to it anyway
+    assert second_started.wait(timeout=5)
+    assert list(items) == [1, 2]
+
+
+# ── Backpressure ──────────────────────────────────────────────────────
+
+
+def test_bounded_queues_hold_back_the_source() -> None:
+    produced: list[int] = []
+
+    def source():
+        for i in range(100):
+            produced.append(i)
+            yield i
+
+    items = pipelined(source(), lambda x: x, depth=2)
+    assert next(items) == 0
+    threading.Event().wait(0.3)  # let the source run as far ahead as it may
+
+    # two queues of 2, one item in the stage's hands, one being put by the source
+    assert len(produced) <= 7
+    assert list(items) == list(range(1, 100))
+
+
+# ── Errors and early exit ─────────────────────────────────────────────
+
+
+def test_stage_error_is_raised_to_consumer() -> None:
+    def stage(x: int) -> int:
+        if x == 3:
+            raise ValueError("bad page")
+        return x
+
+    with pytest.raises(ValueError, match="bad page"):
+        list(pipelined(range(10), stage))
+
+
+def test_source_error_is_raised_to_consumer() -> None:
+    def source():
+        yield 1
+        raise ConnectionError("fetch failed")
+
+    with pytest.raises(ConnectionError):
+        list(pipelined(source(), lambda x: x))
+
+
+def test_closing_early_stops_and_closes_source() -> None:
+    closed = threading.Event()
+
+    def source():
+        try:
+            i = 0
+            while True:
+                yield i
+                i += 1
+        finally:
+            closed.set()
+
+    items = pipelined(source(), lambda x: x)
+    assert next(items) == 0
+    items.close()
+
+    assert closed.is_set()
+    assert not [t for t in threading.enumerate() if t.name.startswith("pipeline-")]
+
+
+# ── count_inventory ───────────────────────────────────────────────────
+
+
+@pytest.mark.parametrize("combined", [False, True])
+def test_pipelined_count_inventory_matches_inline(combined: bool) -> None:
+    def client() -> FakeOrcaClient:
+        return FakeOrcaClient(
+            items={
+                "AzureDefenderForCloud": [make_orca_defender_item(cloud_account_name="acct-1")],
+                "AzureComputeVm": [
+                    make_orca_asset_item(
+                        name=f"vm-{i}",
+                        extra_data={"VCpuCount": {"value": 2}, "Containers": [{"name": "c"}]} if i % 2 else None,
+                        asset_type="AzureComputeVm",
+                    )
+                    for i in range(5)
+                ],
+                "AzureWebAppService": [make_orca_asset_item(name="app-1", asset_type="AzureWebAppService")],
+                "AzureStorageAccount": [make_orca_asset_item(name="sa-1", asset_type="AzureStorageAccount")],
+                "AzureKeyVault": [make_orca_asset_item(name="kv-1", asset_type="AzureKeyVault")],
+            },
+        )
+
+    pipelined_counts = count_inventory(client(), combined=combined, pipeline=True)
+    inline = count_inventory(client(), combined=combined)
+
+    assert pipelined_counts.counter.result(["acct-1"]) == inline.counter.result(["acct-1"])
@@ -0,0 +1,66 @@
+"""Tests for defender_savings.api.projection — select-list planning."""
+
+from __future__ import annotations
+
+import pytest
+
+from defender_savings.api.defender import list_defender_configs
+from defender_savings.api.projection import FULL, MINIMAL, plan_select
+from defender_savings.api.resources import list_vms_and_container_hosts
+from defender_savings.models.defender import DefenderConfig
+from defender_savings.models.resources import ContainerHost, VirtualMachine
+from conftest import FakeOrcaClient, make_orca_asset_item, make_orca_defender_item
+
+
+# ── Planner ───────────────────────────────────────────────────────────
+
+
+def test_minimal_is_union_of_declared_fields() -> None:
+    select = plan_select([VirtualMachine, ContainerHost], full=["Everything"])
+    assert select == ["Name", "CloudAccount.Name", "AssetUniqueId", "VCpuCount", "Containers.Name"]
+
+
+def test_full_profile_returns_full_list() -> None:
+    assert plan_select([VirtualMachine], full=["A", "B"], profile=FULL) == ["A", "B"]
+
+
+def test_unknown_profile_rejected() -> None:
+    with pytest.raises(ValueError, match="Unknown projection"):
+        plan_select([VirtualMachine], full=[], profile="tiny")
+
+
+# ── Minimal projection is enough to parse ─────────────────────────────
+
+
+def _strip(item: dict, select: list[str]) -> dict:
+    """Keep only the data fields a select list would return."""
+    roots = {field.split(".")[0] for field in select}
+    return {**item, "data": {k: v for k, v in item["data"].items() if k in roots}}
+
+
+def test_minimal_projection_parses_identically() -> None:
+    host = make_orca_asset_item(
+        name="host",
+        extra_data={
+            "VCpuCount": {"value": 8},
+            "Containers": [{"name": "c"}],
+            "Tags": {"value": {"env": "prod"}},
+            "OrcaScore": {"value": 5.5},
+        },
+    )
+    config = make_orca_defender_item(services_pricing={"VirtualMachines": "Standard"})
+    config["data"]["Settings"] = {"value": [{"name": "x"}]}
+
+    full_client = FakeOrcaClient(items={"AzureComputeVm": [host], "AzureDefenderForCloud": [config]})
+    full_client.projection = FULL
+    expected = (list_vms_and_container_hosts(full_client), list_defender_configs(full_client))
+
+    minimal_client = FakeOrcaClient(items={
+        "AzureComputeVm": [_strip(host, plan_select([VirtualMachine, ContainerHost], []))],
+        "AzureDefenderForCloud": [_strip(config, plan_select([DefenderConfig], []))],
+    })
+    actual = (list_vms_and_container_hosts(minimal_client), list_defender_configs(minimal_client))
+
+    assert minimal_client.projection == MINIMAL
+    assert actual == expected
+    assert all(len(c["select"]) < len(f["select"]) for c, f in zip(minimal_client.calls, full_client.calls))
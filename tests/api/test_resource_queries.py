@@ -0,0 +1,134 @@
+"""Tests for defender_savings.api.resources — streaming and list fetchers."""
+
+from __future__ import annotations
+
+import pytest
+
+from defender_savings.api.resources import (
+    iter_asset_pages,
+    iter_container_host_pages,
+    iter_raw_app_service_pages,
+    iter_raw_asset_pages,
+    iter_raw_compute_vm_pages,
+    iter_raw_key_vault_pages,
+    iter_raw_storage_account_pages,
+    iter_virtual_machine_pages,
+    list_container_hosts,
+    list_virtual_machines,
+    list_vms_and_container_hosts,
+)
+from defender_savings.models.resources import AppService, ContainerHost, KeyVault, StorageAccount, VirtualMachine
+from conftest import FakeOrcaClient, make_orca_asset_item
+
+
+def _vms(n: int) -> list[dict]:
+    return [make_orca_asset_item(name=f"vm-{i}", asset_unique_id=f"uid-{i}") for i in range(n)]
+
+
+# ── Streaming yields parsed pages ─────────────────────────────────────
+
+
+def test_iter_virtual_machine_pages_yields_models_per_page() -> None:
+    client = FakeOrcaClient(items={"AzureComputeVm": _vms(250)})
+    pages = list(iter_virtual_machine_pages(client))
+
+    assert [len(p) for p in pages] == [100, 100, 50]
+    assert pages[2][-1].name == "vm-249"
+
+
+def test_iter_container_host_pages_uses_filter() -> None:
+    hosts = [make_orca_asset_item(name="host-1", extra_data={"VCpuCount": {"value": 8}})]
+    client = FakeOrcaClient(items={"AzureComputeVm": _vms(3)}, filtered={"AzureComputeVm": hosts})
+    pages = list(iter_container_host_pages(client))
+
+    assert [[h.vcpu_count for h in p] for p in pages] == [[8]]
+    assert client.calls[0]["with_filter"] is not None
+
+
+class _EagerClient(FakeOrcaClient):
+    """Sends its query as soon as ``iter_pages`` is called, as OrcaClient's parallel path does."""
+
+    def iter_pages(self, *args, **kwargs):
+        return iter(list(super().iter_pages(*args, **kwargs)))
+
+
+@pytest.mark.parametrize(
+    "raw_pages",
+    [
+        iter_raw_compute_vm_pages,
+        iter_raw_app_service_pages,
+        iter_raw_storage_account_pages,
+        iter_raw_key_vault_pages,
+        iter_raw_asset_pages,
+    ],
+)
+def test_raw_streams_start_when_iterated(raw_pages) -> None:
+    client = _EagerClient(items={"AzureComputeVm": _vms(3)})
+    pages = raw_pages(client)
+    assert client.calls == []
+
+    list(pages)
+    assert len(client.calls) == 1
+
+
+# ── list_* matches the stream ─────────────────────────────────────────
+
+
+def test_list_matches_stream() -> None:
+    client = FakeOrcaClient(items={"AzureComputeVm": _vms(150)})
+    streamed = [vm for page in iter_virtual_machine_pages(client) for vm in page]
+    assert list_virtual_machines(client) == streamed
+
+
+# ── Combined VM / container-host crawl ────────────────────────────────
+
+
+def test_list_vms_and_container_hosts_matches_two_queries() -> None:
+    plain = make_orca_asset_item(name="vm-plain", asset_unique_id="u1")
+    host = make_orca_asset_item(
+        name="vm-host",
+        asset_unique_id="u2",
+        extra_data={"VCpuCount": {"value": 16}, "Containers": [{"name": "c"}]},
+    )
+    no_vcpu = make_orca_asset_item(
+        name="vm-containers-only", asset_unique_id="u3", extra_data={"Containers": [{"name": "c"}]},
+    )
+    client = FakeOrcaClient(items={"AzureComputeVm": [plain, host, no_vcpu]}, filtered={"AzureComputeVm": [host]})
+
+    vms, hosts = list_vms_and_container_hosts(client)
+
+    assert vms == list_virtual_machines(client)
+    assert hosts == list_container_hosts(client)
+    assert [h.vcpu_count for h in hosts] == [16]
+
+
+# ── Multi-model crawl routed by type ──────────────────────────────────
+
+
+def test_iter_asset_pages_routes_items_by_type() -> None:
+    host = make_orca_asset_item(
+        name="vm-host", extra_data={"VCpuCount": {"value": 4}, "Containers": [{"name": "c"}]}, asset_type="AzureComputeVm",
+    )
+    client = FakeOrcaClient(
+        items={
+            "AzureComputeVm": [host],
+            "AzureWebAppService": [make_orca_asset_item(name="app", asset_type="AzureWebAppService")],
+            "AzureStorageAccount": [make_orca_asset_item(name="sa", asset_type="AzureStorageAccount")],
+            "AzureKeyVault": [
+                make_orca_asset_item(name="kv", asset_type="AzureKeyVault"),
+                make_orca_asset_item(name="odd", asset_type="AzureSqlServer"),
+            ],
+        },
+    )
+
+    assets = [asset for page in iter_asset_pages(client) for asset in page]
+
+    assert [(type(a), a.name) for a in assets] == [
+        (VirtualMachine, "vm-host"),
+        (ContainerHost, "vm-host"),
+        (AppService, "app"),
+        (StorageAccount, "sa"),
+        (KeyVault, "kv"),
+    ]
+    assert len(client.calls) == 1
+    assert client.calls[0]["models"] == ["AzureComputeVm", "AzureWebAppService", "AzureStorageAccount", "AzureKeyVault"]
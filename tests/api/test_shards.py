@@ -0,0 +1,123 @@
+"""Tests for defender_savings.api.shards — per-account query sharding."""
+
+from __future__ import annotations
+
+import pytest
+
+from defender_savings.api.fetch import count_inventory
+from defender_savings.api.resources import list_container_hosts, list_virtual_machines
+from defender_savings.api.shards import ShardedClient, plan_shards
+from conftest import FakeOrcaClient, make_orca_asset_item, make_orca_defender_item
+
+
+def _vms(account: str, n: int) -> list[dict]:
+    return [
+        make_orca_asset_item(name=f"{account}-vm-{i}", cloud_account_name=account, asset_unique_id=f"{account}/{i}")
+        for i in range(n)
+    ]
+
+
+def _client() -> FakeOrcaClient:
+    host = make_orca_asset_item(
+        name="host", cloud_account_name="b", asset_unique_id="b/host",
+        extra_data={"VCpuCount": {"value": 8}, "Containers": [{"name": "c"}]},
+    )
+    return FakeOrcaClient(
+        items={
+            "AzureDefenderForCloud": [make_orca_defender_item(cloud_account_name=a) for a in "abcd"],
+            "AzureComputeVm": _vms("a", 300) + _vms("b", 40) + [host] + _vms("c", 30) + _vms("d", 20),
+        },
+        filtered={"AzureComputeVm": [host]},
+    )
+
+
+# ── Balanced plans ────────────────────────────────────────────────────
+
+
+def test_large_account_gets_its_own_shard() -> None:
+    shards = plan_shards({"a": 300, "b": 40, "c": 30, "d": 20}, 2)
+    assert shards == [["a"], ["b", "c", "d"]]
+
+
+def test_plan_balances_similar_accounts() -> None:
+    sizes = {f"acct-{i}": size for i, size in enumerate([5, 5, 4, 4, 3, 3])}
+    totals = [sum(sizes[name] for name in shard) for shard in plan_shards(sizes, 3)]
+    assert totals == [8, 8, 8]
+
+
+def test_plan_drops_empty_accounts_and_caps_shards() -> None:
+    assert plan_shards({"a": 5, "b": 0}, 4) == [["a"]]
+    assert plan_shards({"a": 0}, 4) == []
+
+
+# ── Sharded queries match unsharded ones ─────────────────────────────
+
+
+@pytest.mark.parametrize("shards", [1, 2, 4])
+def test_sharded_query_returns_the_same_items(shards: int) -> None:
+    client = _client()
+    sharded = ShardedClient(client, ["a", "b", "c", "d"], shards)
+
+    assert sorted(vm.name for vm in list_virtual_machines(sharded)) == sorted(
+        vm.name for vm in list_virtual_machines(client)
+    )
+    assert [h.vcpu_count for h in list_container_hosts(sharded)] == [8]
+
+
+def test_shard_errors_propagate() -> None:
+    client = _client()
+    sharded = ShardedClient(client, ["a", "b"], 2)
+
+    def boom(*args, **kwargs):
+        raise RuntimeError("api down")
+        yield
+
+    client.iter_pages = boom  # type: ignore[method-assign]
+    with pytest.raises(RuntimeError, match="api down"):
+        sharded.query(["AzureComputeVm"], ["Name"])
+
+
+def test_count_inventory_with_shards_matches_unsharded() -> None:
+    accounts = ["a", "b", "c", "d"]
+    sharded = count_inventory(_client(), shards=3)
+    plain = count_inventory(_client())
+
+    assert sharded.counter.result(accounts) == plain.counter.result(accounts)
+    assert sharded.counter.result(accounts)["a"]["virtual_machines"] == 300
+
+
+# ── Accounts are sized once for every query ──────────────────────────
+
+
+def test_accounts_are_sized_once_for_all_queries() -> None:
+    client = _client()
+    count_inventory(client, shards=3)
+
+    counts = [call for call in client.calls if call.get("count")]
+    assert len(counts) == 4
+
+
+def test_no_sizing_with_no_more_accounts_than_shards() -> None:
+    client = _client()
+    sharded = ShardedClient(client, ["a", "b"], 2)
+
+    assert sharded.plan() == [["a"], ["b"]]
+    assert not [call for call in client.calls if call.get("count")]
+
+
+# ── Servers without counts ────────────────────────────────────────────
+
+
+def test_plan_splits_evenly_without_counts() -> None:
+    client = FakeOrcaClient(items=_client().items, report_totals=False)
+    sharded = ShardedClient(client, ["a", "b", "c", "d", "e"], 2)
+
+    assert sharded.plan() == [["a", "c", "e"], ["b", "d"]]
+
+
+def test_count_inventory_with_shards_without_counts() -> None:
+    accounts = ["a", "b", "c", "d"]
+    client = FakeOrcaClient(items=_client().items, filtered=_client().filtered, report_totals=False)
+    sharded = count_inventory(client, shards=3)
+
+    assert sharded.counter.result(accounts) == count_inventory(_client()).counter.result(accounts)
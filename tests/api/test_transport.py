@@ -0,0 +1,147 @@
+"""Tests for defender_savings.api.transport retries and concurrency limiting."""
+
+from __future__ import annotations
+
+import requests
+
+from defender_savings.api.transport import ConcurrencyLimiter, Transport, retry_after_seconds
+
+
+class _Response:
+    def __init__(self, status_code: int, headers: dict[str, str] | None = None) -> None:
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class _ScriptedSession:
+    """Replies with ``script`` in order (exceptions are raised), then 200s."""
+
+    def __init__(self, *script: int | Exception | _Response) -> None:
+        self.script = list(script)
+        self.timeouts: list[tuple[float, float]] = []
+
+    def post(self, url: str, json: dict, timeout: tuple[float, float]) -> _Response:
+        self.timeouts.append(timeout)
+        step = self.script.pop(0) if self.script else 200
+        if isinstance(step, Exception):
+            raise step
+        return step if isinstance(step, _Response) else _Response(step)
+
+
+def _transport(max_retries: int = 3, max_limit: int = 8) -> tuple[Transport, list[float]]:
+    sleeps: list[float] = []
+    transport = Transport(
+        ConcurrencyLimiter(max_limit, cooldown=0, initial=max_limit),
+        max_retries=max_retries,
+        backoff_base=1,
+        backoff_max=30,
+        sleep=sleeps.append,
+    )
+    return transport, sleeps
+
+
+# ── Retries ───────────────────────────────────────────────────────────
+
+
+def test_transient_errors_are_retried_with_bounded_backoff() -> None:
+    transport, sleeps = _transport()
+    session = _ScriptedSession(502, requests.ConnectionError(), requests.Timeout())
+
+    response = transport.post(session, "url", {})  # type: ignore[arg-type]
+
+    assert response.status_code == 200
+    assert transport.stats.requests == 4
+    assert transport.stats.retries == 3
+    assert [0 <= delay <= 2 ** attempt for attempt, delay in enumerate(sleeps)] == [True] * 3
+
+
+def test_gives_up_after_max_retries() -> None:
+    transport, _ = _transport(max_retries=2)
+    response = transport.post(_ScriptedSession(500, 500, 500, 200), "url", {})  # type: ignore[arg-type]
+
+    assert response.status_code == 500
+    assert transport.stats.retries == 2
+
+
+def test_client_errors_are_not_retried() -> None:
+    transport, sleeps = _transport()
+    assert transport.post(_ScriptedSession(413), "url", {}).status_code == 413  # type: ignore[arg-type]
+    assert sleeps == []
+
+
+def test_timeouts_are_passed_to_every_request() -> None:
+    session = _ScriptedSession(502)
+    transport = Transport(ConcurrencyLimiter(1), connect_timeout=3, read_timeout=30, sleep=lambda _: None)
+    transport.post(session, "url", {})  # type: ignore[arg-type]
+    assert session.timeouts == [(3, 30), (3, 30)]
+
+
+# ── Throttling ────────────────────────────────────────────────────────
+
+
+def test_throttle_honours_retry_after_and_halves_limit() -> None:
+    transport, sleeps = _transport(max_limit=8)
+    session = _ScriptedSession(_Response(429, {"Retry-After": "7"}))
+
+    transport.post(session, "url", {})  # type: ignore[arg-type]
+
+    assert sleeps == [7.0]
+    assert transport.stats.throttled == 1
+    assert transport.limiter.limit == 4
+
+
+def test_retry_after_is_capped_at_backoff_max() -> None:
+    transport, sleeps = _transport()
+    transport.post(_ScriptedSession(_Response(503, {"Retry-After": "3600"})), "url", {})  # type: ignore[arg-type]
+    assert sleeps == [30]
+
+
+def test_retry_after_accepts_http_date() -> None:
+    delay = retry_after_seconds(_Response(503, {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}))  # type: ignore[arg-type]
+    assert delay == 0.0
+    assert retry_after_seconds(_Response(503)) is None  # type: ignore[arg-type]
+
+
+# ── AIMD limiter ──────────────────────────────────────────────────────
+
+
+def test_limiter_starts_low_and_doubles_until_throttled() -> None:
+    limiter = ConcurrencyLimiter(16, cooldown=0)
+    assert limiter.limit == 4
+
+    for _ in range(4):
+        limiter.on_success()
+    assert limiter.limit == 8
+
+    for _ in range(100):
+        limiter.on_success()
+    assert limiter.limit == 16
+
+
+def test_limiter_grows_additively_up_to_max() -> None:
+    limiter = ConcurrencyLimiter(8, cooldown=0, initial=8)
+    limiter.on_throttle()
+    limiter.on_throttle()
+    assert limiter.limit == 2
+
+    for _ in range(4):
+        limiter.on_success()
+    assert limiter.limit == 3
+
+    for _ in range(1000):
+        limiter.on_success()
+    assert limiter.limit == 8
+
+
+def test_limiter_never_drops_below_min() -> None:
+    limiter = ConcurrencyLimiter(4, cooldown=0)
+    for _ in range(10):
+        limiter.on_throttle()
+    assert limiter.limit == 1
+
+
+def test_throttles_within_cooldown_count_once() -> None:
+    limiter = ConcurrencyLimiter(8, cooldown=60, initial=8)
+    limiter.on_throttle()
+    limiter.on_throttle()
+    assert limiter.limit == 4
@@ -2,6 +2,10 @@
 
 from __future__ import annotations
 
+from collections.abc import Iterator
+
+from defender_savings.api.client import CountUnavailableError
+from defender_savings.api.filters import all_of
 from defender_savings.models.defender import DefenderConfig
 from defender_savings.models.resources import (
     AppService,
@@ -94,6 +98,7 @@ def make_orca_asset_item(
     cloud_account_name: str = "acct-1",
     asset_unique_id: str = "uid-123",
     extra_data: dict | None = None,
+    asset_type: str | None = None,
 ) -> dict:
     data: dict = {
         "Name": {"value": name},
@@ -102,7 +107,10 @@ def make_orca_asset_item(
     }
     if extra_data:
         data.update(extra_data)
-    return {"name": name, "id": asset_unique_id, "data": data}
+    item = {"name": name, "id": asset_unique_id, "data": data}
+    if asset_type:
+        item["type"] = asset_type
+    return item
 
 
 def make_orca_defender_item(
@@ -121,3 +129,81 @@ def make_orca_defender_item(
             "ServicesPricing": {"value": services_pricing or {}},
         },
     }
+
+
+# ── Fake API client ───────────────────────────────────────────────────
+
+
+def _split_account_filter(with_filter: dict | None) -> tuple[dict | None, set[str] | None]:
+    """Separate a cloud_account_filter, possibly ANDed in, from the rest of a filter."""
+    if not with_filter:
+        return None, None
+    if with_filter.get("keys") == ["CloudAccount"]:
+        return None, set(with_filter["with"]["values"])
+    if with_filter.get("operator") == "and":
+        accounts = [f for f in with_filter["values"] if f.get("keys") == ["CloudAccount"]]
+        if accounts:
+            rest = [f for f in with_filter["values"] if f.get("keys") != ["CloudAccount"]]
+            return all_of(*rest), set(accounts[0]["with"]["values"])
+    return with_filter, None
+
+
+def _in_accounts(items: list[dict], names: set[str] | None) -> list[dict]:
+    return [item for item in items if names is None or item["data"]["CloudAccount"]["name"] in names]
+
+
+class FakeOrcaClient:
+    """Stands in for OrcaClient; serves canned items keyed by model name.
+
+    Queries with a ``with_filter`` are served from ``filtered`` instead, so
+    the container-host query can return a different set than the VM query.
+    A cloud_account_filter (alone or ANDed in) restricts either set by account.
+    Without ``report_totals``, ``count`` fails as against a server that
+    reports no result counts.
+    """
+
+    def __init__(
+        self,
+        items: dict[str, list[dict]] | None = None,
+        filtered: dict[str, list[dict]] | None = None,
+        report_totals: bool = True,
+    ) -> None:
+        self.items = items or {}
+        self.filtered = filtered or {}
+        self.report_totals = report_totals
+        self.calls: list[dict] = []
+        self.projection = "minimal"
+        self.asset_form = "model"
+
+    def iter_pages(
+        self,
+        models: list[str],
+        select: list[str],
+        limit: int = 100,
+        with_filter: dict | None = None,
+        page_workers: int | None = None,
+    ) -> Iterator[list[dict]]:
+        self.calls.append({"models": models, "select": select, "with_filter": with_filter})
+        rest, names = _split_account_filter(with_filter)
+        source = self.filtered if rest else self.items
+        items = [item for model in models for item in _in_accounts(source.get(model, []), names)]
+        for start in range(0, len(items), limit):
+            yield items[start:start + limit]
+
+    def query(
+        self,
+        models: list[str],
+        select: list[str],
+        limit: int = 100,
+        with_filter: dict | None = None,
+    ) -> list[dict]:
+        return [i for page in self.iter_pages(models, select, limit, with_filter) for i in page]
+
+    def count(self, models: list[str], with_filter: dict | None = None) -> int:
+        """Serve counts like ``iter_pages``."""
+        self.calls.append({"models": models, "count": True, "with_filter": with_filter})
+        if not self.report_totals:
+            raise CountUnavailableError(f"The API reported no result count for models {models}")
+        rest, names = _split_account_filter(with_filter)
+        source = self.filtered if rest else self.items
+        return sum(len(_in_accounts(source.get(model, []), names)) for model in models)
@@ -0,0 +1,56 @@
+"""Tests for defender_savings.models.accounts — account name interning."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from defender_savings.models.accounts import AccountIndex
+from defender_savings.models.compact import COMPACT, MODEL, asset_class
+from defender_savings.models.defender import DefenderConfig
+from defender_savings.models.resources import ContainerHost, VirtualMachine
+from conftest import make_orca_asset_item, make_orca_defender_item
+
+
+def _decoded(items: list[dict]) -> list[dict]:
+    # A JSON round trip, so every item holds its own copy of each string
+    return json.loads(json.dumps(items))
+
+
+# ── AccountIndex ──────────────────────────────────────────────────────
+
+
+def test_account_index_assigns_dense_ids_in_first_seen_order() -> None:
+    index = AccountIndex(["acct-b", "acct-a"])
+
+    assert index.id("acct-b") == 0
+    assert index.id("acct-c") == 2
+    assert index.get("acct-a") == 1
+    assert index.get("missing") is None
+    assert index.name(2) == "acct-c"
+    assert list(index) == ["acct-b", "acct-a", "acct-c"]
+    assert len(index) == 3
+    assert "acct-a" in index and "missing" not in index
+
+
+# ── Names shared across parsed assets ─────────────────────────────────
+
+
+@pytest.mark.parametrize("form", [MODEL, COMPACT])
+@pytest.mark.parametrize("model", [VirtualMachine, ContainerHost])
+def test_parsed_assets_share_account_name(form: str, model: type) -> None:
+    items = _decoded([make_orca_asset_item(name=f"vm-{i}", cloud_account_name="acct-shared") for i in range(3)])
+    assert items[0]["data"]["CloudAccount"]["name"] is not items[1]["data"]["CloudAccount"]["name"]
+
+    cls = asset_class(model, form)
+    for assets in (cls.from_orca_page(items), [cls.from_orca_response(item) for item in items]):
+        assert assets[0].cloud_account_name == "acct-shared"
+        assert all(asset.cloud_account_name is assets[0].cloud_account_name for asset in assets)
+
+
+def test_defender_configs_share_names_with_assets() -> None:
+    config = DefenderConfig.from_orca_page(_decoded([make_orca_defender_item(cloud_account_name="acct-shared")]))[0]
+    vm = VirtualMachine.from_orca_page(_decoded([make_orca_asset_item(cloud_account_name="acct-shared")]))[0]
+
+    assert config.cloud_account_name is vm.cloud_account_name
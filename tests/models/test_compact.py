@@ -0,0 +1,64 @@
+"""Tests for defender_savings.models.compact — slotted asset classes."""
+
+from __future__ import annotations
+
+import pytest
+
+from defender_savings.api.resources import list_vms_and_container_hosts
+from defender_savings.models.compact import COMPACT, MODEL, CompactContainerHost, CompactVirtualMachine, asset_class
+from defender_savings.models.resources import AppService, ContainerHost, KeyVault, StorageAccount, VirtualMachine
+from defender_savings.services.mapper import ResourceCounter
+from conftest import FakeOrcaClient, make_orca_asset_item
+
+_MODELS = [VirtualMachine, AppService, StorageAccount, KeyVault, ContainerHost]
+
+
+# ── Same attributes as the Pydantic models ────────────────────────────
+
+
+@pytest.mark.parametrize("model", _MODELS, ids=lambda m: m.__name__)
+def test_compact_matches_model(model: type) -> None:
+    item = make_orca_asset_item(name="x", cloud_account_name="acct-9", extra_data={"VCpuCount": {"value": 12}})
+    compact = asset_class(model, COMPACT).from_orca_response(item)
+
+    assert compact.to_model() == model.from_orca_response(item)
+    assert compact.ORCA_FIELDS == model.ORCA_FIELDS
+
+
+def test_compact_container_host_falls_back_to_default_vcpus() -> None:
+    host = CompactContainerHost.from_orca_response(make_orca_asset_item(extra_data={"VCpuCount": {"value": None}}))
+    assert host.vcpu_count == 4
+
+
+def test_compact_assets_have_no_instance_dict() -> None:
+    vm = CompactVirtualMachine("vm", "acct", "uid")
+    assert not hasattr(vm, "__dict__")
+    assert vm == CompactVirtualMachine("vm", "acct", "uid")
+    assert vm != CompactVirtualMachine("vm", "other", "uid")
+
+
+def test_unknown_form_rejected() -> None:
+    assert asset_class(VirtualMachine, MODEL) is VirtualMachine
+    with pytest.raises(ValueError, match="Unknown asset form"):
+        asset_class(VirtualMachine, "dataclass")
+
+
+# ── Counting is form-agnostic ─────────────────────────────────────────
+
+
+def test_counts_match_across_forms() -> None:
+    items = [
+        make_orca_asset_item(name="vm-1", extra_data={"VCpuCount": {"value": 8}, "Containers": [{"name": "c"}]}),
+        make_orca_asset_item(name="vm-2", cloud_account_name="acct-2"),
+    ]
+    results = {}
+    for form in (MODEL, COMPACT):
+        client = FakeOrcaClient(items={"AzureComputeVm": items})
+        client.asset_form = form
+        vms, hosts = list_vms_and_container_hosts(client)
+        counter = ResourceCounter()
+        counter.add_page([*vms, *hosts])
+        results[form] = counter.result(["acct-1", "acct-2"])
+
+    assert results[COMPACT] == results[MODEL]
+    assert results[COMPACT]["acct-1"]["container_vcores"] == 8
@@ -92,3 +92,27 @@ def test_cloud_account_not_dict() -> None:
     item = {"data": {"CloudAccount": "just-a-string"}}
     cfg = DefenderConfig.from_orca_response(item)
     assert cfg.cloud_account_name == ""
+
+
+# ── Batch parsing matches per-item parsing ───────────────────────────
+
+
+@pytest.mark.parametrize(
+    "extra_items",
+    [
+        pytest.param([], id="well-formed"),
+        pytest.param([{"name": "fallback-name", "data": {}}], id="missing-fields"),
+        pytest.param([{"data": {"ServicesPricing": {"value": None}, "CloudAccount": "x"}}], id="invalid-pricing"),
+    ],
+)
+def test_from_orca_page_matches_from_orca_response(extra_items: list[dict]) -> None:
+    items = [
+        make_orca_defender_item(cloud_account_name="acct-1", services_pricing={"VirtualMachines": "Standard"}),
+        *extra_items,
+        make_orca_defender_item(cloud_account_name="acct-2", subscription_id="sub-2"),
+    ]
+    assert DefenderConfig.from_orca_page(items) == [DefenderConfig.from_orca_response(item) for item in items]
+
+
+def test_from_orca_page_empty() -> None:
+    assert DefenderConfig.from_orca_page([]) == []
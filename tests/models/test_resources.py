@@ -101,3 +101,63 @@ def test_fallback_to_item_level_fields() -> None:
     vm = VirtualMachine.from_orca_response(item)
     assert vm.name == "item-name"
     assert vm.asset_unique_id == "item-id"
+
+
+# ── Client-side container-host filter ─────────────────────────────────
+
+
+@pytest.mark.parametrize(
+    "extra_data,expected",
+    [
+        pytest.param({"VCpuCount": {"value": 4}, "Containers": [{"name": "c"}]}, True, id="host"),
+        pytest.param({"VCpuCount": {"value": 4}, "Containers": {"value": [{"name": "c"}]}}, True, id="wrapped"),
+        pytest.param({"VCpuCount": {"value": 0}, "Containers": [{"name": "c"}]}, True, id="zero-vcpu-exists"),
+        pytest.param({"VCpuCount": {"value": 4}}, False, id="no-containers"),
+        pytest.param({"VCpuCount": {"value": 4}, "Containers": []}, False, id="empty-containers"),
+        pytest.param({"Containers": [{"name": "c"}]}, False, id="no-vcpu"),
+        pytest.param({"VCpuCount": {"value": None}, "Containers": [{"name": "c"}]}, False, id="null-vcpu"),
+    ],
+)
+def test_is_container_host(extra_data: dict, expected: bool) -> None:
+    item = make_orca_asset_item(extra_data=extra_data)
+    assert ContainerHost.is_container_host(item) is expected
+
+
+# ── Batch parsing matches per-item parsing ───────────────────────────
+
+
+_PAGE_ODDITIES = [
+    pytest.param([], id="well-formed"),
+    pytest.param([{"name": "item-name", "id": "item-id", "data": {}}], id="item-level-fallback"),
+    pytest.param([{"data": {"CloudAccount": "just-a-string"}}], id="account-not-dict"),
+    pytest.param([make_orca_asset_item(extra_data={"Name": {}})], id="name-without-value"),
+]
+
+
+@pytest.mark.parametrize("cls", [VirtualMachine, AppService, StorageAccount, KeyVault, ContainerHost])
+@pytest.mark.parametrize("extra_items", _PAGE_ODDITIES)
+def test_from_orca_page_matches_from_orca_response(cls: type, extra_items: list[dict]) -> None:
+    items = [
+        make_orca_asset_item(name="a", cloud_account_name="acct-1", asset_unique_id="uid-1"),
+        *extra_items,
+        make_orca_asset_item(name="b", cloud_account_name="acct-2", extra_data={"VCpuCount": {"value": 16}}),
+    ]
+    assert cls.from_orca_page(items) == [cls.from_orca_response(item) for item in items]
+
+
+@pytest.mark.parametrize("vcpu_value", [0, -1, "8", 3.5, True, None])
+def test_from_orca_page_replaces_invalid_vcpus_like_per_item(vcpu_value: object) -> None:
+    items = [
+        make_orca_asset_item(name="good", extra_data={"VCpuCount": {"value": 8}}),
+        make_orca_asset_item(name="bad", extra_data={"VCpuCount": {"value": vcpu_value}}),
+    ]
+    hosts = ContainerHost.from_orca_page(items)
+
+    assert hosts == [ContainerHost.from_orca_response(item) for item in items]
+    assert hosts[0].vcpu_count == 8
+
+
+def test_page_strictness_leaves_the_constructor_lax() -> None:
+    common = {"name": "h", "cloud_account_name": "acct-1", "asset_unique_id": "uid"}
+    assert ContainerHost(**common, vcpu_count="8").vcpu_count == 8
+    assert ContainerHost(**common, vcpu_count=0).vcpu_count == 0
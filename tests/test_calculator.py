@@ -5,7 +5,7 @@ from __future__ import annotations
 import pytest
 
 from defender_savings.config import PRICING
-from defender_savings.services.calculator import calculate_account_costs
+from defender_savings.services.calculator import CostMatrix, aggregate_by_module, calculate_account_costs
 from conftest import make_defender_config
 
 
@@ -178,3 +178,90 @@ def test_resource_counts_not_mutated() -> None:
 
     assert counts == original
     assert "_cspm_billable" not in counts
+
+
+# ── CostMatrix matches calculate_account_costs ───────────────────────
+
+
+def _matrix_case() -> tuple[list, dict[str, dict[str, int]]]:
+    configs = [
+        make_defender_config(
+            cloud_account_name="acct-1",
+            subscription_id="sub-1",
+            services_pricing={"VirtualMachines": "Standard", "CloudPosture": "Standard", "KeyVaults": "Free"},
+        ),
+        make_defender_config(
+            cloud_account_name="acct-2",
+            subscription_id="",
+            services_pricing={m: "Standard" for m in PRICING} | {"NotPriced": "Standard"},
+        ),
+        make_defender_config(cloud_account_name="acct-3", subscription_id="sub-3", services_pricing={}),
+        make_defender_config(
+            cloud_account_name="acct-4",
+            subscription_id="sub-4",
+            services_pricing={"Containers": "Standard", "StorageAccounts": "Standard"},
+        ),
+    ]
+    counts = {
+        "acct-1": {"virtual_machines": 4, "storage_accounts": 2, "key_vaults": 9, "subscriptions": 1},
+        "acct-2": {"virtual_machines": 1, "app_services": 3, "container_vcores": 16, "subscriptions": 1},
+        "acct-3": {"virtual_machines": 7},
+        # acct-4 has no resources at all
+    }
+    return configs, counts
+
+
+def test_cost_matrix_summaries_match_per_account() -> None:
+    configs, counts = _matrix_case()
+    matrix = CostMatrix(configs, counts)
+
+    expected = [calculate_account_costs(c, counts.get(c.cloud_account_name, {})) for c in configs]
+    assert matrix.summaries() == expected
+    assert matrix.total_monthly == pytest.approx([s.total_monthly for s in expected])
+
+
+def test_cost_matrix_materializes_requested_rows_only() -> None:
+    configs, counts = _matrix_case()
+    matrix = CostMatrix(configs, counts)
+
+    summaries = matrix.summaries([1, 0])
+    assert [s.cloud_account for s in summaries] == ["acct-2", "sub-1"]
+
+
+def test_cost_matrix_module_breakdown_matches_aggregate() -> None:
+    configs, counts = _matrix_case()
+    matrix = CostMatrix(configs, counts)
+
+    expected = aggregate_by_module(
+        [calculate_account_costs(c, counts.get(c.cloud_account_name, {})) for c in configs]
+    )
+    result = matrix.module_breakdown()
+    assert [b.module for b in result] == [b.module for b in expected]
+    for got, want in zip(result, expected):
+        assert got.subscription_count == want.subscription_count
+        assert got.total_qty == want.total_qty
+        assert got.monthly_cost == pytest.approx(want.monthly_cost)
+        assert got.annual_cost == pytest.approx(want.annual_cost)
+
+
+def test_cost_matrix_module_breakdown_breaks_ties_like_aggregate() -> None:
+    # VirtualMachines and AppServices share a unit price, so both modules total 29.20
+    configs = [
+        make_defender_config(cloud_account_name="acct-a", services_pricing={"AppServices": "Standard"}),
+        make_defender_config(cloud_account_name="acct-b", services_pricing={"VirtualMachines": "Standard"}),
+    ]
+    counts = {"acct-a": {"app_services": 2}, "acct-b": {"virtual_machines": 2}}
+
+    expected = aggregate_by_module(
+        [calculate_account_costs(c, counts.get(c.cloud_account_name, {})) for c in configs]
+    )
+    assert [b.module for b in expected] == ["AppServices", "VirtualMachines"]
+    assert CostMatrix(configs, counts).module_breakdown() == expected
+
+
+def test_cost_matrix_empty() -> None:
+    matrix = CostMatrix([], {})
+
+    assert matrix.summaries() == []
+    assert matrix.module_breakdown() == []
+    assert matrix.total_monthly == []
@@ -0,0 +1,66 @@
+"""Tests for defender_savings.output.jsonl — streamed JSON Lines report."""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+
+import pytest
+
+from defender_savings.output.jsonl import write_account_line, write_totals_lines
+from defender_savings.services.calculator import aggregate_by_module, calculate_account_costs
+from conftest import make_defender_config
+
+
+def _summaries():
+    vms = make_defender_config(
+        cloud_account_name="acct-1", subscription_id="sub-1", services_pricing={"VirtualMachines": "Standard"},
+    )
+    kvs = make_defender_config(
+        cloud_account_name="acct-2", subscription_id="sub-2", services_pricing={"KeyVaults": "Standard"},
+    )
+    return [
+        calculate_account_costs(vms, {"virtual_machines": 2}),
+        calculate_account_costs(kvs, {"key_vaults": 5}),
+    ]
+
+
+def test_report_is_one_record_per_line() -> None:
+    out = io.StringIO()
+    summaries = _summaries()
+    for summary in summaries:
+        write_account_line(summary, out)
+    write_totals_lines(summaries, aggregate_by_module(summaries), out)
+
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r["record"] for r in records] == ["account", "account", "module", "module", "totals"]
+    assert records[0]["cloud_account"] == "sub-1"
+    assert records[0]["costs"][0]["count"] == 2
+    assert {r["module"] for r in records if r["record"] == "module"} == {"VirtualMachines", "KeyVaults"}
+
+    totals = records[-1]
+    assert totals["accounts"] == 2
+    assert totals["total_monthly"] == pytest.approx(sum(s.total_monthly for s in summaries))
+    assert totals["potential_annual_saving"] == pytest.approx(totals["potential_monthly_saving"] * 12)
+
+
+def test_totals_of_empty_report() -> None:
+    out = io.StringIO()
+    write_totals_lines([], [], out)
+
+    assert json.loads(out.getvalue()) == {
+        "record": "totals",
+        "accounts": 0,
+        "total_monthly": 0,
+        "total_annual": 0,
+        "potential_monthly_saving": 0,
+        "potential_annual_saving": 0,
+    }
+
+
+def test_writes_to_stdout_as_redirected_at_call_time() -> None:
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        write_totals_lines([], [])
+    assert json.loads(out.getvalue())["record"] == "totals"
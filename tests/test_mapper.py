@@ -2,7 +2,11 @@
 
 from __future__ import annotations
 
-from defender_savings.services.mapper import ResourceDefenderMap
+import pytest
+
+from defender_savings.services import mapper
+from defender_savings.models.resources import AzureAsset, VirtualMachine
+from defender_savings.services.mapper import ColumnarResourceCounter, ResourceCounter, ResourceDefenderMap
 from conftest import (
     make_app,
     make_container_host,
@@ -125,3 +129,123 @@ def test_get_config_found() -> None:
 def test_get_config_not_found() -> None:
     rdm = ResourceDefenderMap([])
     assert rdm.get_config("nonexistent") is None
+
+
+# ── Incremental counter matches list-based counting ───────────────────
+
+
+def test_counter_matches_count_resources_per_account() -> None:
+    rdm = _make_map("a", "b")
+    resources = _empty(
+        vms=[make_vm("a"), make_vm("b")],
+        app_services=[make_app("b")],
+        storage_accounts=[make_storage("a")],
+        key_vaults=[make_kv("b"), make_kv("unknown")],
+        container_hosts=[make_container_host("a", vcpu_count=8)],
+    )
+
+    counter = ResourceCounter()
+    for assets in resources.values():
+        for asset in assets:
+            counter.add(asset)
+
+    assert rdm.count_from(counter) == rdm.count_resources_per_account(**resources)
+
+
+# ── Counter accepts pages from any iterable ───────────────────────────
+
+
+def test_counter_add_page_from_generator() -> None:
+    counter = ResourceCounter()
+    counter.add_page(make_vm("acct-1", name=f"vm-{i}") for i in range(3))
+    counter.add_page(iter([make_container_host("acct-1", vcpu_count=2)]))
+
+    counts = counter.result(["acct-1"])
+    assert counts["acct-1"]["virtual_machines"] == 3
+    assert counts["acct-1"]["container_vcores"] == 2
+    assert counter.assets_seen["virtual_machines"] == 3
+    assert counter.assets_seen["container_vcores"] == 1
+
+
+# ── Merging counters ──────────────────────────────────────────────────
+
+
+def test_counter_merge() -> None:
+    left, right = ResourceCounter(), ResourceCounter()
+    left.add_page([make_vm("acct-1"), make_kv("acct-2")])
+    right.add_page([make_vm("acct-1"), make_container_host("acct-1", vcpu_count=4)])
+
+    left.merge(right)
+    counts = left.result(["acct-1", "acct-2"])
+    assert counts["acct-1"]["virtual_machines"] == 2
+    assert counts["acct-1"]["container_vcores"] == 4
+    assert counts["acct-1"]["subscriptions"] == 1
+    assert counts["acct-2"]["key_vaults"] == 1
+
+
+# ── Unseen configured accounts get zeroes ─────────────────────────────
+
+
+def test_counter_result_for_unseen_account() -> None:
+    counts = ResourceCounter().result(["acct-1"])
+    assert counts["acct-1"]["virtual_machines"] == 0
+    assert counts["acct-1"]["subscriptions"] == 1
+
+
+# ── Subclasses count as the asset type they derive from ──────────────
+
+
+@pytest.mark.parametrize("counter_class", [ResourceCounter, ColumnarResourceCounter])
+def test_counter_accepts_asset_subclasses(counter_class: type) -> None:
+    class TaggedVirtualMachine(VirtualMachine):
+        pass
+
+    counter = counter_class()
+    counter.add(TaggedVirtualMachine(name="vm", cloud_account_name="acct-1", asset_unique_id="id"))
+    assert counter.result(["acct-1"])["acct-1"]["virtual_machines"] == 1
+
+    with pytest.raises(TypeError, match="AzureAsset"):
+        counter.add(AzureAsset(name="x", cloud_account_name="acct-1", asset_unique_id="id"))
+
+
+# ── Columnar counter ──────────────────────────────────────────────────
+
+
+def _mixed_assets() -> list:
+    return [
+        *(make_vm(f"acct-{i % 3}", name=f"vm-{i}") for i in range(10)),
+        make_app("acct-1"),
+        make_storage("acct-2"),
+        make_kv("acct-0"),
+        make_container_host("acct-1", vcpu_count=8),
+        make_container_host("acct-1", vcpu_count=2),
+    ]
+
+
+@pytest.mark.parametrize("backend", ["numpy", "python"])
+def test_columnar_counter_matches_dict_counter(monkeypatch: pytest.MonkeyPatch, backend: str) -> None:
+    if backend == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(mapper, "np", None)
+    accounts = ["acct-0", "acct-1", "acct-2", "acct-unseen"]
+    columnar, plain = ColumnarResourceCounter(), ResourceCounter()
+    for counter in (columnar, plain):
+        counter.add_page(_mixed_assets())
+        counter.add_count("acct-2", "app_services", 5)
+
+    assert columnar.result(accounts) == plain.result(accounts)
+    assert columnar.assets_seen == plain.assets_seen
+    assert columnar.result(accounts)["acct-1"]["container_vcores"] == 10
+
+
+def test_columnar_merge_remaps_accounts() -> None:
+    left, right = ColumnarResourceCounter(), ColumnarResourceCounter()
+    left.add_page([make_vm("acct-1"), make_kv("acct-2")])
+    right.add_page([make_kv("acct-2"), make_vm("acct-3"), make_container_host("acct-1", vcpu_count=4)])
+
+    left.merge(right)
+    counts = left.result(["acct-1", "acct-2", "acct-3"])
+    assert counts["acct-1"]["container_vcores"] == 4
+    assert counts["acct-2"]["key_vaults"] == 2
+    assert counts["acct-3"]["virtual_machines"] == 1